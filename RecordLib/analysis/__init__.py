@@ -4,5 +4,9 @@ from .decision import (
     PetitionDecision,
     FilterDecision,
     WaitDecision,
+    Explanation,
 )
-from .analysis import Analysis, summarize
+from .context import AnalysisContext
+from .memo import PredicateMemo
+from .profile import RuleProfile, RuleCostTable
+from .analysis import Analysis, ChargeEdit, summarize
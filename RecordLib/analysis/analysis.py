@@ -1,14 +1,85 @@
 from __future__ import annotations
-from typing import Callable, Optional, Tuple, List
+from typing import Callable, Dict, Optional, Tuple, List
 import copy
 import re
+from dataclasses import dataclass, replace
+from datetime import date
 from collections import OrderedDict
+from contextlib import contextmanager
 import logging
+import time
 from RecordLib.analysis import Decision, WaitDecision
+from RecordLib.analysis.context import AnalysisContext, using_context
+from RecordLib.crecord import RecordIndexes, Sentence
+from RecordLib.crecord.helpers import date_or_none
+from RecordLib.analysis.memo import PredicateMemo
+from RecordLib.analysis.profile import (
+    RuleProfile,
+    count_decisions,
+    profiling_enabled,
+    record_size,
+)
+from RecordLib.analysis.timeline import EligibilityTimeline
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class ChargeEdit:
+    """
+    A change to one charge in a record, like correcting its grade or adding its disposition.
+
+    Attributes:
+        docket_number: The docket number of the charge's case.
+        sequence: The charge's sequence number.
+        changes: New values for the charge's attributes, like {"grade": "M2"}.
+    """
+
+    docket_number: str
+    sequence: str
+    changes: dict
+
+    @staticmethod
+    def from_dict(dct: dict) -> ChargeEdit:
+        """
+        A ChargeEdit from a dict like {"docket_number": ..., "sequence": ..., "changes": {...}}, where the
+        changes are json-like values of a Charge's attributes.
+        """
+        changes = dict(dct["changes"])
+        if "sentences" in changes:
+            changes["sentences"] = [
+                Sentence.from_dict(dict(s)) for s in changes["sentences"] or []
+            ]
+        if isinstance(changes.get("disposition_date"), str):
+            changes["disposition_date"] = date_or_none(
+                changes["disposition_date"], r"%Y-%m-%d"
+            )
+        return ChargeEdit(
+            docket_number=dct["docket_number"],
+            sequence=dct["sequence"],
+            changes=changes,
+        )
+
+    def apply(self, crecord: "CRecord") -> None:
+        """
+        Make this change to the charge in `crecord`.
+
+        Raises:
+            KeyError if `crecord` doesn't have the charge.
+        """
+        for case in crecord.cases:
+            if case.docket_number != self.docket_number:
+                continue
+            for charge in case.charges:
+                if charge.sequence == self.sequence:
+                    for attr, value in self.changes.items():
+                        setattr(charge, attr, value)
+                    return
+        raise KeyError(
+            f"No charge {self.sequence} in case {self.docket_number} to edit."
+        )
+
+
 class Analysis:
     """
     The Analysis object structures the process of figuring out what can be sealed and expunged from a criminal record. 
@@ -34,12 +105,53 @@ class Analysis:
     and the `reasoning` is a tree of `Decisions`
 
     Each rule function takes a criminal record and returns a tuple of a tree of Decisions and a CRecord. 
+
+    If `explain` is False, rule functions may skip building explanations of their Decisions, and stop evaluating
+    the conditions of a Decision as soon as its value is known. This is useful for bulk triage, where only the 
+    answers matter. The explanations are still available: they get worked out when a Decision's `reasoning` is read
+    or serialized.
+
+    Charge-level rule functions remember their Decisions for the rest of the Analysis, so rules that ask the
+    same question about a charge don't work it out again. `saved_evaluations` counts how often that happened.
+
+    An Analysis evaluates its rules as of a single date, `as_of`, which defaults to the day the Analysis was created.
+    Rules that count the years since something happened count to that date, so the results don't change if
+    the Analysis is still running after midnight, and two Analyses of the same record as of the same date agree.
+
+    If `profile` is True, the Analysis measures what each rule costs, in `rule_profiles`. See
+    `RecordLib.analysis.profile`. If `profile` is None, profiling is turned on by the RECORDLIB_PROFILE_RULES
+    environment variable.
+
+    After a record is edited, `reanalyze` applies the same rules to the edited record, working out again only the
+    Decisions that depend on the parts of the record that changed.
     """
 
-    def __init__(self, rec: "CRecord") -> None:
+    def __init__(
+        self,
+        rec: "CRecord",
+        explain: bool = True,
+        as_of: Optional[date] = None,
+        profile: Optional[bool] = None,
+    ) -> None:
         self.record = rec
         self.remaining_record = copy.deepcopy(rec)
         self.decisions = []
+        self.profile = profiling_enabled() if profile is None else profile
+        self.rule_profiles: List[RuleProfile] = []
+        self.ruledefs: List[Callable] = []
+        self.context = AnalysisContext(
+            explain=explain,
+            memo=PredicateMemo(),
+            as_of=as_of or date.today(),
+            indexes=RecordIndexes(),
+        )
+
+    @property
+    def saved_evaluations(self) -> int:
+        """
+        The number of times a charge-level rule function didn't need to run, because the Analysis remembered its Decision.
+        """
+        return self.context.memo.saved_evaluations
 
     def rule(self, ruledef: Callable) -> Analysis:
         """
@@ -56,11 +168,82 @@ class Analysis:
         Returns:
             This Analyis, after applying the ruledef and updating the analysis with the results of the ruledef.
         """
-        remaining_record, petition_decision = ruledef(self.remaining_record)
-        self.remaining_record = remaining_record
-        self.decisions.append(petition_decision)
+        self.ruledefs.append(ruledef)
+        with self._profiling(ruledef):
+            with using_context(self.context):
+                remaining_record, petition_decision = ruledef(self.remaining_record)
+            self.remaining_record = remaining_record
+            self.decisions.append(petition_decision)
         return self
 
+    def reanalyze(self, edits: List[ChargeEdit]) -> Analysis:
+        """
+        Analyze a copy of this Analysis's record, with `edits` made to it, using the same rules.
+
+        The new Analysis shares this one's memo of Decisions (see `RecordLib.analysis.memo`), so Decisions about
+        charges that weren't edited, and about facts of the record that the edits didn't change, aren't worked out
+        again. The result is the same as analyzing the edited record from scratch.
+
+        Args:
+            edits: Changes to charges in the record.
+
+        Returns:
+            A new Analysis of the edited record. This Analysis is unchanged.
+        """
+        record = copy.deepcopy(self.record)
+        for edit in edits:
+            edit.apply(record)
+        analysis = Analysis(
+            record,
+            explain=self.context.explain,
+            as_of=self.context.as_of,
+            profile=self.profile,
+        )
+        analysis.context = replace(analysis.context, memo=self.context.memo)
+        for ruledef in self.ruledefs:
+            analysis.rule(ruledef)
+        return analysis
+
+    @contextmanager
+    def _profiling(self, ruledef: Callable):
+        """
+        If this Analysis is profiling, measure what applying `ruledef` inside the `with` block costs.
+        """
+        if not self.profile:
+            yield
+            return
+        cases_in, charges_in = record_size(self.remaining_record)
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        yield
+        wall_time = time.perf_counter() - wall_start
+        cpu_time = time.process_time() - cpu_start
+        cases_remaining, charges_remaining = record_size(self.remaining_record)
+        profile = RuleProfile(
+            rule=getattr(ruledef, "__name__", repr(ruledef)),
+            wall_time=wall_time,
+            cpu_time=cpu_time,
+            cases_in=cases_in,
+            charges_in=charges_in,
+            cases_remaining=cases_remaining,
+            charges_remaining=charges_remaining,
+            decisions=count_decisions(self.decisions[-1]),
+        )
+        self.rule_profiles.append(profile)
+        profile.log()
+
+    def eligibility_timeline(self, as_of: Optional[date] = None) -> EligibilityTimeline:
+        """
+        Find out when the parts of this Analysis's record will become eligible for sealing or expungement,
+        if there are no new convictions.
+
+        See `RecordLib.analysis.timeline`.
+
+        Args:
+            as_of: The date to consider "today". Defaults to the Analysis's `as_of` date.
+        """
+        with using_context(self.context):
+            return EligibilityTimeline(self.record, as_of=as_of or self.context.as_of)
+
 
 def summarize(analysis: Analysis) -> dict:
     """
@@ -112,23 +295,9 @@ def summarize(analysis: Analysis) -> dict:
         #
         # For a filterdecision, the value is the cases that were filtered.
         # For a petitiondecision, the value is a Petition, and the Petition has cases that
-        if decision.name == "Traffic Court cases removed from consideration.":
-            summary = update_summary_for_traffic_cases(summary, decision)
-        elif decision.name == "Expungements for a person over 70.":
-            summary = update_summary_for_over_70_expungements(summary, decision)
-        elif (
-            decision.name
-            == "Expungements for a deceased person, after three years afther their death."
-        ):
-            summary = update_summary_for_deceased_expungements(summary, decision)
-        elif decision.name == "Expungements of nonconvictions.":
-            summary = update_summary_for_nonconviction_expungements(summary, decision)
-        elif decision.name == "Expungements for summary convictions.":
-            summary = update_summary_for_summary_convictions(summary, decision)
-        elif decision.name == "Sealing some convictions under the Clean Slate reforms.":
-            summary = update_summary_for_sealing_convictions(summary, decision)
-        elif decision.name == "Eligibility for Automated Sealing":
-            summary = update_summary_for_automated_sealing(summary, decision)
+        update_summary = SUMMARY_UPDATERS.get(decision.rule_id)
+        if update_summary is not None:
+            summary = update_summary(summary, decision)
         else:
             logger.error(
                 "Decision named %s not recognized in summarize().", decision.name
@@ -167,13 +336,10 @@ def set_next_step(summary, docket_number, charge_sequence=None, next_step="") ->
 
 
 def update_summary_for_automated_sealing(summary, decision):
-    charge_patt = re.compile(r"Is the charge (?P<sequence>\w+(?:,\w+)?) for .*")
-
     for docket_number, case_decision in decision.reasoning.items():
         case_is_clearable = False
         for charge_decision in case_decision:
-            match = charge_patt.search(charge_decision.name)
-            sequence = match.group("sequence")
+            sequence = charge_decision.charge_sequence
             logging.info("Handling %s, %s", docket_number, charge_decision)
             if bool(charge_decision) is True:
                 summary["clearable_charges"] += 1
@@ -223,7 +389,7 @@ def update_summary_for_over_70_expungements(
     for case in decision.get_cases():
         summary = set_next_step(
             summary,
-            case.docker_number,
+            case.docket_number,
             next_step="Case likely expungeable by petition. ",
         )
         summary["clearable_cases"] += 1
@@ -235,7 +401,7 @@ def update_summary_for_deceased_expungements(
 ) -> dict:
     for case in decision.get_cases():
         summary = set_next_step(
-            summary, case, next_step="Case likely expungeable by petition. "
+            summary, case.docket_number, next_step="Case likely expungeable by petition. "
         )
         summary["clearable_cases"] += 1
     return summary
@@ -244,26 +410,20 @@ def update_summary_for_deceased_expungements(
 def update_summary_for_nonconviction_expungements(
     summary: dict, decision: "PetitionDecision"
 ) -> dict:
-    dkt_patt = re.compile(
-        r"Does (?P<docket_number>.+) have expungeable nonconvictions\?"
-    )  # re.compile(r"Is (?P<docket_number>.+) expungeable\?")
-    charge_patt = re.compile(r"Is charge (?P<sequence>\w+(?:,\w+)?), for .*")
     for case_reason in decision.reasoning:
         # this Decision's reasoning is a list of Decisions.
         # The first one is about the whole record,
         # and the rest are each about each specific case.
         case_is_clearable = False
-        dkt_search = dkt_patt.search(case_reason.name)
-        if dkt_search:
-            dkt_number = dkt_search.group("docket_number")
+        dkt_number = case_reason.docket_number
+        if dkt_number is not None:
             # This decision _is_ about a specific case.
             for charge_reason in case_reason.reasoning:
                 # the reasoning of the case_reasoning decision is
                 # a list of decisions about each charge on the case.
                 if bool(charge_reason) is False:
                     # the charge_reason is _false_ if the charge is _not_ a conviction, so its expungeable.
-                    charge_match = charge_patt.search(charge_reason.name)
-                    sequence_num = charge_match.group("sequence")
+                    sequence_num = charge_reason.charge_sequence
 
                     summary = set_next_step(
                         summary,
@@ -369,9 +529,11 @@ def fines_and_wait_for_sealing(
 
     # Note: for some reason, the decision indicating if a 'case' has disqualifying fines is the first decision in the
     #       reasoning of the _charge_.
-    fines_decisions = get_decision_by_name(
-        charge_decision.reasoning, r"Has restitution been paid on the case .*"
-    )
+    fines_decisions = [
+        d
+        for d in charge_decision.reasoning
+        if isinstance(d, Decision) and d.rule_id == "restitution_paid"
+    ]
     try:
         fines_decision = fines_decisions[0]
     except IndexError:
@@ -411,15 +573,12 @@ def update_summary_for_sealing_convictions(
     # the value of this Decision is a list of Decisions.
     # the first Decision encapsulates all the requirements for sealing related to the whole record.
     # The subsequent decisions are each about a single case, and the charges in that case.
-    sealing_patt = re.compile(r"Sealing case (?P<docket_number>.*)")
-    charge_patt = re.compile(r"Sealing charge (?P<sequence>[0-9,]+), .*")
     full_record_decision = decision.reasoning[0]
     for case_decision in decision.reasoning[1:]:
         # `case_is_clearable` indicates that _something_ in the case can be cleared,
         # so we can tell the user about what's sealable at a very high level.
         case_is_clearable = False
-        match = sealing_patt.search(case_decision.name)
-        docket_number = match.group("docket_number")
+        docket_number = case_decision.docket_number
 
         if case_decision.value == "All charges sealable":
             summary = set_next_step(
@@ -430,8 +589,7 @@ def update_summary_for_sealing_convictions(
         else:
             # The whole case isn't sealable, so we'll review each charge.
             for charge_decision in case_decision.reasoning:
-                match = charge_patt.search(charge_decision.name)
-                sequence = match.group("sequence")
+                sequence = charge_decision.charge_sequence
                 if charge_decision.value == "Sealable":
                     # This charge is sealable, so tell the user.
                     summary = set_next_step(
@@ -496,19 +654,12 @@ def update_summary_for_sealing_convictions(
 
 
 def update_summary_for_summary_convictions(summary, decision):
-    case_pattern = re.compile(r"Is (?P<docket_number>.+) expungeable\?")
-    charge_pattern = re.compile(r"Is the charge (?P<sequence>\w+(?:,\w+)?) for .*")
     arrest_free = decision.reasoning[0]
     for case_decision in decision.reasoning[1:]:
         case_is_clearable = False
-        match = case_pattern.search(case_decision.name)
-        docket_number = match.group("docket_number")
+        docket_number = case_decision.docket_number
         for charge_decision in case_decision.reasoning:
-            match = charge_pattern.search(charge_decision.name)
-            # I don't check for `match is None` because this should never happen.
-            # The software is writing the name of this decision, so if the match doesn't work,
-            # its a software bug, not a weird docket value or user input.
-            sequence = match.group("sequence")
+            sequence = charge_decision.charge_sequence
             if bool(charge_decision) and bool(arrest_free):
                 summary = set_next_step(
                     summary,
@@ -530,3 +681,14 @@ def update_summary_for_summary_convictions(summary, decision):
             summary["clearable_cases"] += 1
     return summary
 
+
+# Functions that update a summary with a Decision, keyed by the `rule_id` of the rule that made the Decision.
+SUMMARY_UPDATERS: Dict[str, Callable[[dict, Decision], dict]] = {
+    "filter_traffic_cases": update_summary_for_traffic_cases,
+    "autosealing_eligibility": update_summary_for_automated_sealing,
+    "expunge_over_70": update_summary_for_over_70_expungements,
+    "expunge_deceased": update_summary_for_deceased_expungements,
+    "expunge_nonconvictions": update_summary_for_nonconviction_expungements,
+    "seal_convictions": update_summary_for_sealing_convictions,
+    "expunge_summary_convictions": update_summary_for_summary_convictions,
+}
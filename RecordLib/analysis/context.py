@@ -0,0 +1,74 @@
+"""
+Settings that apply while an Analysis is applying its rules.
+
+Rule functions only take a criminal record (or a case or charge), so settings that affect how rules are evaluated,
+like whether rules need to explain themselves, are kept in an `AnalysisContext`. An `Analysis` makes its context
+the current one while it applies each rule, and rule functions can look up the current context with `current_context()`.
+
+Outside of an Analysis, the current context is the default `AnalysisContext()`.
+"""
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import Optional
+from dataclasses import dataclass, field
+from datetime import date
+import contextvars
+from RecordLib.crecord.helpers import as_of
+from RecordLib.crecord.record_index import RecordIndexes, keeping_indexes
+
+
+@dataclass(frozen=True)
+class AnalysisContext:
+    """
+    Settings for evaluating rules.
+
+    Args:
+        explain: If True, rules build the full explanation for every Decision as they go. If False, rules
+            may stop evaluating a Decision's conditions once its value is known, and Decisions' reasoning is only
+            worked out if somebody asks for it (for example, when the Decision is serialized).
+        memo: A `PredicateMemo` where charge-level rule functions remember their Decisions. If None, they don't.
+        as_of: The date to evaluate rules as of. Rules that ask how many years have passed since something
+            happened count to this date. If None, they count to today.
+        indexes: Where rules keep the RecordIndexes of the records they read, so each record is only indexed once
+            (see `RecordLib.crecord.record_index`). If None, rules index a record each time they need to.
+    """
+
+    explain: bool = True
+    memo: Optional["PredicateMemo"] = field(default=None, compare=False, repr=False)
+    as_of: Optional[date] = None
+    indexes: Optional[RecordIndexes] = field(default=None, compare=False, repr=False)
+
+
+_current_context = contextvars.ContextVar(
+    "analysis_context", default=AnalysisContext()
+)
+
+
+def current_context() -> AnalysisContext:
+    """
+    The AnalysisContext that rules are currently being evaluated in.
+    """
+    return _current_context.get()
+
+
+def explaining() -> bool:
+    """
+    True if rules currently need to build full explanations of their decisions.
+    """
+    return _current_context.get().explain
+
+
+@contextmanager
+def using_context(context: AnalysisContext):
+    """
+    Make `context` the current AnalysisContext inside a `with` block.
+
+    This also fixes the date `RecordLib.crecord.helpers.today()` returns to the context's `as_of` date, and keeps
+    RecordIndexes in the context's `indexes`.
+    """
+    token = _current_context.set(context)
+    try:
+        with as_of(context.as_of), keeping_indexes(context.indexes):
+            yield context
+    finally:
+        _current_context.reset(token)
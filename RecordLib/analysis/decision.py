@@ -1,6 +1,90 @@
 from __future__ import annotations
-from typing import Union, List
+from typing import Callable, Iterable, List, Optional, Tuple, Union
+from dataclasses import replace
 from RecordLib.crecord import Case
+from RecordLib.analysis.context import current_context, explaining, using_context
+
+
+class Explanation:
+    """
+    The reasoning for a Decision, which is only worked out when somebody asks for it.
+
+    When an Analysis isn't explaining its decisions, rules can set a Decision's `reasoning` to an
+    Explanation instead of building the reasoning right away. Reading `decision.reasoning` (or serializing
+    the decision) works out the reasoning, with explanations turned on.
+
+    Args:
+        explain: A callable with no arguments that returns the reasoning.
+    """
+
+    def __init__(self, explain: Callable[[], Union[str, List[Decision]]]):
+        self.explain = explain
+        self.context = current_context()
+
+    def resolve(self) -> Union[str, List[Decision]]:
+        """
+        Work out the reasoning this Explanation stands in for.
+        """
+        with using_context(replace(self.context, explain=True)):
+            return self.explain()
+
+
+def lazy_reasoning(
+    explain: Callable[[], Union[str, List[Decision]]]
+) -> Union[str, List[Decision], Explanation]:
+    """
+    Return the reasoning that `explain` builds, or, if the current Analysis isn't explaining its decisions, an
+    Explanation that will build it later.
+    """
+    if explaining():
+        return explain()
+    return Explanation(explain)
+
+
+def decide_all(
+    conditions: Iterable[Union[Decision, Callable[[], Decision]]], given: bool = True
+) -> Tuple[Union[List[Decision], Explanation], bool]:
+    """
+    Evaluate a list of conditions that must all be met for some Decision to be True.
+
+    Each condition is either a Decision that has already been made, or a callable with no arguments that makes
+    the Decision.
+
+    If the current Analysis is explaining its decisions, every condition is evaluated. Otherwise evaluation stops at
+    the first condition that isn't met, and the reasoning is an Explanation that evaluates the rest if somebody asks.
+
+    Args:
+        conditions: The conditions to evaluate.
+        given: Some other requirement of the Decision, which the caller has already worked out. If this is False,
+            the Decision is False, and when we're not explaining, none of the conditions need to be evaluated.
+
+    Returns:
+        A tuple of (reasoning, value). `reasoning` is the list of Decisions about each condition, and value is
+        True if `given` is True and all the conditions are met.
+    """
+    conditions = list(conditions)
+
+    def evaluate(condition):
+        return condition() if callable(condition) else condition
+
+    if explaining():
+        reasoning = [evaluate(condition) for condition in conditions]
+        return reasoning, bool(given) and all(reasoning)
+    evaluated = []
+    if given:
+        for condition in conditions:
+            evaluated.append(evaluate(condition))
+            if not evaluated[-1]:
+                break
+        else:
+            return evaluated, True
+    remaining = conditions[len(evaluated) :]
+    return (
+        Explanation(
+            lambda: evaluated + [evaluate(condition) for condition in remaining]
+        ),
+        False,
+    )
 
 
 class Decision:
@@ -12,16 +96,42 @@ class Decision:
     Args:
         name: A friendy name for the decision, like "Should we go to the zoo?"
         value: The content decision. Might be True, or "Yes, go to the zoo", or anything else.
-        reasoning: Either a string or a set of sub-decisions that explain the value.
+        reasoning: Either a string or a set of sub-decisions that explain the value. This may also be an `Explanation`,
+            which works out the reasoning the first time the reasoning is read.
+        rule_id: Identifies the rule that made this Decision, for code that needs to find particular Decisions
+            without reading their names. Rule functions (e.g. `seal_convictions`) use their function names.
+        docket_number: The docket number of the case this Decision is about, if it's about a case or charge.
+        charge_sequence: The sequence number of the charge this Decision is about, if it's about a charge.
     """
 
     def __init__(
-        self, name: str, value: any = "", reasoning: Union[str, List[Decision]] = ""
+        self,
+        name: str,
+        value: any = "",
+        reasoning: Union[str, List[Decision]] = "",
+        rule_id: Optional[str] = None,
+        docket_number: Optional[str] = None,
+        charge_sequence: Optional[str] = None,
     ):
         self.name = name
         self.value = value
         self.reasoning = reasoning
         self.type = "Decision"
+        self.rule_id = rule_id
+        self.docket_number = docket_number
+        self.charge_sequence = charge_sequence
+
+    @property
+    def reasoning(self) -> Union[str, List[Decision]]:
+        reasoning = self.__dict__.get("reasoning", "")
+        if isinstance(reasoning, Explanation):
+            reasoning = reasoning.resolve()
+            self.__dict__["reasoning"] = reasoning
+        return reasoning
+
+    @reasoning.setter
+    def reasoning(self, reasoning: Union[str, List[Decision], Explanation]) -> None:
+        self.__dict__["reasoning"] = reasoning
 
     def __bool__(self):
         """
@@ -0,0 +1,171 @@
+"""
+Memoization of rule functions within an Analysis.
+
+Many rules ask the same questions about the same charge. For example, `charge_is_not_excluded_from_sealing` gets
+asked about each charge by `record_contains_no_convictions_excluded_from_sealing` and again by the autosealing rules.
+Rule functions decorated with `memoize_charge_rule` remember their answers for the Analysis that's currently applying
+rules, so each question only gets worked out once per charge.
+
+Answers are remembered by a snapshot of the charge they were about, so a charge that has changed gets a new answer,
+and a charge that hasn't changed keeps its answer even if it's a different object, in a copy of the record.
+
+Some rules about the whole record only depend on a few facts about the record, like the dates and grades of its
+convictions. Rule functions decorated with `memoize_record_rule` remember their answers by those facts, so they only
+run again when the facts change. This is what makes `Analysis.reanalyze` incremental: after a few charges are edited,
+only the Decisions that depend on those charges get worked out again.
+"""
+from __future__ import annotations
+from typing import Callable, Dict, Hashable, Tuple
+from dataclasses import astuple, fields, is_dataclass
+from datetime import date
+import copy
+import functools
+import logging
+from RecordLib.crecord import Charge
+from RecordLib.analysis.context import current_context
+
+logger = logging.getLogger(__name__)
+
+
+def charge_snapshot(charge: Charge) -> tuple:
+    """
+    A hashable snapshot of the current state of `charge`, for noticing if the charge changes later.
+
+    Lists (i.e., `sentences`) are copied into tuples, so appending to a charge's sentences changes the snapshot.
+    """
+    return tuple(
+        tuple(astuple(v) if is_dataclass(v) else v for v in value)
+        if isinstance(value, list)
+        else value
+        for value in (getattr(charge, f.name) for f in fields(charge))
+    )
+
+
+def conviction_facts(crecord: "CRecord") -> tuple:
+    """
+    The facts about a record's convictions that record-level rules about convictions read: each conviction,
+    with the docket number and dates of its case.
+    """
+    return tuple(
+        (
+            case.docket_number,
+            case.arrest_date,
+            case.disposition_date,
+            charge_snapshot(charge),
+        )
+        for case in crecord.cases
+        for charge in case.charges
+        if charge.is_conviction()
+    )
+
+
+def conviction_grades_and_dates(crecord: "CRecord") -> tuple:
+    """
+    The grade and disposition date of each conviction in a record, which is all that rules that count
+    convictions (see `RecordIndex`) read.
+    """
+    return tuple(
+        sorted(
+            (charge.grade_ordinal, case.disposition_date or date.max)
+            for case in crecord.cases
+            for charge in case.charges
+            if charge.is_conviction()
+        )
+    )
+
+
+class PredicateMemo:
+    """
+    Remembers the Decisions that rule functions made during an Analysis.
+
+    Decisions are remembered along with the Analysis's `as_of` date, so a memo can be shared by Analyses of
+    different versions of a record (see `Analysis.reanalyze`).
+
+    Attributes:
+        evaluations: The number of times a memoized rule function actually ran.
+        saved_evaluations: The number of times a rule function didn't need to run, because its answer was remembered.
+    """
+
+    def __init__(self):
+        self._decisions: Dict[Tuple, "Decision"] = dict()
+        self.evaluations = 0
+        self.saved_evaluations = 0
+
+    def lookup(self, rule: Callable, charge: Charge, *args, **kwargs) -> "Decision":
+        """
+        Find the Decision `rule(charge, *args, **kwargs)`, running `rule` only if no Decision
+        has been remembered for a charge like `charge`, as it is now.
+        """
+        return self._lookup(
+            (rule, charge_snapshot(charge), args, tuple(sorted(kwargs.items()))),
+            lambda: rule(charge, *args, **kwargs),
+        )
+
+    def lookup_record(
+        self, rule: Callable, facts: Hashable, crecord: "CRecord", *args, **kwargs
+    ) -> "Decision":
+        """
+        Find the Decision `rule(crecord, *args, **kwargs)`, running `rule` only if no Decision has been remembered
+        for a record with the same `facts`.
+        """
+        return self._lookup(
+            (rule, facts, args, tuple(sorted(kwargs.items()))),
+            lambda: rule(crecord, *args, **kwargs),
+        )
+
+    def _lookup(self, key: Tuple, evaluate: Callable[[], "Decision"]) -> "Decision":
+        key = key + (current_context().as_of,)
+        remembered = self._decisions.get(key)
+        if remembered is not None:
+            self.saved_evaluations += 1
+            return copy.copy(remembered)
+        decision = evaluate()
+        self.evaluations += 1
+        self._decisions[key] = decision
+        return copy.copy(decision)
+
+    def clear(self) -> None:
+        """
+        Forget all the remembered Decisions.
+        """
+        self._decisions.clear()
+
+
+def memoize_charge_rule(rule: Callable) -> Callable:
+    """
+    Decorator for rule functions whose first argument is a Charge (or, for some rules, either a Charge or a
+    whole CRecord).
+
+    When the current AnalysisContext has a `memo` and the rule is called with a Charge, the Decision is looked up in the
+    memo. Otherwise the rule just runs. The rest of the arguments need to be hashable.
+    """
+
+    @functools.wraps(rule)
+    def wrapper(item, *args, **kwargs):
+        memo = current_context().memo
+        if memo is None or not isinstance(item, Charge):
+            return rule(item, *args, **kwargs)
+        return memo.lookup(rule, item, *args, **kwargs)
+
+    return wrapper
+
+
+def memoize_record_rule(facts: Callable[["CRecord"], Hashable]) -> Callable:
+    """
+    Decorator for rule functions whose first argument is a CRecord, and whose Decision only depends on `facts(crecord)`
+    (and the rest of the arguments, which need to be hashable).
+
+    When the current AnalysisContext has a `memo`, the Decision is looked up in the memo.
+    """
+
+    def decorator(rule: Callable) -> Callable:
+        @functools.wraps(rule)
+        def wrapper(crecord, *args, **kwargs):
+            memo = current_context().memo
+            if memo is None:
+                return rule(crecord, *args, **kwargs)
+            return memo.lookup_record(rule, facts(crecord), crecord, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
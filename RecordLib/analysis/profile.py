@@ -0,0 +1,147 @@
+"""
+Measure what each rule of an Analysis costs.
+
+An Analysis that is profiling (see `Analysis(rec, profile=True)`, or set the RECORDLIB_PROFILE_RULES environment
+variable) records a `RuleProfile` for each rule it applies, in `Analysis.rule_profiles`. Each profile is also
+logged to the "RecordLib.analysis.profile" logger, with the profile's fields in the log record's `rule_profile`
+attribute.
+
+`RuleCostTable` adds up the profiles from many Analyses, to find the rules that dominate the time spent analyzing
+a corpus of records.
+"""
+from __future__ import annotations
+from typing import Dict, List, Tuple
+from dataclasses import dataclass, asdict
+import os
+import logging
+from RecordLib.analysis.decision import Decision
+
+logger = logging.getLogger(__name__)
+
+
+PROFILE_ENV_VAR = "RECORDLIB_PROFILE_RULES"
+
+
+def profiling_enabled() -> bool:
+    """
+    Should Analyses profile their rules, if they aren't told whether to?
+    """
+    return os.environ.get(PROFILE_ENV_VAR, "").lower() not in ["", "0", "false", "no"]
+
+
+def record_size(crecord: "CRecord") -> Tuple[int, int]:
+    """
+    The number of cases and charges in a record.
+    """
+    return len(crecord.cases), sum(len(case.charges) for case in crecord.cases)
+
+
+def count_decisions(decision: Decision) -> int:
+    """
+    The number of Decisions in the tree of Decisions rooted at `decision`, not counting `decision` itself.
+
+    Reasoning that hasn't been worked out yet (see `Explanation`) isn't worked out, or counted.
+    """
+
+    def count(item) -> int:
+        if isinstance(item, Decision):
+            return 1 + count(item.__dict__.get("reasoning"))
+        if isinstance(item, dict):
+            return sum(count(i) for i in item.values())
+        if isinstance(item, (list, tuple)):
+            return sum(count(i) for i in item)
+        return 0
+
+    return count(decision) - 1
+
+
+@dataclass
+class RuleProfile:
+    """
+    What one application of a rule to a record cost.
+
+    Attributes:
+        rule: The name of the rule function.
+        wall_time: Seconds elapsed while the rule ran.
+        cpu_time: Seconds of cpu time this process used while the rule ran.
+        cases_in: Cases in the record the rule was applied to.
+        charges_in: Charges in the record the rule was applied to.
+        cases_remaining: Cases in the record the rule returned.
+        charges_remaining: Charges in the record the rule returned.
+        decisions: Decisions the rule created, under the Decision it returned.
+    """
+
+    rule: str
+    wall_time: float
+    cpu_time: float
+    cases_in: int
+    charges_in: int
+    cases_remaining: int
+    charges_remaining: int
+    decisions: int
+
+    def log(self) -> None:
+        logger.info(
+            "Rule %s took %.6fs (%.6fs cpu) and made %d decisions.",
+            self.rule,
+            self.wall_time,
+            self.cpu_time,
+            self.decisions,
+            extra={"rule_profile": asdict(self)},
+        )
+
+
+class RuleCostTable:
+    """
+    Totals of the RuleProfiles of many Analyses, for each rule.
+    """
+
+    def __init__(self) -> None:
+        self.totals: Dict[str, dict] = {}
+
+    def add(self, profile: RuleProfile) -> None:
+        total = self.totals.setdefault(
+            profile.rule,
+            {"calls": 0, "wall_time": 0.0, "cpu_time": 0.0, "charges_in": 0, "decisions": 0},
+        )
+        total["calls"] += 1
+        total["wall_time"] += profile.wall_time
+        total["cpu_time"] += profile.cpu_time
+        total["charges_in"] += profile.charges_in
+        total["decisions"] += profile.decisions
+
+    def add_all(self, profiles: List[RuleProfile]) -> None:
+        for profile in profiles:
+            self.add(profile)
+
+    def rows(self) -> List[dict]:
+        """
+        A row for each rule, with the most expensive rule (by wall time) first.
+
+        `share` is the rule's fraction of the wall time of all the rules.
+        """
+        all_time = sum(t["wall_time"] for t in self.totals.values()) or 1.0
+        rows = [
+            dict(
+                rule=rule,
+                mean_wall_time=total["wall_time"] / total["calls"],
+                share=total["wall_time"] / all_time,
+                **total,
+            )
+            for rule, total in self.totals.items()
+        ]
+        return sorted(rows, key=lambda row: row["wall_time"], reverse=True)
+
+    def format(self) -> str:
+        """
+        The table as plain text.
+        """
+        lines = [
+            f"{'rule':<36}{'calls':>8}{'wall (s)':>12}{'cpu (s)':>12}{'mean (ms)':>12}{'charges':>10}{'decisions':>11}{'share':>8}"
+        ]
+        for row in self.rows():
+            lines.append(
+                f"{row['rule']:<36}{row['calls']:>8}{row['wall_time']:>12.3f}{row['cpu_time']:>12.3f}"
+                f"{row['mean_wall_time'] * 1000:>12.3f}{row['charges_in']:>10}{row['decisions']:>11}{row['share']:>8.1%}"
+            )
+        return "\n".join(lines)
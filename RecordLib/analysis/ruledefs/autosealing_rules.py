@@ -1,8 +1,11 @@
 from typing import Tuple
+import functools
 from RecordLib.analysis.decision import (
     Decision,
     PetitionDecision,
     RecordEligibilityDecision,
+    decide_all,
+    lazy_reasoning,
 )
 
 from RecordLib.analysis.ruledefs import simple_sealing_rules as ssr
@@ -28,26 +31,35 @@ def is_charge_autosealable(
         no_outstanding_fines_costs: A pre-computed Decision explaining if the record contains no outstanding fines or costs.
         record_not_excluded: Pre-computed decision explaining if the record contains disqualifying convictions.
 
+    If the current Analysis isn't explaining its decisions, this stops checking conditions at the first one
+    the charge doesn't meet.
     """
     dec = Decision(
-        f"Is the charge {charge.sequence} for '{charge.offense.strip()}' in {case.docket_number} auto-sealable?"
+        f"Is the charge {charge.sequence} for '{charge.offense.strip()}' in {case.docket_number} auto-sealable?",
+        docket_number=case.docket_number,
+        charge_sequence=charge.sequence,
     )
-    dec.reasoning = []
-    dec.reasoning.append(
-        Decision(
+
+    def is_conviction():
+        conviction = charge.is_conviction()
+        return Decision(
             name="Is this a conviction?",
-            value=charge.is_conviction(),
-            reasoning=f"{charge.disposition} is {'not' if not charge.is_conviction() else ''} a conviction.",
+            value=conviction,
+            reasoning=lazy_reasoning(
+                lambda: f"{charge.disposition} is {'not' if not conviction else ''} a conviction."
+            ),
         )
-    )
 
-    dec.reasoning.append(ssr.ten_years_between_convictions(charge, case, crecord))
-    dec.reasoning.append(no_outstanding_fines_costs)
-    dec.reasoning.append(ssr.charge_is_not_excluded_from_sealing(charge))
-    dec.reasoning.append(ssr.no_m1_or_higher_in_this_case(case))
-    dec.reasoning.append(record_not_excluded)
-
-    dec.value = all(dec.reasoning)
+    dec.reasoning, dec.value = decide_all(
+        [
+            is_conviction,
+            functools.partial(ssr.ten_years_between_convictions, charge, case, crecord),
+            no_outstanding_fines_costs,
+            functools.partial(ssr.charge_is_not_excluded_from_sealing, charge),
+            functools.partial(ssr.no_m1_or_higher_in_this_case, case),
+            record_not_excluded,
+        ]
+    )
     return dec
 
 
@@ -69,6 +81,7 @@ def autosealing_eligibility(
     """
     decision = RecordEligibilityDecision(
         name="Eligibility for Automated Sealing",
+        rule_id="autosealing_eligibility",
         value={"eligible": [], "ineligible": []},
         reasoning={},
     )
@@ -0,0 +1,43 @@
+"""
+Record-level disqualifiers for sealing, for a whole cohort of records at once.
+
+Each rule here takes a `ChargeTable` and returns a boolean array with one element per person in the table. Element `i`
+is the value of the Decision that the rule of the same name in `simple_sealing_rules` returns for the `i`-th record.
+
+These rules don't explain themselves. They're for triaging many people quickly. Analyze a single record with the
+rules in `simple_sealing_rules` to find out why it is or isn't sealable.
+"""
+import numpy as np
+from RecordLib.crecord import Grade
+from RecordLib.crecord.charge_table import ChargeTable
+
+
+def no_f1_convictions(table: ChargeTable) -> np.ndarray:
+    """
+    True for each person with no F1 or murder convictions.
+
+    See `simple_sealing_rules.no_f1_convictions`.
+    """
+    disqualifying = table.conviction & ((table.grade == Grade.F1) | table.murder)
+    return table.per_person(disqualifying) == 0
+
+
+def any_felony_convictions_n_years(table: ChargeTable, years: int) -> np.ndarray:
+    """
+    True for each person with any felony convictions in the last `years` years.
+
+    See `simple_sealing_rules.any_felony_convictions_n_years`.
+    """
+    return table.count_convictions(Grade.F, within_years=years) > 0
+
+
+def more_than_x_convictions_y_grade_z_years(
+    table: ChargeTable, offense_limit: int, grade_limit: str, within_years: int
+) -> np.ndarray:
+    """
+    True for each person with `offense_limit` or more convictions graded `grade_limit` or higher in the last
+    `within_years` years.
+
+    See `simple_sealing_rules.more_than_x_convictions_y_grade_z_years`.
+    """
+    return table.count_convictions(grade_limit, within_years) >= offense_limit
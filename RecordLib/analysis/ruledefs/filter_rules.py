@@ -9,7 +9,10 @@ def is_traffic_case(case: Case) -> Decision:
     """
     True-valued Decision if the Case is a traffic case.
     """
-    decision = Decision(name=f"Is {case.docket_number} a traffic case?")
+    decision = Decision(
+        name=f"Is {case.docket_number} a traffic case?",
+        docket_number=case.docket_number,
+    )
     decision.value = "TR" in case.docket_number
     decision.reasoning = (
         f"The case is {('not ') if not decision.value else ('')}a traffic case"
@@ -23,7 +26,10 @@ def filter_traffic_cases(crecord: CRecord) -> Tuple[CRecord, FilterDecision]:
     more difficult than non-traffic cases.
     """
     decision = FilterDecision(
-        name="Traffic Court cases removed from consideration.", value=[], reasoning=[]
+        name="Traffic Court cases removed from consideration.",
+        value=[],
+        reasoning=[],
+        rule_id="filter_traffic_cases",
     )
     modified_record = CRecord(person=crecord.person, cases=[])
     for case in crecord.cases:
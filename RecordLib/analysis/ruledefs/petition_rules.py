@@ -10,7 +10,8 @@ These rule functions are useful to pass into an `Analysis` and collect a set of
 expunge or seal their record.
 """
 from typing import Tuple
-from RecordLib.analysis.decision import Decision, PetitionDecision
+import functools
+from RecordLib.analysis.decision import Decision, PetitionDecision, decide_all
 from RecordLib.analysis.ruledefs import simple_expungement_rules as ser
 from RecordLib.analysis.ruledefs import simple_sealing_rules as ssr
 from RecordLib.crecord import CRecord
@@ -28,6 +29,7 @@ def expunge_over_70(crecord: CRecord) -> Tuple[CRecord, PetitionDecision]:
     """
     conclusion = PetitionDecision(
         name="Expungements for a person over 70.",
+        rule_id="expunge_over_70",
         reasoning=[
             ser.is_over_age(crecord.person, 70),
             ser.years_since_last_contact(crecord, 10),
@@ -63,6 +65,7 @@ def expunge_deceased(crecord: CRecord) -> Tuple[CRecord, PetitionDecision]:
     """
     conclusion = PetitionDecision(
         name="Expungements for a deceased person, after three years afther their death.",
+        rule_id="expunge_deceased",
         reasoning=[
             Decision(
                 name=f"Has {crecord.person.first_name} been deceased for 3 years?",
@@ -111,7 +114,10 @@ def expunge_summary_convictions(crecord: CRecord) -> Tuple[CRecord, PetitionDeci
     # decisions that are conditions of any case being expungeable.
     arrest_free = ser.arrest_free_for_n_years(crecord)
     conclusion = PetitionDecision(
-        name="Expungements for summary convictions.", value=[], reasoning=[arrest_free],
+        name="Expungements for summary convictions.",
+        value=[],
+        reasoning=[arrest_free],
+        rule_id="expunge_summary_convictions",
     )
 
     # initialize a blank crecord to hold the cases and charges that can't be expunged under this rule.
@@ -120,7 +126,11 @@ def expunge_summary_convictions(crecord: CRecord) -> Tuple[CRecord, PetitionDeci
         # Find expungeable charges in a case. Save a Decision explaining what's
         # expungeable to
         # the reasoning of the Decision about the whole record.
-        case_d = Decision(name=f"Is {case.docket_number} expungeable?", reasoning=[])
+        case_d = Decision(
+            name=f"Is {case.docket_number} expungeable?",
+            reasoning=[],
+            docket_number=case.docket_number,
+        )
         expungeable_case = (
             case.partialcopy()
         )  # The charges in this case that are expungeable.
@@ -130,6 +140,8 @@ def expunge_summary_convictions(crecord: CRecord) -> Tuple[CRecord, PetitionDeci
 
         for charge in case.charges:
             charge_d = ser.is_summary_conviction(charge)
+            charge_d.docket_number = case.docket_number
+            charge_d.charge_sequence = charge.sequence
             if arrest_free and all(charge_d.reasoning):
                 expungeable_case.charges.append(charge)
                 charge_d.value = True
@@ -172,7 +184,10 @@ def expunge_nonconvictions(crecord: CRecord) -> Tuple[CRecord, PetitionDecision]
             reasoning: [Decision]
     """
     conclusion = PetitionDecision(
-        name="Expungements of nonconvictions.", value=[], reasoning=[]
+        name="Expungements of nonconvictions.",
+        value=[],
+        reasoning=[],
+        rule_id="expunge_nonconvictions",
     )
 
     remaining_record = CRecord(person=crecord.person)
@@ -184,11 +199,14 @@ def expunge_nonconvictions(crecord: CRecord) -> Tuple[CRecord, PetitionDecision]
         case_d = Decision(
             name=f"Does {case.docket_number} have expungeable nonconvictions?",
             reasoning=[],
+            docket_number=case.docket_number,
         )
         unexpungeable_case = case.partialcopy()
         expungeable_case = case.partialcopy()
         for charge in case.charges:
             charge_d = ser.is_conviction_or_unresolved(charge)
+            charge_d.docket_number = case.docket_number
+            charge_d.charge_sequence = charge.sequence
 
             if bool(charge_d) is False and charge_d.value is not None:
                 # if the charge_d's value is False, then the charge is _not_ a conviction, and its not unresolved. Hence
@@ -241,6 +259,7 @@ def seal_convictions(crecord: CRecord) -> Tuple[CRecord, PetitionDecision]:
         name="Sealing some convictions under the Clean Slate reforms.",
         value=[],
         reasoning=[],
+        rule_id="seal_convictions",
     )
     mod_rec = CRecord(person=crecord.person, cases=[])
     # Requirements for sealing any part of a record
@@ -249,7 +268,9 @@ def seal_convictions(crecord: CRecord) -> Tuple[CRecord, PetitionDecision]:
     for case in crecord.cases:
         # The sealability of each case is its own decision
         case_decision = Decision(
-            name=f"Sealing case {case.docket_number}", reasoning=[]
+            name=f"Sealing case {case.docket_number}",
+            reasoning=[],
+            docket_number=case.docket_number,
         )
         fines_decision = ssr.restitution_paid(case)  # 18 Pa.C.S. 9122.1(a)
         # case_decision.reasoning.append(fines_decision)
@@ -265,45 +286,35 @@ def seal_convictions(crecord: CRecord) -> Tuple[CRecord, PetitionDecision]:
         for charge in case.charges:
             # The sealability of each charge is its own Decision.
             charge_decision = Decision(
-                name=f"Sealing charge {charge.sequence}, {charge.offense}"
+                name=f"Sealing charge {charge.sequence}, {charge.offense}",
+                docket_number=case.docket_number,
+                charge_sequence=charge.sequence,
             )
             # Conditions that determine whether this charge is sealable
             #  See 91 Pa.C.S. 9122.1(b)(1)
-            charge_decision.reasoning = [
+            charge_conditions = [
                 fines_decision,
-                ssr.is_misdemeanor_or_ungraded(charge),
-                ssr.no_danger_to_person_offense(
-                    charge,
-                    penalty_limit=2,
-                    conviction_limit=1,
-                    within_years=float("Inf"),
-                ),
-                ssr.no_offense_against_family(
-                    charge,
-                    penalty_limit=2,
-                    conviction_limit=1,
-                    within_years=float("Inf"),
-                ),
-                ssr.no_firearms_offense(
-                    charge,
-                    penalty_limit=2,
-                    conviction_limit=1,
-                    within_years=float("Inf"),
-                ),
-                ssr.no_sexual_offense(
-                    charge,
-                    penalty_limit=2,
-                    conviction_limit=1,
-                    within_years=float("Inf"),
-                ),
-                ssr.no_corruption_of_minors_offense(
+                functools.partial(ssr.is_misdemeanor_or_ungraded, charge),
+            ] + [
+                functools.partial(
+                    rule,
                     charge,
                     penalty_limit=2,
                     conviction_limit=1,
                     within_years=float("Inf"),
-                ),
+                )
+                for rule in [
+                    ssr.no_danger_to_person_offense,
+                    ssr.no_offense_against_family,
+                    ssr.no_firearms_offense,
+                    ssr.no_sexual_offense,
+                    ssr.no_corruption_of_minors_offense,
+                ]
             ]
-            if all(charge_decision.reasoning) and bool(full_record_decision):
+            charge_decision.reasoning, charge_is_sealable = decide_all(
+                charge_conditions, given=bool(full_record_decision)
+            )
+            if charge_is_sealable:
                 # if all the reasoning for this charge is `true` (i.e. sealable)
                 # _and_ the full record's requirements are also met
                 # this charge is sealable, and it should be added to the sealable slice of
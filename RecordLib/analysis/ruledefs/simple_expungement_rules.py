@@ -20,6 +20,7 @@ The rules in this module all relate to expungemnts.
 """
 from RecordLib.crecord import CRecord, Charge, Person
 from RecordLib.analysis import Decision
+from RecordLib.analysis.memo import memoize_charge_rule
 
 
 def is_over_age(person: Person, age_limit: int) -> Decision:
@@ -54,6 +55,7 @@ def arrest_free_for_n_years(crec: CRecord, year_min=5) -> Decision:
     )
 
 
+@memoize_charge_rule
 def is_summary(charge: Charge) -> Decision:
     return Decision(
         name=f"Is this charge for {charge.offense} a summary?",
@@ -62,6 +64,7 @@ def is_summary(charge: Charge) -> Decision:
     )
 
 
+@memoize_charge_rule
 def is_unresolved(charge: Charge) -> Decision:
     """
     True decision if a charge seems not to be resolved.
@@ -85,6 +88,7 @@ def is_unresolved(charge: Charge) -> Decision:
     return decision
 
 
+@memoize_charge_rule
 def is_conviction_or_unresolved(charge: Charge) -> Decision:
     """
     A true decision if the charge is a conviction or the case is unresolved 
@@ -104,6 +108,7 @@ def is_conviction_or_unresolved(charge: Charge) -> Decision:
     return decision
 
 
+@memoize_charge_rule
 def is_conviction(charge: Charge) -> Decision:
 
     if charge.disposition is None or charge.disposition.strip() == "":
@@ -121,6 +126,7 @@ def is_conviction(charge: Charge) -> Decision:
     )
 
 
+@memoize_charge_rule
 def is_summary_conviction(charge: Charge) -> Decision:
     charge_d = Decision(
         name=f"Is the charge {charge.sequence} for {charge.offense} a summary conviction?",
@@ -16,18 +16,32 @@ The rules in this module all relate to petition-based sealing..
 """
 
 from __future__ import annotations
-from RecordLib.crecord import CRecord, Charge
-from typing import Tuple, Union, List, Optional
+from RecordLib.crecord import CRecord, Charge, Grade, record_index
+from RecordLib.crecord.helpers import years_since
+from typing import Callable, Tuple, Union, List, Optional
+from dataclasses import dataclass
 import copy
+import functools
 import json
 import re
 from RecordLib.analysis import Decision, WaitDecision
+from RecordLib.analysis.decision import decide_all
+from RecordLib.analysis.memo import (
+    memoize_charge_rule,
+    memoize_record_rule,
+    conviction_facts,
+    conviction_grades_and_dates,
+)
 from RecordLib.petitions import Sealing
 import math
-from dateutil.relativedelta import relativedelta
 from datetime import date
 
+# A record can't be sealed by petition unless the person has been free of conviction for this many years.
+# 18 Pa.C.S. 9122.1(a)
+YEARS_FREE_OF_CONVICTION = 10
 
+
+@memoize_charge_rule
 def no_danger_to_person_offense(
     item: Union[CRecord, Charge],
     within_years: Optional[int] = None,
@@ -90,9 +104,9 @@ def no_danger_to_person_offense(
             name="Is this not a conviction for an Article B offense (M1 or more serious)?"
         )
         try:
-            years_since_charge_occurred = relativedelta(
-                date.today(), arrest_date
-            ).years  # 0 if arrest date is None.
+            years_since_charge_occurred = years_since(
+                arrest_date
+            )  # 0 if arrest date is None.
             charge_occured_within_disqualifying_period = (
                 years_since_charge_occurred < within_years
             )
@@ -102,7 +116,7 @@ def no_danger_to_person_offense(
                 and item.get_statute_section() < 3300
                 and item.is_conviction()
             ):
-                if Charge.grade_GTE(item.grade, "M1"):
+                if item.grade_ordinal >= Grade.M1:
                     if charge_occured_within_disqualifying_period:
                         decision.value = False
                         decision.reasoning = f"Statute {item.statute} is an Article B conviction, with a grade of at least M1, and it occurred only {years_since_charge_occurred} years ago."
@@ -163,6 +177,7 @@ def ten_years_between_convictions(charge, case, crecord, years=10) -> WaitDecisi
         decision.reasoning += f" It looks like enough time between convictions for sealing may pass after {years_remaining} more years."
 
 
+@memoize_record_rule(conviction_facts)
 def ten_years_since_last_conviction_for_m_or_f(crecord: CRecord) -> WaitDecision:
     """
     Person is not eligible for sealing unless they have been "free from conviction
@@ -176,13 +191,13 @@ def ten_years_since_last_conviction_for_m_or_f(crecord: CRecord) -> WaitDecision
         a WaitDecision indicating if the record has a conviction that's more recent than 10 years.
     """
     decision = WaitDecision(
-        name="Has the person been free of conviction for at least 10 years?",
+        name=f"Has the person been free of conviction for at least {YEARS_FREE_OF_CONVICTION} years?",
     )
     convictions = [
         case
         for case in crecord.cases
         for charge in case.charges
-        if charge.is_conviction() and Charge.grade_GTE(charge.grade, "M3")
+        if charge.is_conviction() and charge.grade_ordinal >= Grade.M3
     ]
     if len(convictions) == 0:
         decision.value = True
@@ -195,17 +210,15 @@ def ten_years_since_last_conviction_for_m_or_f(crecord: CRecord) -> WaitDecision
 
     if len(convictions_with_disposition_dates) == 0:
         decision.value = False
-        decision.reasoning = "The disposition dates are missing, so to be safe, we assume it has not been 10 years since the last conviction."
-        decision.years_to_wait = 10
+        decision.reasoning = f"The disposition dates are missing, so to be safe, we assume it has not been {YEARS_FREE_OF_CONVICTION} years since the last conviction."
+        decision.years_to_wait = YEARS_FREE_OF_CONVICTION
         return decision
 
     last_conviction = max(
         convictions_with_disposition_dates, key=lambda c: c.disposition_date
     )
     # years_since_last_conviction = min([case.years_passed_disposition() for case in crecord.cases for charge in case.charges if charge.is_conviction()])
-    years_since_last_conviction = relativedelta(
-        date.today(), last_conviction.disposition_date
-    ).years
+    years_since_last_conviction = years_since(last_conviction.disposition_date)
 
     decision.reasoning = (
         f"It has been {years_since_last_conviction} years since the last conviction on "
@@ -216,14 +229,17 @@ def ten_years_since_last_conviction_for_m_or_f(crecord: CRecord) -> WaitDecision
             f" But note that there were {len(convictions) - len(convictions_with_disposition_dates)}"
             + " convictions without disposition dates, so our estimate of the last conviction date may be wrong."
         )
-    decision.value = years_since_last_conviction > 10
-    years_remaining = math.ceil(10 - years_since_last_conviction)
+    decision.value = years_since_last_conviction > YEARS_FREE_OF_CONVICTION
+    years_remaining = math.ceil(
+        YEARS_FREE_OF_CONVICTION - years_since_last_conviction
+    )
     if decision.value is False:
         decision.years_to_wait = years_remaining
         decision.reasoning += f" Person may be eligible for sealing in {years_remaining} years, if there are no further convictions. "
     return decision
 
 
+@memoize_charge_rule
 def no_cruelty_to_animals(charge: Charge) -> Decision:
     """
     True-valued decision if the charge is not a conviction for cruelty to animals.
@@ -236,6 +252,7 @@ def no_cruelty_to_animals(charge: Charge) -> Decision:
     return decision
 
 
+@memoize_charge_rule
 def charge_is_not_excluded_from_sealing(charge: Charge) -> Decision:
     """
     Convictions for certain charges can't be sealed, although they don't disqualify the whole record.
@@ -314,6 +331,8 @@ def restitution_paid(case: Case) -> Decision:
     decision = Decision(
         name=f"Has restitution been paid on the case {case.docket_number}?",
         reasoning="",
+        rule_id="restitution_paid",
+        docket_number=case.docket_number,
     )
     if case.restitution_remaining is None:
         decision.value = True
@@ -382,6 +401,7 @@ def fines_and_costs_paid(case: Case) -> Decision:
     return decision
 
 
+@memoize_charge_rule
 def not_felony1(charge: Charge) -> Decision:
     """
     Any F1 graded offense disqualifies a whole record from sealing. 18 PA Code 9122.1(b)(2)(i)
@@ -393,7 +413,7 @@ def not_felony1(charge: Charge) -> Decision:
     if charge.grade.strip() == "":
         decision.value = True
         decision.reasoning = "The charge's grade is unknown. We are assuming it is not an F1, but could be wrong."
-    elif re.match("F1", charge.grade):
+    elif charge.grade_ordinal == Grade.F1:
         if charge.is_conviction():
             decision.value = False
             decision.reasoning = "The charge is an F1 conviction"
@@ -409,6 +429,7 @@ def not_felony1(charge: Charge) -> Decision:
     return decision
 
 
+@memoize_charge_rule
 def not_murder(charge: Charge) -> Decision:
     """
     Checks if a charge was a conviction for murder. 
@@ -455,6 +476,7 @@ def no_f1_convictions(crecord: CRecord) -> Decision:
     return decision
 
 
+@memoize_charge_rule
 def is_felony_conviction(charge: Charge) -> Decision:
     """
     Was `charge` a felony conviction
@@ -491,15 +513,16 @@ def any_felony_convictions_n_years(crecord: CRecord, years: int) -> WaitDecision
 
     """
     decision = WaitDecision(name=f"Were there any felony convictions within {years}")
-    decision.reasoning = [
-        is_felony_conviction(charge) and case.years_passed_disposition() > years
-        for case in crecord.cases
-        for charge in case.charges
-    ]
-    decision.value = all(decision.reasoning)
+    index = record_index(crecord)
+    felonies = index.convictions(Grade.F, within_years=years)
+    decision.value = len(felonies) > 0
+    decision.reasoning = f"There were {len(felonies)} felony convictions within {years} years."
+    if decision.value and years != float("inf"):
+        decision.years_to_wait = years - index.years_since(felonies[-1])
     return decision
 
 
+@memoize_charge_rule
 def is_misdemeanor_or_ungraded(charge: Charge) -> Decision:
     """
     Sealing only available for 'qualifying misdemeanor or an ungraded offense which 
@@ -526,6 +549,7 @@ def is_misdemeanor_or_ungraded(charge: Charge) -> Decision:
     return decision
 
 
+@memoize_charge_rule
 def no_offense_against_family(
     item: Union[CRecord, Charge],
     penalty_limit: Optional[int] = None,
@@ -562,7 +586,7 @@ def no_offense_against_family(
             ]
         ):
             # charge is the kind of charge that's disqualified. Did it happen recently enough to be disqualifying?
-            years_since_charge_occurred = relativedelta(date.today(), charge_date).years
+            years_since_charge_occurred = years_since(charge_date)
             years_to_wait = within_years - years_since_charge_occurred
             decision.reasoning += "This charge is for an offense against the family, "
             if years_to_wait <= 0:
@@ -619,6 +643,7 @@ def no_offense_against_family(
     return decision
 
 
+@memoize_charge_rule
 def no_firearms_offense(
     item: Union[CRecord, Charge],
     penalty_limit: Optional[int] = None,
@@ -654,7 +679,7 @@ def no_firearms_offense(
             ]
         ):
             # charge is the kind of charge that's disqualified. Did it happen recently enough to be disqualifying?
-            years_since_charge_occurred = relativedelta(date.today(), charge_date).years
+            years_since_charge_occurred = years_since(charge_date)
             years_to_wait = within_years - years_since_charge_occurred
             decision.reasoning = "This charge is for a firearms offense, "
             if years_to_wait <= 0:
@@ -713,6 +738,7 @@ def no_firearms_offense(
     return decision
 
 
+@memoize_charge_rule
 def no_sexual_offense(
     item: Union[CRecord, Charge],
     penalty_limit: Optional[int] = None,
@@ -800,9 +826,7 @@ def no_sexual_offense(
                 ]
             ):
                 decision.reasoning = "This charge is for a disqualifying sex offense, "
-                years_since_charge_occurred = relativedelta(
-                    date.today(), charge_date
-                ).years
+                years_since_charge_occurred = years_since(charge_date)
                 years_to_wait = within_years - years_since_charge_occurred
                 if years_to_wait <= 0:
                     decision.value = True
@@ -851,6 +875,7 @@ def no_sexual_offense(
     return decision
 
 
+@memoize_charge_rule
 def no_corruption_of_minors_offense(
     charge: Charge,
     penalty_limit: Optional[int] = None,
@@ -914,31 +939,21 @@ def more_than_x_convictions_y_grade_z_years(
     decision = WaitDecision(
         name=f"Does {crecord.person.full_name()}'s record contain {offense_limit} or more convictions, graded {grade_limit} or higher, within the last {within_years} years?"
     )
-    disqualifying_charges = []
-    for case in crecord.cases:
-        for charge in case.charges:
-            if (
-                case.years_passed_disposition() >= within_years
-                and charge.is_conviction()
-                and Charge.grade_GTE(charge.grade, grade_limit)
-            ):
-                disqualifying_charges.append((charge, case.years_passed_disposition()))
-
-    decision.reasoning = (
-        f"There are {len(disqualifying_charges)} disqualifying charges on the record."
-    )
-    decision.value = len(disqualifying_charges) >= offense_limit
-    if bool(decision.value) is True:
-        most_recent_charge = min(
-            [(c, y) for c, years in disqualifying_charges], lambda c, y: y
-        )
-        decision.years_to_wait = (
-            within_years - relativedelta(date.today(), most_recent_charge[1]).years
+    index = record_index(crecord)
+    disqualifying_convictions = index.convictions(grade_limit, within_years)
+
+    decision.reasoning = f"There are {len(disqualifying_convictions)} disqualifying charges on the record."
+    decision.value = len(disqualifying_convictions) >= offense_limit
+    if bool(decision.value) is True and within_years != float("inf"):
+        # The record stops having too many convictions when the `offense_limit`-th most recent one gets old enough.
+        decision.years_to_wait = within_years - index.years_since(
+            disqualifying_convictions[-offense_limit]
         )
 
     return decision
 
 
+@memoize_record_rule(conviction_grades_and_dates)
 def no_offenses_punishable_by_more_than_two_years(
     crecord: CRecord, conviction_limit: int, within_years: int
 ) -> WaitDecision:
@@ -961,17 +976,10 @@ def no_offenses_punishable_by_more_than_two_years(
 
     """
     # Grades that approximately the grades of offenses that also have penalty's of more than two years.
-    proxy_grades = ["F1", "F2", "F3", "F", "M1"]
-    convictions_within_timelimit = [
-        (charge, case.years_passed_disposition())
-        for case in crecord.cases
-        for charge in case.charges
-        if (
-            charge.is_conviction()
-            and (charge.grade in proxy_grades)
-            and case.years_passed_disposition() < within_years
-        )
-    ]
+    # These are the grades M1 and more serious.
+    proxy_grade = Grade.M1
+    index = record_index(crecord)
+    convictions_within_timelimit = index.convictions(proxy_grade, within_years)
 
     decision = WaitDecision(
         name=f"The record has fewer than {conviction_limit} convictions for offenses punishable by two or more years in the last {within_years} years.",
@@ -981,8 +989,8 @@ def no_offenses_punishable_by_more_than_two_years(
     if bool(decision.value):
         decision.reasoning = f"There were only {len(convictions_within_timelimit)} convictions within {within_years}."
     else:
-        years_since_last_conviction = max(
-            [years_passed for charge, years_passed in convictions_within_timelimit]
+        years_since_last_conviction = index.years_since(
+            convictions_within_timelimit[0]
         )
         years_left = within_years - years_since_last_conviction
         decision.reasoning = f"There were {len(convictions_within_timelimit)} convictions graded M1 or greater within the previous {within_years} years. It looks like there are {years_left} years before the charge may be eligible for sealing."
@@ -990,6 +998,7 @@ def no_offenses_punishable_by_more_than_two_years(
     return decision
 
 
+@memoize_record_rule(conviction_grades_and_dates)
 def no_offenses_punishable_by_two_or_more_years(
     crecord: CRecord, conviction_limit: int, within_years: int
 ) -> WaitDecision:
@@ -1012,17 +1021,10 @@ def no_offenses_punishable_by_two_or_more_years(
 
     """
     # Grades that approximately the grades of offenses that also have penalty's of two or more years.
-    proxy_grades = ["F1", "F2", "F3", "F", "M1", "M2"]
-    convictions_within_timelimit = [
-        (charge, case.years_passed_disposition())
-        for case in crecord.cases
-        for charge in case.charges
-        if (
-            charge.is_conviction()
-            and (charge.grade in proxy_grades)
-            and case.years_passed_disposition() < within_years
-        )
-    ]
+    # These are the grades M2 and more serious.
+    proxy_grade = Grade.M2
+    index = record_index(crecord)
+    convictions_within_timelimit = index.convictions(proxy_grade, within_years)
 
     decision = WaitDecision(
         name=f"The record has fewer than {conviction_limit} convictions for offenses punishable by two or more years in the last {within_years} years.",
@@ -1032,8 +1034,8 @@ def no_offenses_punishable_by_two_or_more_years(
     if bool(decision.value):
         decision.reasoning = f"There were only {len(convictions_within_timelimit)} convictions within {within_years}."
     else:
-        years_since_last_conviction = max(
-            [years_passed for charge, years_passed in convictions_within_timelimit]
+        years_since_last_conviction = index.years_since(
+            convictions_within_timelimit[0]
         )
         years_left = within_years - years_since_last_conviction
         decision.reasoning = f"There were {len(convictions_within_timelimit)} convictions graded M2 or greater within the previous {within_years} years. It looks like there are {years_left} years before the charge may be eligible for sealing."
@@ -1051,6 +1053,7 @@ def has_indecent_exposure(crecord) -> Decision:
     return dec.value
 
 
+@memoize_record_rule(conviction_facts)
 def no_indecent_exposure(
     crecord, conviction_limit: int, within_years: int = 15
 ) -> WaitDecision:
@@ -1104,6 +1107,7 @@ def has_sexual_intercourse_w_animal(crecord: CRecord) -> Decision:
     return dec
 
 
+@memoize_record_rule(conviction_facts)
 def no_sexual_intercourse_w_animal(
     crecord: CRecord, conviction_limit: int, within_years: int = 15
 ) -> WaitDecision:
@@ -1234,6 +1238,7 @@ def has_weapons_of_escape(crecord):
     return dec
 
 
+@memoize_record_rule(conviction_facts)
 def no_weapons_of_escape(
     crecord: CRecord, conviction_limit: int, within_years: int = 15
 ) -> WaitDecision:
@@ -1281,6 +1286,7 @@ def has_abuse_of_corpse(crecord):
     return dec
 
 
+@memoize_record_rule(conviction_facts)
 def no_abuse_of_corpse(
     crecord: CRecord, conviction_limit: int, within_years: int = 15
 ) -> WaitDecision:
@@ -1329,6 +1335,7 @@ def has_paramilitary_training(crecord):
     return dec
 
 
+@memoize_record_rule(conviction_facts)
 def no_paramilitary_training(
     crecord: CRecord, conviction_limit: int, within_years: int = 15
 ) -> WaitDecision:
@@ -1368,43 +1375,77 @@ def no_paramilitary_training(
     return decision
 
 
+@dataclass(frozen=True)
+class ConvictionWindow:
+    """
+    A requirement for sealing by petition: a record can be sealed only if it has fewer than `conviction_limit`
+    convictions that `rule` looks for, within the last `within_years` years.
+
+    `full_record_requirements_for_petition_sealing` applies these requirements, and
+    `RecordLib.analysis.timeline` works out when they will be met.
+    """
+
+    rule: Callable[..., Decision]
+    within_years: int
+    conviction_limit: int = 1
+    penalty_limit: Optional[int] = None
+
+    def decide(self, crecord: CRecord) -> Decision:
+        kwargs = dict(
+            conviction_limit=self.conviction_limit, within_years=self.within_years
+        )
+        if self.penalty_limit is not None:
+            kwargs["penalty_limit"] = self.penalty_limit
+        return self.rule(crecord, **kwargs)
+
+
+# The requirements of 18 Pa.C.S. 9122.1(b)(2) that limit convictions within a number of years.
+PETITION_SEALING_WINDOWS = [
+    ConvictionWindow(no_danger_to_person_offense, within_years=20, penalty_limit=7),
+    ConvictionWindow(no_offense_against_family, within_years=20, penalty_limit=7),
+    ConvictionWindow(no_firearms_offense, within_years=20, penalty_limit=7),
+    ConvictionWindow(no_sexual_offense, within_years=20, penalty_limit=7),
+    ConvictionWindow(
+        no_offenses_punishable_by_two_or_more_years,
+        within_years=20,
+        conviction_limit=4,
+    ),
+    ConvictionWindow(
+        no_offenses_punishable_by_more_than_two_years,
+        within_years=15,
+        conviction_limit=2,
+    ),
+    ConvictionWindow(no_indecent_exposure, within_years=15),
+    ConvictionWindow(no_sexual_intercourse_w_animal, within_years=15),
+    ConvictionWindow(no_failure_to_register, within_years=15),
+    ConvictionWindow(no_weapons_of_escape, within_years=15),
+    ConvictionWindow(no_abuse_of_corpse, within_years=15),
+    ConvictionWindow(no_paramilitary_training, within_years=15),
+]
+
+
 def full_record_requirements_for_petition_sealing(crecord: CRecord) -> Decision:
     """
     To seal a case or charge by petition, there are requirements that the record as a whole must satisfy. 
 
     This function makes the Decisions that evaluate whether the record meets these requirements. 
+
+    If the current Analysis isn't explaining its decisions, this stops at the first requirement the record doesn't meet.
     """
     decision = Decision(name="Sealing requirements that relate to the whole record.")
-    decision.reasoning = [
-        ten_years_since_last_conviction_for_m_or_f(crecord),  # 18 Pa.C.S. 9122.1(a)
-        # fines_and_costs_paid(crecord),  # 18 Pa.C.S. 9122.1(a)
-        no_f1_convictions(crecord),  # 18 Pa.C.S. 9122.1(b)(2)(i)
-        no_danger_to_person_offense(
-            crecord, penalty_limit=7, conviction_limit=1, within_years=20
-        ),
-        no_offense_against_family(
-            crecord, penalty_limit=7, conviction_limit=1, within_years=20
-        ),
-        no_firearms_offense(
-            crecord, penalty_limit=7, conviction_limit=1, within_years=20
-        ),
-        no_sexual_offense(
-            crecord, penalty_limit=7, conviction_limit=1, within_years=20
-        ),
-        no_offenses_punishable_by_two_or_more_years(
-            crecord, conviction_limit=4, within_years=20
-        ),
-        no_offenses_punishable_by_more_than_two_years(
-            crecord, conviction_limit=2, within_years=15
-        ),
-        no_indecent_exposure(crecord, conviction_limit=1, within_years=15),
-        no_sexual_intercourse_w_animal(crecord, conviction_limit=1, within_years=15),
-        no_failure_to_register(crecord, conviction_limit=1, within_years=15),
-        no_weapons_of_escape(crecord, conviction_limit=1, within_years=15),
-        no_abuse_of_corpse(crecord, conviction_limit=1, within_years=15),
-        no_paramilitary_training(crecord, conviction_limit=1, within_years=15),
-    ]
-    decision.value = all(decision.reasoning)
+    decision.reasoning, decision.value = decide_all(
+        [
+            functools.partial(
+                ten_years_since_last_conviction_for_m_or_f, crecord
+            ),  # 18 Pa.C.S. 9122.1(a)
+            # functools.partial(fines_and_costs_paid, crecord),  # 18 Pa.C.S. 9122.1(a)
+            functools.partial(no_f1_convictions, crecord),  # 18 Pa.C.S. 9122.1(b)(2)(i)
+        ]
+        + [
+            functools.partial(window.decide, crecord)
+            for window in PETITION_SEALING_WINDOWS
+        ]
+    )
     return decision
 
 
@@ -1449,6 +1490,7 @@ def petition_sealing_for_single_case(case: Case) -> Decision:
     return case_decision
 
 
+@memoize_charge_rule
 def petition_sealing_for_single_charge(charge: Charge):
     """
     Decide whether a single charge is sealable.
@@ -1481,6 +1523,7 @@ def petition_sealing_for_single_charge(charge: Charge):
     return charge_decision
 
 
+@memoize_charge_rule
 def cannot_autoseal_m1_or_f(charge: Charge):
     """
     Autosealing is never possible for M1 or F convictions.
@@ -1497,7 +1540,7 @@ def cannot_autoseal_m1_or_f(charge: Charge):
         )
         return dec
 
-    val = not Charge.grade_GTE(charge.grade, "M1")
+    val = charge.grade_ordinal < Grade.M1
     dec.value = val
     less_or_more = "less" if val else "more"
     dec.reasoning = (
@@ -1515,7 +1558,7 @@ def no_m1_or_higher_in_this_case(case: Case) -> Decision:
         name="Are there any convictions for M1 or more severe offenses in this case?"
     )
     serious_charges = [
-        c for c in case.charges if c.is_conviction() and Charge.grade_GTE(c.grade, "M1")
+        c for c in case.charges if c.is_conviction() and c.grade_ordinal >= Grade.M1
     ]
     decision.value = False if len(serious_charges) > 0 else True
     decision.reasoning = f"There are {len(serious_charges)} charges graded M1 or more severe in the case {case.docket_number}."
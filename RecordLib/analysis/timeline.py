@@ -0,0 +1,374 @@
+"""
+When will parts of a record become eligible for sealing or expungement?
+
+Many requirements for sealing and expungement are about time: a record can't be sealed with a conviction in the last
+10 years, or with two or more M1 convictions in the last 15 years, and so on. Those requirements stop blocking a
+record on a predictable date, as long as the person doesn't get new convictions.
+
+An `EligibilityTimeline` collects the dates of the events in a record that these requirements care about (dispositions,
+arrests, releases from confinement), and works out the date each requirement will be met. It does this in one pass
+over the record, instead of re-running an analysis as of different dates.
+
+The timeline only knows about time. If a case can't be sealed for some other reason, like an excluded offense,
+the timeline reports that it won't become eligible, by returning None.
+"""
+from __future__ import annotations
+from typing import Callable, Dict, List, Optional
+from dataclasses import dataclass
+from datetime import date
+import logging
+from dateutil.relativedelta import relativedelta
+from RecordLib.crecord import CRecord, Case, Charge, Grade, RecordIndex
+from RecordLib.crecord.helpers import today
+from RecordLib.analysis.ruledefs import simple_sealing_rules as ssr
+from RecordLib.analysis.ruledefs import simple_expungement_rules as ser
+
+logger = logging.getLogger(__name__)
+
+
+def anniversary(day: date, years: int) -> date:
+    """
+    The date `years` years after `day`.
+    """
+    return day + relativedelta(years=years)
+
+
+@dataclass
+class WindowedRequirement:
+    """
+    A requirement that a record have fewer than `conviction_limit` of some kind of conviction within the last
+    `within_years` years.
+
+    Attributes:
+        name: Describes the requirement.
+        applies_to: True for charges that count against the requirement.
+        event_date: The date a charge counts from. If this is None, we can't tell when the charge stops counting.
+        within_years: Charges count against the requirement until this many years have passed since the event date.
+        conviction_limit: The requirement is met if fewer than this many charges count against it.
+        strict: If True, charges count until _more_ than `within_years` have passed.
+    """
+
+    name: str
+    applies_to: Callable[[Charge], bool]
+    event_date: Callable[[Case, Charge], Optional[date]]
+    within_years: int
+    conviction_limit: int = 1
+    strict: bool = False
+
+    def years_counted(self) -> int:
+        """ Years after its event date that a charge stops counting against the requirement. """
+        return self.within_years + 1 if self.strict else self.within_years
+
+
+def _disposition_date(case: Case, charge: Charge) -> Optional[date]:
+    return case.disposition_date
+
+
+def _charge_disposition_date(case: Case, charge: Charge) -> Optional[date]:
+    return charge.disposition_date or case.disposition_date
+
+
+def _conviction_for(section: float) -> Callable[[Charge], bool]:
+    def applies_to(charge: Charge) -> bool:
+        return (
+            charge.is_conviction()
+            and charge.get_statute_chapter() == 18
+            and charge.get_statute_section() == section
+        )
+
+    return applies_to
+
+
+def _conviction_graded(grade: Grade) -> Callable[[Charge], bool]:
+    def applies_to(charge: Charge) -> bool:
+        return charge.is_conviction() and charge.grade_ordinal >= grade
+
+    return applies_to
+
+
+# What counts against each of `ssr.PETITION_SEALING_WINDOWS`: a description of the convictions, which charges are
+# those convictions, and when they count from. The offense-specific requirements reuse the charge-level rules, with an
+# infinite window, to find the charges that could count against them.
+_WINDOW_CONVICTIONS = {
+    ssr.no_danger_to_person_offense: (
+        "Article B offenses",
+        lambda charge: not ssr.no_danger_to_person_offense(
+            charge, within_years=float("inf")
+        ),
+        lambda case, charge: case.arrest_date or case.disposition_date,
+    ),
+    ssr.no_offense_against_family: (
+        "offenses against the family",
+        lambda charge: not ssr.no_offense_against_family(
+            charge, within_years=float("inf")
+        ),
+        lambda case, charge: case.arrest_date,
+    ),
+    ssr.no_firearms_offense: (
+        "firearms offenses",
+        lambda charge: not ssr.no_firearms_offense(charge, within_years=float("inf")),
+        _charge_disposition_date,
+    ),
+    ssr.no_sexual_offense: (
+        "sexual offenses",
+        lambda charge: not ssr.no_sexual_offense(charge, within_years=float("inf")),
+        _charge_disposition_date,
+    ),
+    ssr.no_offenses_punishable_by_two_or_more_years: (
+        "offenses punishable by two or more years",
+        _conviction_graded(Grade.M2),
+        _disposition_date,
+    ),
+    ssr.no_offenses_punishable_by_more_than_two_years: (
+        "offenses punishable by more than two years",
+        _conviction_graded(Grade.M1),
+        _disposition_date,
+    ),
+    ssr.no_indecent_exposure: (
+        "indecent exposure",
+        _conviction_for(3127),
+        _disposition_date,
+    ),
+    ssr.no_sexual_intercourse_w_animal: (
+        "sexual intercourse with an animal",
+        _conviction_for(3129),
+        _disposition_date,
+    ),
+    ssr.no_failure_to_register: (
+        "failure to register",
+        lambda charge: not ssr.no_failure_to_register(charge),
+        _disposition_date,
+    ),
+    ssr.no_weapons_of_escape: (
+        "weapons of escape",
+        _conviction_for(5122),
+        _disposition_date,
+    ),
+    ssr.no_abuse_of_corpse: (
+        "abuse of corpse",
+        _conviction_for(5510),
+        _disposition_date,
+    ),
+    ssr.no_paramilitary_training: (
+        "paramilitary training",
+        _conviction_for(5515),
+        _disposition_date,
+    ),
+}
+
+
+def windowed_requirement(window: ssr.ConvictionWindow) -> WindowedRequirement:
+    """
+    The WindowedRequirement that tracks when a record will meet one of `ssr.PETITION_SEALING_WINDOWS`.
+    """
+    description, applies_to, event_date = _WINDOW_CONVICTIONS[window.rule]
+    limit = "No"
+    if window.conviction_limit > 1:
+        limit = f"Fewer than {window.conviction_limit}"
+    return WindowedRequirement(
+        name=f"{limit} {description} in {window.within_years} years",
+        applies_to=applies_to,
+        event_date=event_date,
+        within_years=window.within_years,
+        conviction_limit=window.conviction_limit,
+    )
+
+
+# The time-limited requirements of `ssr.full_record_requirements_for_petition_sealing`.
+PETITION_SEALING_REQUIREMENTS = [
+    WindowedRequirement(
+        name=f"Free of conviction for {ssr.YEARS_FREE_OF_CONVICTION} years",
+        applies_to=_conviction_graded(Grade.M3),
+        event_date=_disposition_date,
+        within_years=ssr.YEARS_FREE_OF_CONVICTION,
+        strict=True,
+    ),
+] + [windowed_requirement(window) for window in ssr.PETITION_SEALING_WINDOWS]
+
+
+class EligibilityTimeline:
+    """
+    The dates when parts of a record become eligible for sealing or expungement, if there are no new convictions.
+
+    Every method returns the date something becomes eligible, which is `as_of` if it is eligible already, or None if
+    it won't become eligible just by waiting (or if we can't tell when it will).
+
+    Args:
+        crecord: A criminal record.
+        as_of: The date to consider "today". Defaults to today.
+    """
+
+    def __init__(self, crecord: CRecord, as_of: Optional[date] = None) -> None:
+        self.crecord = crecord
+        self.as_of = as_of or today()
+        # The dates of the events that count against each requirement, most recent first.
+        # A None date means we can't tell when the event happened.
+        self.events: Dict[str, List[Optional[date]]] = {
+            req.name: [] for req in PETITION_SEALING_REQUIREMENTS
+        }
+        convictions = []
+        for case in crecord.cases:
+            for charge in case.charges:
+                if not charge.is_conviction():
+                    continue
+                convictions.append((case, charge))
+                for req in PETITION_SEALING_REQUIREMENTS:
+                    try:
+                        applies = req.applies_to(charge)
+                    except (TypeError, AttributeError):
+                        applies = False
+                    if applies:
+                        self.events[req.name].append(req.event_date(case, charge))
+        for dates in self.events.values():
+            dates.sort(key=lambda d: date.max if d is None else d, reverse=True)
+        self._convictions = convictions
+        self._petition_sealing_date = None
+        self._petition_sealing_date_known = False
+
+    def requirement_met_on(self, requirement: WindowedRequirement) -> Optional[date]:
+        """
+        The date when `requirement` will be met.
+        """
+        dates = self.events[requirement.name]
+        if len(dates) < requirement.conviction_limit:
+            return self.as_of
+        # The requirement is met once the `conviction_limit`-th most recent event is old enough.
+        limiting_date = dates[requirement.conviction_limit - 1]
+        if limiting_date is None:
+            return None
+        return max(self.as_of, anniversary(limiting_date, requirement.years_counted()))
+
+    def petition_sealing_date(self) -> Optional[date]:
+        """
+        The date when the whole record will meet the requirements for sealing by petition.
+        """
+        if not self._petition_sealing_date_known:
+            self._petition_sealing_date = self._find_petition_sealing_date()
+            self._petition_sealing_date_known = True
+        return self._petition_sealing_date
+
+    def _find_petition_sealing_date(self) -> Optional[date]:
+        if not ssr.no_f1_convictions(self.crecord):
+            return None
+        dates = [
+            self.requirement_met_on(req) for req in PETITION_SEALING_REQUIREMENTS
+        ]
+        if any(d is None for d in dates):
+            return None
+        return max(dates)
+
+    def case_sealing_date(self, case: Case) -> Optional[date]:
+        """
+        The date when at least part of `case` can be sealed by petition.
+        """
+        if ssr.petition_sealing_for_single_case(case).value[1] is None:
+            return None
+        return self.petition_sealing_date()
+
+    def autosealing_date(self, case: Case, charge: Charge) -> Optional[date]:
+        """
+        The date when a conviction in `case` will be sealed automatically.
+
+        Convictions are autosealed 10 years after their disposition, if there are no further convictions.
+        """
+        if not charge.is_conviction() or case.disposition_date is None:
+            return None
+        later_convictions = [
+            c.disposition_date
+            for c, ch in self._convictions
+            if c.disposition_date is not None
+            and c.disposition_date > case.disposition_date
+        ]
+        if (
+            len(later_convictions) > 0
+            and min(later_convictions) < anniversary(case.disposition_date, 10)
+        ):
+            return None
+        if not all(
+            [
+                ssr.all_fines_and_costs_paid(self.crecord),
+                ssr.charge_is_not_excluded_from_sealing(charge),
+                ssr.no_m1_or_higher_in_this_case(case),
+                ssr.record_contains_no_convictions_excluded_from_sealing(self.crecord),
+            ]
+        ):
+            return None
+        return max(self.as_of, anniversary(case.disposition_date, 10))
+
+    def last_contact_date(self) -> Optional[date]:
+        """
+        The date of the person's last arrest or prosecution, or None if there is an active case or we can't tell.
+        """
+        if any("Active" in (case.status or "") for case in self.crecord.cases):
+            return None
+        if len(self.crecord.cases) == 0:
+            return date.min
+        last_actions = [case.last_action() for case in self.crecord.cases]
+        try:
+            return max(last_actions)
+        except TypeError:
+            return None
+
+    def summary_expungement_date(self, case: Case) -> Optional[date]:
+        """
+        The date when summary convictions in `case` can be expunged, after 5 years free of arrest or prosecution.
+        """
+        if not any(ser.is_summary_conviction(charge) for charge in case.charges):
+            return None
+        last_contact = self.last_contact_date()
+        if last_contact is None:
+            return None
+        return max(self.as_of, anniversary(last_contact, 6))
+
+    def over_70_expungement_date(self) -> Optional[date]:
+        """
+        The date when the whole record can be expunged because the person is over 70, has been free of arrest or
+        prosecution for 10 years, and was released from confinement more than 10 years ago.
+        """
+        person = self.crecord.person
+        if person is None or person.date_of_birth is None:
+            return None
+        last_contact = self.last_contact_date()
+        index = RecordIndex(self.crecord, as_of=self.as_of)
+        if last_contact is None or index.confinement_unknown:
+            return None
+        dates = [
+            self.as_of,
+            anniversary(person.date_of_birth, 71),
+            anniversary(last_contact, 10),
+        ]
+        if index.final_release is not None:
+            dates.append(anniversary(index.final_release, 11))
+        return max(dates)
+
+    def as_dict(self) -> dict:
+        """
+        The eligibility dates for each rule, for each case (and for autosealing, each charge) in the record.
+
+        Returns:
+            A dict like
+            {
+                "expunge_over_70": date | None,
+                "expunge_summary_convictions": {docket_number: date | None},
+                "seal_convictions": {docket_number: date | None},
+                "autosealing_eligibility": {docket_number: {charge sequence: date | None}},
+            }
+        """
+        return {
+            "expunge_over_70": self.over_70_expungement_date(),
+            "expunge_summary_convictions": {
+                case.docket_number: self.summary_expungement_date(case)
+                for case in self.crecord.cases
+            },
+            "seal_convictions": {
+                case.docket_number: self.case_sealing_date(case)
+                for case in self.crecord.cases
+            },
+            "autosealing_eligibility": {
+                case.docket_number: {
+                    charge.sequence: self.autosealing_date(case, charge)
+                    for charge in case.charges
+                }
+                for case in self.crecord.cases
+            },
+        }
@@ -0,0 +1,9 @@
+from .engine import (
+    SourceBundle,
+    BatchResult,
+    DEFAULT_RULES,
+    analyze_bundle,
+    bundles_from_directory,
+    run_batch,
+)
+from .output import ResultWriter, JsonLinesWriter, CsvWriter, Checkpoint
@@ -0,0 +1,262 @@
+"""
+Parse and analyze the records of many people, in parallel.
+
+Each person's source records are collected in a `SourceBundle`. `run_batch` sends chunks of bundles to a pool of
+worker processes, and each worker parses the sources in its bundles, builds a CRecord, and runs an Analysis.
+Results come back in the order they finish, not the order of the bundles.
+
+A batch can be resumed. If `run_batch` is given a `Checkpoint`, it skips bundles the checkpoint says are finished,
+and adds each bundle to the checkpoint once its result is written.
+"""
+from __future__ import annotations
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+from dataclasses import dataclass, field, asdict
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import date
+from itertools import islice
+import os
+import logging
+import time
+from RecordLib.crecord import CRecord, Person
+from RecordLib.sourcerecords import SourceRecord
+from RecordLib.sourcerecords.docket.re_parse_pdf import re_parse_pdf
+from RecordLib.sourcerecords.summary.parse_pdf import parse_pdf as parse_summary_pdf
+from RecordLib.analysis import Analysis, RuleProfile, summarize
+from RecordLib.analysis import ruledefs as rd
+from RecordLib.utilities.serializers import to_serializable
+
+logger = logging.getLogger(__name__)
+
+
+# The rules that `cleanslate_screen.by_name` applies, in the same order.
+DEFAULT_RULES = (
+    rd.filter_traffic_cases,
+    rd.expunge_deceased,
+    rd.expunge_over_70,
+    rd.expunge_nonconvictions,
+    rd.expunge_summary_convictions,
+    rd.seal_convictions,
+)
+
+
+@dataclass
+class SourceBundle:
+    """
+    The source records for a single person.
+
+    Bundles are sent to worker processes, so the sources and parsers need to be picklable. Module-level parser
+    functions, like the ones in `RecordLib.sourcerecords`, are.
+
+    Attributes:
+        bundle_id: Identifies the bundle in results and checkpoints.
+        sources: (src, parser) pairs, which are used to build a SourceRecord, like `SourceRecord(src, parser)`.
+        person: The person the records are about. If None, the person comes from the sources.
+    """
+
+    bundle_id: str
+    sources: List[Tuple[Any, Callable]] = field(default_factory=list)
+    person: Optional[Person] = None
+
+
+@dataclass
+class BatchResult:
+    """
+    The outcome of analyzing one SourceBundle.
+
+    Attributes:
+        bundle_id: The id of the bundle.
+        person: The person the record is about.
+        cases: The number of cases in the person's record.
+        analysis: The serialized Analysis, or None if the bundle could not be analyzed.
+        summary: The `summarize`-d Analysis, or None if the bundle could not be analyzed.
+        errors: Problems parsing the sources or analyzing the record.
+        elapsed: Seconds spent on this bundle.
+        rule_profiles: What each rule cost, if the bundle was analyzed with profiling.
+    """
+
+    bundle_id: str
+    person: Optional[Person] = None
+    cases: int = 0
+    analysis: Optional[dict] = None
+    summary: Optional[dict] = None
+    errors: List[str] = field(default_factory=list)
+    elapsed: float = 0.0
+    rule_profiles: List[RuleProfile] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        """
+        The result as a dict, for writing as json with `default=to_serializable`.
+        """
+        return {
+            "bundle_id": self.bundle_id,
+            "person": to_serializable(self.person),
+            "cases": self.cases,
+            "analysis": self.analysis,
+            "summary": self.summary,
+            "errors": self.errors,
+            "elapsed": self.elapsed,
+            "rule_profiles": [asdict(profile) for profile in self.rule_profiles],
+        }
+
+    def as_row(self) -> dict:
+        """
+        A flat description of the result, for writing to a csv.
+        """
+        return {
+            "bundle_id": self.bundle_id,
+            "name": self.person.full_name() if self.person is not None else "",
+            "cases": self.cases,
+            "clearable_cases": self.summary["clearable_cases"]
+            if self.summary is not None
+            else "",
+            "clearable_charges": self.summary["clearable_charges"]
+            if self.summary is not None
+            else "",
+            "errors": "; ".join(self.errors),
+        }
+
+
+def bundles_from_directory(directory: str) -> Iterator[SourceBundle]:
+    """
+    Collect a SourceBundle from each subdirectory of `directory`, named for the subdirectory.
+
+    Each subdirectory should contain the pdfs for a single person. Files with "summary" in their names are parsed as
+    summary sheets, and other pdfs are parsed as dockets.
+    """
+    for subdirectory in sorted(os.listdir(directory)):
+        path = os.path.join(directory, subdirectory)
+        if not os.path.isdir(path):
+            continue
+        sources = []
+        for filename in sorted(os.listdir(path)):
+            if not filename.lower().endswith(".pdf"):
+                continue
+            parser = (
+                parse_summary_pdf if "summary" in filename.lower() else re_parse_pdf
+            )
+            sources.append((os.path.join(path, filename), parser))
+        yield SourceBundle(bundle_id=subdirectory, sources=sources)
+
+
+def analyze_bundle(
+    bundle: SourceBundle,
+    rules: Sequence[Callable] = DEFAULT_RULES,
+    as_of: Optional[date] = None,
+    profile: Optional[bool] = None,
+) -> BatchResult:
+    """
+    Parse the sources in a bundle, build a CRecord, and analyze it with `rules`.
+
+    `profile` is passed along to the Analysis, to measure what each rule costs.
+
+    A source that can't be parsed is noted in the result's errors and skipped. If the analysis itself fails, the
+    result has no analysis or summary.
+    """
+    start = time.perf_counter()
+    result = BatchResult(bundle_id=bundle.bundle_id, person=bundle.person)
+    crecord = CRecord(person=bundle.person)
+    for src, parser in bundle.sources:
+        try:
+            sourcerecord = SourceRecord(src, parser)
+        except Exception as err:
+            logger.error("Could not parse %s for %s", src, bundle.bundle_id)
+            result.errors.append(f"Could not parse {src}: {err}")
+            continue
+        result.errors.extend(sourcerecord.errors or [])
+        crecord.add_sourcerecord(sourcerecord)
+    result.person = crecord.person
+    result.cases = len(crecord.cases)
+    try:
+        analysis = Analysis(crecord, as_of=as_of, profile=profile)
+        for rule in rules:
+            analysis = analysis.rule(rule)
+        result.rule_profiles = analysis.rule_profiles
+        result.analysis = to_serializable(analysis)
+        result.summary, summary_errors = summarize(analysis)
+        result.errors.extend(summary_errors)
+    except Exception as err:
+        logger.error("Could not analyze %s", bundle.bundle_id)
+        result.errors.append(f"Could not analyze the record: {err}")
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def _analyze_chunk(
+    chunk: List[SourceBundle],
+    rules: Sequence[Callable],
+    as_of: Optional[date],
+    profile: Optional[bool],
+) -> List[BatchResult]:
+    return [analyze_bundle(bundle, rules, as_of, profile) for bundle in chunk]
+
+
+def _chunks(
+    bundles: Iterable[SourceBundle], chunksize: int
+) -> Iterator[List[SourceBundle]]:
+    bundles = iter(bundles)
+    while True:
+        chunk = list(islice(bundles, chunksize))
+        if len(chunk) == 0:
+            return
+        yield chunk
+
+
+def run_batch(
+    bundles: Iterable[SourceBundle],
+    rules: Sequence[Callable] = DEFAULT_RULES,
+    workers: Optional[int] = None,
+    chunksize: int = 8,
+    writer: Optional["ResultWriter"] = None,
+    checkpoint: Optional["Checkpoint"] = None,
+    as_of: Optional[date] = None,
+    profile: Optional[bool] = None,
+) -> Iterator[BatchResult]:
+    """
+    Analyze many bundles in parallel, yielding each result as it finishes.
+
+    Bundles are read from `bundles` lazily, so it can be a generator over a very large batch. Only a few chunks per
+    worker are waiting to be analyzed at any time.
+
+    Args:
+        bundles: The bundles to analyze.
+        rules: The rules to apply to each record, in order. These need to be picklable.
+        workers: The number of worker processes. Defaults to the number of cpus. If 0, bundles are analyzed in
+            this process, which is handy for debugging.
+        chunksize: The number of bundles to send to a worker at once.
+        writer: If given, each result is written to it as it finishes.
+        checkpoint: If given, bundles that the checkpoint lists as finished are skipped, and each bundle is added
+            to the checkpoint once its result is written.
+        as_of: The date to analyze the records as of. Defaults to today.
+        profile: Whether to measure what each rule costs. See `Analysis`.
+
+    Returns:
+        An iterator of BatchResults, in the order they finish.
+    """
+    if checkpoint is not None:
+        bundles = (b for b in bundles if b.bundle_id not in checkpoint)
+    chunks = _chunks(bundles, chunksize)
+
+    def finished(results: List[BatchResult]) -> Iterator[BatchResult]:
+        for result in results:
+            if writer is not None:
+                writer.write(result)
+            if checkpoint is not None:
+                checkpoint.mark(result.bundle_id)
+            yield result
+
+    if workers == 0:
+        for chunk in chunks:
+            yield from finished(_analyze_chunk(chunk, rules, as_of, profile))
+        return
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for chunk in islice(chunks, workers * 2):
+            pending.add(executor.submit(_analyze_chunk, chunk, rules, as_of, profile))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for chunk in islice(chunks, len(done)):
+                pending.add(executor.submit(_analyze_chunk, chunk, rules, as_of, profile))
+            for future in done:
+                yield from finished(future.result())
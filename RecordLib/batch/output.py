@@ -0,0 +1,113 @@
+"""
+Write the results of a batch as they finish, and keep track of which bundles are finished.
+
+Writers and checkpoints append to their files, so a batch that is resumed adds to the output of the run that crashed.
+"""
+from __future__ import annotations
+from typing import Set
+import abc
+import csv
+import json
+import os
+import logging
+from RecordLib.batch.engine import BatchResult
+from RecordLib.utilities.serializers import to_serializable
+
+logger = logging.getLogger(__name__)
+
+
+class ResultWriter(abc.ABC):
+    """
+    Write BatchResults to a file, one at a time.
+
+    Use a writer as a context manager, or call `close()` when the batch is done. Subclasses implement `write`.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.file = open(path, "a", newline="")
+
+    @abc.abstractmethod
+    def write(self, result: BatchResult) -> None:
+        """
+        Write one result to the file.
+        """
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self) -> ResultWriter:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class JsonLinesWriter(ResultWriter):
+    """
+    Write each BatchResult as a line of json.
+    """
+
+    def write(self, result: BatchResult) -> None:
+        self.file.write(json.dumps(result.as_dict(), default=to_serializable) + "\n")
+        self.file.flush()
+
+
+class CsvWriter(ResultWriter):
+    """
+    Write each BatchResult as a row of a csv, using `BatchResult.as_row()`.
+    """
+
+    FIELDNAMES = [
+        "bundle_id",
+        "name",
+        "cases",
+        "clearable_cases",
+        "clearable_charges",
+        "errors",
+    ]
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        self.writer = csv.DictWriter(self.file, fieldnames=self.FIELDNAMES)
+        if self.file.tell() == 0:
+            self.writer.writeheader()
+
+    def write(self, result: BatchResult) -> None:
+        self.writer.writerow(result.as_row())
+        self.file.flush()
+
+
+class Checkpoint:
+    """
+    The ids of finished bundles, saved to a file with one id per line.
+
+    Args:
+        path: The checkpoint file. If it exists, the ids in it are already finished.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.finished: Set[str] = set()
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                self.finished = set(line.strip() for line in f if line.strip())
+            logger.info(
+                "Resuming from %s, with %d bundles finished.",
+                path,
+                len(self.finished),
+            )
+
+    def __contains__(self, bundle_id: str) -> bool:
+        return bundle_id in self.finished
+
+    def __len__(self) -> int:
+        return len(self.finished)
+
+    def mark(self, bundle_id: str) -> None:
+        """
+        Record that `bundle_id` is finished.
+        """
+        self.finished.add(bundle_id)
+        with open(self.path, "a") as f:
+            f.write(bundle_id + "\n")
@@ -2,8 +2,10 @@ from .address import Address
 from .attorney import Attorney
 from .person import Person
 from .common import Sentence, SentenceLength
+from .grade import Grade
 
 from .charge import Charge
 from .case import Case
 from .crecord import CRecord
+from .record_index import RecordIndex, RecordIndexes, keeping_indexes, record_index
 
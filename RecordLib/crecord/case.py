@@ -3,9 +3,8 @@ from typing import List, Optional
 import logging
 import re
 from datetime import date, datetime
-from dateutil.relativedelta import relativedelta
 from RecordLib.crecord import Charge
-from RecordLib.crecord.helpers import convert_datestring
+from RecordLib.crecord.helpers import convert_datestring, years_since
 
 
 class Case:
@@ -124,7 +123,7 @@ class Case:
     def years_passed_disposition(self) -> int:
         """ The number of years that have passed since the disposition date of this case."""
         try:
-            return relativedelta(date.today(), self.disposition_date).years
+            return years_since(self.disposition_date)
         except Exception:
             return 0
 
@@ -7,17 +7,31 @@ import functools
 import re
 
 from RecordLib.crecord import Sentence
+from RecordLib.crecord.grade import Grade
 from RecordLib.crecord.helpers import date_or_none
 
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=1024)
+def is_conviction_disposition(disposition: str) -> bool:
+    """
+    Is `disposition` the disposition of a conviction?
+
+    There are only a few hundred different dispositions, so the answers are cached.
+    """
+    return re.match("^Guilty", disposition.strip()) is not None
+
+
 @dataclass
 class Charge:
     """
     Track information about a charge
     """
 
+    # A slot keeps the Grade of `grade` out of the charge's __dict__, which is what gets serialized.
+    __slots__ = ("__dict__", "__weakref__", "_grade_ordinal")
+
     offense: str
     grade: str
     statute: str
@@ -42,24 +56,41 @@ class Charge:
         
         Examples:
             grade_GTE("M1", "S") == True
-            grade_GTE("S","") == False
+            grade_GTE("S","") == True
         """
-        grades = ["", "S", "M", "IC", "M3", "M2", "M1", "F", "F3", "F2", "F1"]
-        try:
-            i_a = grades.index(grade_a)
-        except ValueError:
-            logger.error(
-                f"Couldn't understand the first grade, {grade_a}, so assuming it has low seriousness."
-            )
-            i_a = 0
-        try:
-            i_b = grades.index(grade_b)
-        except:
-            logger.error(
-                f"Couldn't understand the second grade, {grade_b}, so assuming it has low seriousness."
-            )
-            i_b = 0
-        return i_a >= i_b
+        return Grade.from_str(grade_a) >= Grade.from_str(grade_b)
+
+    @staticmethod
+    def grades_GTE(grades: List[str], grade_b: str) -> List[bool]:
+        """
+        Vectorized version of `grade_GTE`, comparing many grades against a single grade.
+
+        Args:
+            grades: A list of grades like "M1", "F2", "S", etc.
+            grade_b: The grade to compare each of `grades` to.
+
+        Returns:
+            A list with True for each grade in `grades` that is the same grade as or more serious than grade_b
+        """
+        limit = Grade.from_str(grade_b)
+        return [ordinal >= limit for ordinal in Grade.ordinals(grades)]
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name == "grade":
+            # The ordinal of the new grade is worked out the next time it's needed.
+            super().__setattr__("_grade_ordinal", None)
+
+    @property
+    def grade_ordinal(self) -> Grade:
+        """
+        The seriousness of this charge's grade, as a `Grade`.
+
+        It's worked out once, and again only if the charge's grade changes.
+        """
+        if self._grade_ordinal is None:
+            self._grade_ordinal = Grade.from_str(self.grade)
+        return self._grade_ordinal
 
     @staticmethod
     def from_dict(dct: dict) -> Charge:
@@ -165,10 +196,7 @@ class Charge:
         if self.disposition is None:
             logger.warning("No disposition.")
             return False
-        if re.match("^Guilty", self.disposition.strip()):
-            return True
-        else:
-            return False
+        return is_conviction_disposition(self.disposition)
 
     def get_statute_chapter(self) -> Optional[float]:
         """ Get the Chapter in the PA Code that this charge is related to. 
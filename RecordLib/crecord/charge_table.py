@@ -0,0 +1,128 @@
+"""
+A columnar table of the charges in many people's criminal records.
+
+Triaging a cohort of people means asking the same record-level questions (any felony convictions in the last five
+years? two or more M1 convictions in the last 15?) about every person. Asking them one CRecord at a time walks
+every charge of every person for every question. A `ChargeTable` walks the cohort once, keeping what those
+questions need in NumPy arrays with one row per charge. Each question is then answered for all people at once,
+with a few array comparisons and a group-by count.
+"""
+from __future__ import annotations
+from typing import Optional, Sequence
+from datetime import date
+import logging
+import re
+import numpy as np
+from RecordLib.crecord.grade import Grade
+from RecordLib.crecord.helpers import today
+from RecordLib.crecord.record_index import conviction_cutoff
+
+logger = logging.getLogger(__name__)
+
+
+# Disposition date ordinal for charges whose case has no disposition date.
+NO_DATE = 0
+
+
+class ChargeTable:
+    """
+    The charges of a cohort of CRecords, in columns.
+
+    Row `i` of each column describes the same charge. People are numbered by their position in `crecords`, and cases
+    are numbered across the whole cohort.
+
+    Like `RecordIndex`, a conviction without a disposition date is treated as if it was disposed of on the table's
+    `as_of` date.
+
+    Attributes:
+        person: Which record the charge is from.
+        case: Which case the charge is from.
+        grade: The `Grade` of the charge, as an integer.
+        title: The title of the statute the charge is under, or nan if unknown.
+        section: The section of the statute the charge is under, or nan if unknown.
+        conviction: Whether the charge is a conviction.
+        murder: Whether the charge's offense is murder.
+        disposition_date: The ordinal (see `date.toordinal`) of the case's disposition date, or NO_DATE.
+
+    Args:
+        crecords: The records of the cohort.
+        as_of: The date to count years back from. Defaults to `helpers.today()`.
+    """
+
+    def __init__(self, crecords: Sequence["CRecord"], as_of: Optional[date] = None) -> None:
+        self.as_of = as_of or today()
+        self.people = len(crecords)
+        person, case, grade, title, section = [], [], [], [], []
+        conviction, murder, disposition_date = [], [], []
+        case_number = 0
+        for person_number, crecord in enumerate(crecords):
+            for a_case in crecord.cases:
+                disposed = (
+                    a_case.disposition_date.toordinal()
+                    if a_case.disposition_date is not None
+                    else NO_DATE
+                )
+                for charge in a_case.charges:
+                    person.append(person_number)
+                    case.append(case_number)
+                    grade.append(charge.grade_ordinal)
+                    title.append(_float_or_nan(charge.get_statute_chapter))
+                    section.append(_float_or_nan(charge.get_statute_section))
+                    conviction.append(charge.is_conviction())
+                    murder.append(
+                        re.match("murder", charge.offense or "", re.IGNORECASE)
+                        is not None
+                    )
+                    disposition_date.append(disposed)
+                case_number += 1
+        self.person = np.array(person, dtype=np.int64)
+        self.case = np.array(case, dtype=np.int64)
+        self.grade = np.array(grade, dtype=np.int8)
+        self.title = np.array(title, dtype=np.float64)
+        self.section = np.array(section, dtype=np.float64)
+        self.conviction = np.array(conviction, dtype=bool)
+        self.murder = np.array(murder, dtype=bool)
+        self.disposition_date = np.array(disposition_date, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.person)
+
+    def per_person(self, mask: np.ndarray) -> np.ndarray:
+        """
+        The number of rows selected by the boolean `mask` for each person.
+        """
+        return np.bincount(self.person[mask], minlength=self.people)
+
+    def convictions(
+        self, grade: Grade = Grade.UNKNOWN, within_years: float = float("inf")
+    ) -> np.ndarray:
+        """
+        A mask of the convictions graded `grade` or higher, disposed of within `within_years` years.
+        """
+        dates = np.where(
+            self.disposition_date == NO_DATE,
+            self.as_of.toordinal(),
+            self.disposition_date,
+        )
+        cutoff = conviction_cutoff(self.as_of, within_years).toordinal()
+        return (
+            self.conviction & (self.grade >= Grade.from_str(grade)) & (dates > cutoff)
+        )
+
+    def count_convictions(
+        self, grade: Grade = Grade.UNKNOWN, within_years: float = float("inf")
+    ) -> np.ndarray:
+        """
+        The number of convictions graded `grade` or higher within `within_years` years, for each person.
+
+        This is `RecordIndex.count_convictions` for every record at once.
+        """
+        return self.per_person(self.convictions(grade, within_years))
+
+
+def _float_or_nan(getter) -> float:
+    try:
+        value = getter()
+    except TypeError:
+        return np.nan
+    return np.nan if value is None else value
@@ -11,8 +11,9 @@ import logging
 import re
 from dataclasses import asdict
 from datetime import date
-from dateutil.relativedelta import relativedelta
 from RecordLib.crecord import Person, Case, Charge
+from RecordLib.crecord.record_index import record_index
+from RecordLib.crecord.helpers import years_between, years_since
 
 
 def years_between_convictions(crecord: CRecord, case: Case, charge: Charge) -> int:
@@ -37,9 +38,9 @@ def years_between_convictions(crecord: CRecord, case: Case, charge: Charge) -> i
     if len(subsequent_convictions) == 0:
         # There are no convictions after the one we're interested in, so the answer is the
         # years between the start_date and now.
-        return relativedelta(date.today(), start_date).years
+        return years_since(start_date)
     else:
-        return relativedelta(subsequent_convictions[0].last_action(), start_date).years
+        return years_between(start_date, subsequent_convictions[0].last_action())
 
 
 def years_since_last_arrested_or_prosecuted(crecord: CRecord) -> int:
@@ -61,7 +62,7 @@ def years_since_last_arrested_or_prosecuted(crecord: CRecord) -> int:
     cases_ordered = sorted(crecord.cases, key=Case.order_cases_by_last_action)
     last_case = cases_ordered[-1]
     try:
-        return relativedelta(date.today(), last_case.last_action()).years
+        return years_since(last_case.last_action())
     except (ValueError, TypeError):
         return 0
 
@@ -88,9 +89,7 @@ def years_until_n_years_pass_since_last_conviction(crecord, n=10) -> str:
     convictions_sorted = sorted(convictions_only, key=Case.order_cases_by_last_action)
     last_case = convictions_sorted[-1]
     try:
-        time_since_last_action = relativedelta(
-            date.today(), last_case.last_action()
-        ).years
+        time_since_last_action = years_since(last_case.last_action())
         return f"{max(0, n - time_since_last_action)} years"
     except (ValueError, TypeError):
         return "an unknown number of years"
@@ -103,19 +102,7 @@ def years_since_final_release(crecord: CRecord) -> int:
 
     If the record has no cases, the person was never confined, so return "infinity." If we cannot tell, because cases don't identify when confinement ended, return 0.
     """
-    confinement_ends = [
-        c.end_of_confinement() for c in crecord.cases if c.was_confined()
-    ]
-    if len(confinement_ends) == 0:
-        return float("Inf")
-    try:
-        # nb. relativedelta(a, b) = c
-        # if a is before b, then c is negative. if a is after b, c is positive.
-        # relativedelta(today, yesterday) > 0
-        # relativedelta(yesterday, today) < 0
-        return max(relativedelta(date.today(), max(confinement_ends)).years, 0)
-    except (ValueError, TypeError):
-        return 0
+    return record_index(crecord).years_since_final_release()
 
 
 class CRecord:
@@ -0,0 +1,112 @@
+"""
+An ordinal type for the grades of charges.
+
+Grades show up in dockets and summaries spelled in a handful of different ways
+("M1", "M-1", "Misd 1", "F", "Felony", ...). `Grade` normalizes those spellings
+to a single integer ordering, so that comparing the seriousness of two charges
+is a plain integer comparison.
+"""
+from __future__ import annotations
+from enum import IntEnum
+from typing import Iterable, List, Optional, Union
+import functools
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+
+class Grade(IntEnum):
+    """
+    Grades of charges, ordered from least to most serious.
+
+    The ordering follows the one RecordLib has always used for comparing grades:
+    an unknown grade is the least serious, then summaries, ungraded misdemeanors,
+    IC, graded misdemeanors, ungraded felonies, and graded felonies.
+
+    Examples:
+        Grade.from_str("M1") > Grade.from_str("S")
+        Grade.from_str("M-1") == Grade.M1
+    """
+
+    UNKNOWN = 0
+    S = 1
+    M = 2
+    IC = 3
+    M3 = 4
+    M2 = 5
+    M1 = 6
+    F = 7
+    F3 = 8
+    F2 = 9
+    F1 = 10
+
+    @staticmethod
+    def normalize(grade: Optional[str]) -> str:
+        """
+        Reduce a grade as written in a docket to the key used in GRADE_SPELLINGS.
+
+        Whitespace, dashes and periods are removed, and the grade is upper-cased.
+        """
+        if grade is None:
+            return ""
+        return re.sub(r"[\s\-\.]", "", str(grade)).upper()
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def from_str(grade: Optional[str]) -> Grade:
+        """
+        Find the Grade that a grade string describes.
+
+        Unrecognized grades are treated as having low seriousness, i.e. `Grade.UNKNOWN`.
+
+        Args:
+            grade: A grade like "M1", "F2", "S", "Misd 1", etc.
+
+        Returns:
+            The Grade for `grade`.
+        """
+        if isinstance(grade, Grade):
+            return grade
+        normalized = Grade.normalize(grade)
+        try:
+            return GRADE_SPELLINGS[normalized]
+        except KeyError:
+            logger.error(
+                f"Couldn't understand the grade, {grade}, so assuming it has low seriousness."
+            )
+            return Grade.UNKNOWN
+
+    @staticmethod
+    def ordinals(grades: Iterable[Union[str, Grade, None]]) -> List[int]:
+        """
+        Convert a sequence of grades to a list of their integer ordinals.
+
+        The result can be compared element-wise against a Grade, for example
+        with `numpy.array(Grade.ordinals(grades)) >= Grade.M1`.
+        """
+        return [int(Grade.from_str(g)) for g in grades]
+
+
+# Spellings of grades that appear in dockets and summaries, after normalization
+# with `Grade.normalize`.
+GRADE_SPELLINGS = {
+    "": Grade.UNKNOWN,
+    "S": Grade.S,
+    "SUM": Grade.S,
+    "SUMM": Grade.S,
+    "SUMMARY": Grade.S,
+    "M": Grade.M,
+    "MISD": Grade.M,
+    "MISDEMEANOR": Grade.M,
+    "IC": Grade.IC,
+    "F": Grade.F,
+    "FEL": Grade.F,
+    "FELONY": Grade.F,
+}
+for _degree in ["1", "2", "3"]:
+    for _prefix in ["M", "MISD", "MISDEMEANOR"]:
+        GRADE_SPELLINGS[_prefix + _degree] = Grade["M" + _degree]
+    for _prefix in ["F", "FEL", "FELONY"]:
+        GRADE_SPELLINGS[_prefix + _degree] = Grade["F" + _degree]
+del _degree, _prefix
@@ -1,9 +1,67 @@
-from typing import Union
+from typing import Optional, Union
+from contextlib import contextmanager
 from datetime import datetime, date
+import calendar
+import contextvars
 import logging
 
 logger = logging.getLogger(__name__)
 
+# The date that calculations like "how many years ago was this disposition?" count from.
+# None means today. See `as_of`.
+_as_of_date = contextvars.ContextVar("as_of_date", default=None)
+
+
+def today() -> date:
+    """
+    The date that year-difference helpers count from. This is today, unless it has been fixed with `as_of`.
+    """
+    return _as_of_date.get() or date.today()
+
+
+@contextmanager
+def as_of(day: Optional[date]):
+    """
+    Inside a `with` block, fix the date `today()` returns, so that a long-running analysis gets the
+    same answers even if it runs past midnight. If `day` is None, `today()` is the actual date.
+    """
+    token = _as_of_date.set(day)
+    try:
+        yield day
+    finally:
+        _as_of_date.reset(token)
+
+
+def years_between(earlier: Optional[date], later: Optional[date]) -> int:
+    """
+    The number of whole years from `earlier` to `later`, or a negative number if `later` comes first.
+
+    This is the same as `dateutil.relativedelta.relativedelta(later, earlier).years`, including
+    treating Feb. 28 as the anniversary of Feb. 29 in years that aren't leap years, and returning 0 if either
+    date is None. It's just integer arithmetic, though, so its much faster.
+    """
+    if earlier is None or later is None:
+        return 0
+    start = (earlier.year, earlier.month, earlier.day)
+    end = (later.year, later.month, later.day)
+    # Count anniversaries of `start`, stepping towards `end`.
+    step = 1 if start <= end else -1
+    years = abs(end[0] - start[0])
+    anniversary = start[1:]
+    if anniversary == (2, 29) and not calendar.isleap(end[0]):
+        anniversary = (2, 28)
+    if step * ((end[1:] > anniversary) - (end[1:] < anniversary)) < 0:
+        # The last anniversary would overshoot `end`.
+        years -= 1
+    return step * years
+
+
+def years_since(day: Optional[date]) -> int:
+    """
+    The number of whole years from `day` to `today()`. Returns 0 if `day` is None.
+    """
+    return years_between(day, today())
+
 
 def convert_datestring(datestring: Union[str, date, datetime, None]) -> date:
     """
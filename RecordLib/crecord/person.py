@@ -3,9 +3,8 @@ from dataclasses import dataclass
 from typing import List, Optional
 from datetime import date
 import logging
-from dateutil.relativedelta import relativedelta
 from RecordLib.crecord import Address
-from RecordLib.crecord.helpers import convert_datestring
+from RecordLib.crecord.helpers import convert_datestring, years_since
 
 logger = logging.getLogger(__name__)
 
@@ -44,21 +43,13 @@ class Person:
         """ Age in years """
         if self.date_of_birth is None:
             return 0
-        today = date.today()
-        return (
-            today.year
-            - self.date_of_birth.year
-            - (
-                (today.month, today.day)
-                < (self.date_of_birth.month, self.date_of_birth.day)
-            )
-        )
+        return years_since(self.date_of_birth)
 
     def years_dead(self) -> float:
         """Return number of years dead a person is. Or -Infinity, if alive.
         """
         if self.date_of_death:
-            return relativedelta(date.today(), self.date_of_death).years
+            return years_since(self.date_of_death)
         else:
             return float("-Inf")
 
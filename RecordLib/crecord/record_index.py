@@ -0,0 +1,173 @@
+"""
+An index of the dates in a criminal record, for answering questions like "how many convictions graded M1 or
+higher happened in the last 15 years?"
+
+Lots of sealing rules ask questions like that, and each one used to walk every charge in the record
+and work out how many years had passed since each disposition. A `RecordIndex` walks the record once, and
+keeps the disposition dates of convictions sorted, so each question is a binary search.
+
+Rules get the index of a record with `record_index`. Inside `keeping_indexes` (which an Analysis uses while it
+applies its rules), each record is indexed only once per date, and later questions about it reuse the index.
+"""
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+from bisect import bisect_right
+from datetime import date
+import contextvars
+import logging
+from dateutil.relativedelta import relativedelta
+from RecordLib.crecord.grade import Grade
+from RecordLib.crecord.helpers import today, years_between
+
+logger = logging.getLogger(__name__)
+
+
+def conviction_cutoff(as_of: date, within_years: float) -> date:
+    """
+    The latest disposition date that is _not_ within `within_years` years of `as_of`.
+    """
+    if within_years == float("inf") or within_years > as_of.year:
+        return date.min
+    return as_of - relativedelta(years=int(within_years))
+
+
+class RecordIndex:
+    """
+    Conviction dates and confinement dates from a CRecord.
+
+    For each Grade `g`, the index keeps a sorted list of the disposition dates of convictions graded `g` or higher.
+    A conviction is counted "within `y` years" if fewer than `y` whole years have passed since its disposition,
+    the same as `Case.years_passed_disposition`. Like that method, a conviction without a disposition date is
+    treated as if it was disposed of today.
+
+    The index is a snapshot. If the record changes, build a new index.
+
+    Args:
+        crecord: The criminal record to index.
+        as_of: The date to count years back from. Defaults to `helpers.today()`.
+    """
+
+    def __init__(self, crecord: "CRecord", as_of: Optional[date] = None) -> None:
+        self.as_of = as_of or today()
+        disposition_dates_by_grade = [[] for _ in Grade]
+        confinement_ends = []
+        self.confinement_unknown = False
+        for case in crecord.cases:
+            for charge in case.charges:
+                if charge.is_conviction():
+                    disposition_dates_by_grade[charge.grade_ordinal].append(
+                        case.disposition_date or self.as_of
+                    )
+            try:
+                if case.was_confined():
+                    confinement_ends.append(case.end_of_confinement())
+            except (ValueError, TypeError, AttributeError):
+                self.confinement_unknown = True
+        # self._convictions[g] holds the dates of convictions graded g or higher.
+        self._convictions: List[List[date]] = []
+        at_least = []
+        for dates in reversed(disposition_dates_by_grade):
+            at_least = at_least + dates
+            self._convictions.insert(0, sorted(at_least))
+        try:
+            self.final_release = max(confinement_ends) if confinement_ends else None
+        except TypeError:
+            self.final_release = None
+            self.confinement_unknown = True
+
+    def cutoff(self, within_years: float) -> date:
+        """
+        The latest disposition date that is _not_ within `within_years` years of the index's `as_of` date.
+        """
+        return conviction_cutoff(self.as_of, within_years)
+
+    def convictions(
+        self, grade: Grade = Grade.UNKNOWN, within_years: float = float("inf")
+    ) -> List[date]:
+        """
+        The disposition dates of convictions graded `grade` or higher, within `within_years` years, earliest first.
+        """
+        dates = self._convictions[Grade.from_str(grade)]
+        return dates[bisect_right(dates, self.cutoff(within_years)) :]
+
+    def count_convictions(
+        self, grade: Grade = Grade.UNKNOWN, within_years: float = float("inf")
+    ) -> int:
+        """
+        The number of convictions graded `grade` or higher within `within_years` years.
+        """
+        dates = self._convictions[Grade.from_str(grade)]
+        return len(dates) - bisect_right(dates, self.cutoff(within_years))
+
+    def years_since(self, day: date) -> int:
+        """
+        Whole years between `day` and the index's `as_of` date.
+        """
+        return years_between(day, self.as_of)
+
+    def years_since_final_release(self) -> int:
+        """
+        How many years since a person's final release from confinement or supervision?
+
+        See `crecord.years_since_final_release`.
+        """
+        if self.confinement_unknown:
+            return 0
+        if self.final_release is None:
+            return float("Inf")
+        return max(self.years_since(self.final_release), 0)
+
+
+class RecordIndexes:
+    """
+    The RecordIndexes that have been built for records, by record and `as_of` date.
+
+    Records are recognized by identity, so a record must not change while its index is kept. An Analysis keeps
+    the indexes of the records its rules read, which don't change while it applies them.
+
+    Attributes:
+        built: The number of indexes that have been built.
+    """
+
+    def __init__(self) -> None:
+        # The record is kept along with its index, so its id can't be reused by another record.
+        self._indexes: Dict[Tuple[int, date], Tuple["CRecord", RecordIndex]] = {}
+        self.built = 0
+
+    def get(self, crecord: "CRecord", as_of: date) -> RecordIndex:
+        """
+        The index of `crecord` as of `as_of`, building it if it hasn't been built yet.
+        """
+        key = (id(crecord), as_of)
+        kept = self._indexes.get(key)
+        if kept is None:
+            kept = self._indexes[key] = (crecord, RecordIndex(crecord, as_of=as_of))
+            self.built += 1
+        return kept[1]
+
+
+_kept_indexes = contextvars.ContextVar("record_indexes", default=None)
+
+
+@contextmanager
+def keeping_indexes(indexes: Optional[RecordIndexes]):
+    """
+    Inside a `with` block, have `record_index` keep the indexes it builds in `indexes`. If `indexes` is None,
+    `record_index` builds a new index every time.
+    """
+    token = _kept_indexes.set(indexes)
+    try:
+        yield indexes
+    finally:
+        _kept_indexes.reset(token)
+
+
+def record_index(crecord: "CRecord") -> RecordIndex:
+    """
+    The RecordIndex of `crecord` as of `helpers.today()`. See `keeping_indexes`.
+    """
+    indexes = _kept_indexes.get()
+    if indexes is None:
+        return RecordIndex(crecord)
+    return indexes.get(crecord, today())
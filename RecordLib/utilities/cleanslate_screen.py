@@ -7,9 +7,11 @@ from typing import List, Dict, Tuple
 import os
 import re
 import json
+import queue
 import shutil
+import threading
 import requests
-from ujs_search.services.searchujs import search_by_name, search_by_docket
+from RecordLib.utilities.ujs_cache import search_by_name, search_by_docket
 from RecordLib.sourcerecords.parsingutilities import get_text_from_pdf
 from RecordLib.crecord import CRecord, Person
 from RecordLib.sourcerecords import SourceRecord
@@ -71,6 +73,189 @@ def pick_pdf_parser(docket_num):
     return parser
 
 
+# How many documents a screening downloads at once, and how many it extracts the text of at once.
+FETCH_THREADS = 4
+EXTRACT_THREADS = 2
+# How many documents may wait to have their text extracted, or to be parsed.
+QUEUE_SIZE = 8
+
+_DONE = object()
+
+
+def docket_numbers_in(summary_text: str) -> set:
+    """
+    The docket numbers mentioned in the text of a summary.
+    """
+    return set(
+        re.findall(r"(?:MC|CP)\-\d{2}\-\D{2}\-\d*\-\d{4}", summary_text)
+        + re.findall(r"MJ-\d{5}-\D{2}-\d+-\d{4}", summary_text)
+    )
+
+
+class ScreeningPipeline:
+    """
+    Download the documents of a screening's cases, extract their text, and parse the dockets, with the stages
+    running at the same time.
+
+    Fetch threads download documents, extract threads extract the text of the downloaded documents, and the thread
+    that calls `run` parses the dockets. The stages pass documents along in queues. The queues into the extract and
+    parse stages are bounded, so downloading waits if the later stages fall behind. The fetch queue isn't bounded,
+    because the extract stage sends work back to it: as soon as a summary's text is extracted, the dockets it mentions
+    that haven't been seen yet are searched for and downloaded.
+    """
+
+    def __init__(
+        self,
+        search_results: List[Dict],
+        workdir: str,
+        fetch_threads: int = FETCH_THREADS,
+        extract_threads: int = EXTRACT_THREADS,
+        queue_size: int = QUEUE_SIZE,
+    ):
+        # The cases the screening found in the portal, followed by cases found in their summaries.
+        self.cases = list(search_results)
+        self.workdir = workdir
+        self.fetch_threads = fetch_threads
+        self.extract_threads = extract_threads
+        self.fetch_queue = queue.Queue()
+        self.extract_queue = queue.Queue(maxsize=max(queue_size, extract_threads))
+        self.parse_queue = queue.Queue(maxsize=queue_size)
+        self.lock = threading.Lock()
+        self.seen = {case["docket_number"] for case in self.cases}
+        # How many jobs have been queued, but not finished.
+        self.pending = 0
+        self.parsed: Dict[str, SourceRecord] = {}
+
+    def run(self) -> List[Tuple[Dict, SourceRecord]]:
+        """
+        Collect and parse the documents of the cases.
+
+        Returns (case, SourceRecord) pairs of the dockets that could be parsed, in the order of `self.cases`. Each
+        case gets the text of its documents, as "docket_sheet_text" and "summary_text".
+        """
+        for case in self.cases:
+            for source_type in ["docket_sheet", "summary"]:
+                self._add(self.fetch_queue, ("download", case, source_type))
+        if not self.pending:
+            return []
+        threads = [
+            threading.Thread(target=self._work, args=(self.fetch_queue, self._fetch))
+            for _ in range(self.fetch_threads)
+        ] + [
+            threading.Thread(
+                target=self._work, args=(self.extract_queue, self._extract)
+            )
+            for _ in range(self.extract_threads)
+        ]
+        for thread in threads:
+            thread.start()
+        self._work(self.parse_queue, self._parse)
+        for thread in threads:
+            thread.join()
+        return [
+            (case, self.parsed[case["docket_number"]])
+            for case in self.cases
+            if case["docket_number"] in self.parsed
+        ]
+
+    def _add(self, to_queue: queue.Queue, job) -> None:
+        with self.lock:
+            self.pending += 1
+        to_queue.put(job)
+
+    def _finish(self) -> None:
+        with self.lock:
+            self.pending -= 1
+            finished = self.pending == 0
+        if finished:
+            # Each job is finished, so no more will be queued. Let the stages stop.
+            for _ in range(self.fetch_threads):
+                self.fetch_queue.put(_DONE)
+            for _ in range(self.extract_threads):
+                self.extract_queue.put(_DONE)
+            self.parse_queue.put(_DONE)
+
+    def _work(self, from_queue: queue.Queue, do_job) -> None:
+        while True:
+            job = from_queue.get()
+            if job is _DONE:
+                return
+            try:
+                do_job(*job)
+            except Exception as err:
+                logger.error(f"   Screening step {job[0]} failed: {err}")
+            finally:
+                # A job queues the jobs that follow it before it's finished, so the work isn't over too soon.
+                self._finish()
+
+    def _fetch(self, kind: str, *args) -> None:
+        if kind == "search":
+            self._search(*args)
+        else:
+            self._download(*args)
+
+    def _search(self, docket_number: str) -> None:
+        cases = search_by_docket(docket_number)
+        if len(cases) == 0:
+            logger.error(f"Did not find case for docket {docket_number}")
+            return
+        case = cases[0]
+        with self.lock:
+            self.cases.append(case)
+        self._add(self.fetch_queue, ("download", case, "docket_sheet"))
+
+    def _download(self, case: Dict, source_type: str) -> None:
+        case[f"{source_type}_text"] = ""
+        try:
+            resp = requests.get(
+                case[f"{source_type}_url"],
+                headers={"User-Agent": "CleanSlateScreener"},
+            )
+        except requests.exceptions.MissingSchema:
+            # the case search results is missing a url. this happens when
+            # a docket doesn't have a summary, and is fairly common.
+            return
+        if resp.status_code != 200:
+            return
+        filename = os.path.join(
+            self.workdir, f"{case['docket_number']}_{source_type}"
+        )
+        with open(filename, "wb") as fp:
+            fp.write(resp.content)
+        self._add(self.extract_queue, ("extract", case, source_type, filename))
+
+    def _extract(
+        self, kind: str, case: Dict, source_type: str, filename: str
+    ) -> None:
+        text = get_text_from_pdf(filename)
+        case[f"{source_type}_text"] = text
+        if source_type == "docket_sheet":
+            self._add(self.parse_queue, ("parse", case))
+            return
+        # Look for dockets this summary mentions, that aren't among the cases yet.
+        with self.lock:
+            new_docket_numbers = docket_numbers_in(text) - self.seen
+            self.seen.update(new_docket_numbers)
+        if new_docket_numbers:
+            logger.info(
+                f"    Found {len(new_docket_numbers)} cases in a summary "
+                "that were not found through portal."
+            )
+        for docket_number in new_docket_numbers:
+            self._add(self.fetch_queue, ("search", docket_number))
+
+    def _parse(self, kind: str, case: Dict) -> None:
+        parser = pick_pdf_parser(case["docket_number"])
+        if parser is None:
+            return
+        src = SourceRecord(case["docket_sheet_text"], parser)
+        for parsed_case in src.cases:
+            # Adding the docket sheet url back into the cases the sourcerecord parses out.
+            # Here, this will will only be a single case.
+            parsed_case.docket_url = case["docket_sheet_url"]
+        self.parsed[case["docket_number"]] = src
+
+
 def by_name(
     first_name,
     last_name,
@@ -99,101 +284,23 @@ def by_name(
     search_results, errs = search_by_name(first_name, last_name, dob)
     search_results = search_results["MDJ"] + search_results["CP"]
     logger.info(f"    Found {len(search_results)} cases in the Portal.")
-    # Download the source records
-    # and xtract text from the source records.
+    # Download the source records, extract their text, and parse the dockets. Dockets mentioned in the
+    # summaries that the search didn't find are collected too. See ScreeningPipeline.
     with tempfile.TemporaryDirectory() as td:
-        for case in search_results:
-            for source_type in ["docket_sheet", "summary"]:
-                try:
-                    resp = requests.get(
-                        case[f"{source_type}_url"],
-                        headers={"User-Agent": "CleanSlateScreener"},
-                    )
-                except requests.exceptions.MissingSchema as e:
-                    # the case search results is missing a url. this happens when
-                    # a docket doesn't have a summary, and is fairly common.
-                    case[f"{source_type}_text"] = ""
-                    continue
-                if resp.status_code != 200:
-                    case[f"{source_type}_text"] = ""
-                    continue
-                filename = os.path.join(td, f"{case['docket_number']}_{source_type}")
-                with open(filename, "wb") as fp:
-                    fp.write(resp.content)
-                case[f"{source_type}_text"] = get_text_from_pdf(filename)
+        parsed = ScreeningPipeline(search_results, td).run()
         if output_dir is not None:
             for doc in os.listdir(td):
                 shutil.copy(os.path.join(td, doc), os.path.join(output_dir, doc))
+    logger.info("   Collected and parsed texts from cases.")
 
-    logger.info("   Collected texts from cases.")
-    # At this point, search_results looks like a list of search_result dicts,
-    # where each dict also has a key containing the exported text of the docket and the summary.
-    # [
-    #       {
-    #           "caption": "", "docket_number": "", "docket_sheet_text": "lots of \ntext",
-    #           "summary_text": "lots of text" and other keys.
-    #       }
-    # ]
-
-    # Next read through a Summary and find any docket numbers mentioned.
-    # If any dockets are _not_ already found in the source_records,
-    # collect them from ujs, download them, extract their text,
-    docket_nums = set([case["docket_number"] for case in search_results])
-    summary_docket_numbers = set()
-    for case in search_results:
-        summary_text = case["summary_text"]
-        other_docket_nums_in_summary = set(
-            re.findall(r"(?:MC|CP)\-\d{2}\-\D{2}\-\d*\-\d{4}", summary_text)
-            + re.findall(r"MJ-\d{5}-\D{2}-\d+-\d{4}", summary_text)
-        )
-        summary_docket_numbers.update(other_docket_nums_in_summary)
-
-    new_docket_numbers = summary_docket_numbers.difference(docket_nums)
-    logger.info(
-        f"    Searched summaries and found {len(new_docket_numbers)} cases not found through portal."
-    )
-    # Append the new-found docket numbers to the list of search results we need to collect and
-    # add to the crecord we're building here.
-    for dn in new_docket_numbers:
-        cases = search_by_docket(dn)
-        if len(cases) > 0:
-            case = cases[0]
-        else:
-            logger.error(f"Did not find case for docket {dn}")
-            continue
-        search_results.append(case)
-        with tempfile.TemporaryDirectory() as td:
-            for source_type in ["docket_sheet"]:
-                resp = requests.get(
-                    case[f"{source_type}_url"],
-                    headers={"User-Agent": "CleanSlateScreener"},
-                )
-                if resp.status_code != 200:
-                    continue
-                filename = os.path.join(td, case["docket_number"])
-                with open(filename, "wb") as fp:
-                    fp.write(resp.content)
-                case[f"{source_type}_text"] = get_text_from_pdf(filename)
-            if output_dir is not None:
-                for doc in os.listdir(td):
-                    shutil.copy(os.path.join(td, doc), os.path.join(output_dir, doc))
-
-    # Read the source records and integrate them into a CRecord
+    # Integrate the source records into a CRecord
     # representing the person't full criminal record.
     sourcerecords = list()
     crecord = CRecord(
         person=Person(first_name=first_name, last_name=last_name, date_of_birth=dob)
     )
     # building a crecord out of the docket sheets here.
-    for case in search_results:
-        parser = pick_pdf_parser(case["docket_number"])
-        if parser is None:
-            continue
-        src = SourceRecord(case["docket_sheet_text"], parser)
-        for parsed_case in src.cases:
-            # Adding the docket sheet url back into the cases the sourcerecord parses out.
-            # Here, this will will only be a single case.
-            parsed_case.docket_url = case["docket_sheet_url"]
+    for case, src in parsed:
         sourcerecords.append(src)
         crecord.add_sourcerecord(src)
 
@@ -1,8 +1,8 @@
-from typing import Dict, Set, List, Tuple
+from typing import Dict, Set, List, Optional, Tuple
 from RecordLib.crecord import Case
 from RecordLib.petitions import Petition
 from RecordLib.analysis import Analysis, summarize
-from RecordLib.analysis.ruledefs import simple_sealing_rules as ssr
+from RecordLib.analysis.timeline import EligibilityTimeline
 from mako.lookup import TemplateLookup
 from mako.template import Template
 import sendgrid
@@ -27,6 +27,7 @@ class EmailBuilder:
         self.analysis = analysis
         self.counties = None
         self.num_petitions = None
+        self.timeline = None
         summary, errs = summarize(self.analysis)
         self.summary = summary
 
@@ -125,40 +126,27 @@ class EmailBuilder:
                     return petition_type.name
         return ""
 
-    def get_unsealable_until_date(self, case) -> List:
+    def get_timeline(self) -> EligibilityTimeline:
         """
-        Explain whether a case will be sealable after a certain date. 
-
-        In other words, charges that are sealble but-for the charge being too recent. 
+        The dates when parts of the analyzed record will become eligible for sealing or expungement.
         """
+        if self.timeline is None:
+            self.timeline = self.analysis.eligibility_timeline()
+        return self.timeline
 
-        case_sealability = ssr.petition_sealing_for_single_case(case)
-        if case_sealability.value[1] is None:
-            # If the [1] position of the value tuple is None, that means nothing in this case is sealable, when we're
-            # looking just at the case- and charge-specific requirements.
-            # If the case's case- and charge-specific conditions aren't met, then
-            # the date-of-last-conviction cannot be the only reason the case isn't sealable.
-            return None
+    def get_unsealable_until_date(self, case) -> Optional[str]:
+        """
+        Explain whether a case will be sealable after a certain date. 
 
-        crecord = self.analysis.record
-        global_rules = ssr.full_record_requirements_for_petition_sealing(crecord)
-        if (
-            sum(list(map(int, map(bool, global_rules.reasoning))))
-            != len(global_rules.reasoning) - 1
-        ):
-            # If there was not one and only one reason that the record can't be sealed (i.e. the correspoding decision isn't false),
-            # then date-of-last-conviction cannot be the only reason the case isn't sealable.
-            # So here we count the number of True decisions, and if the value isn't one less than the number of decisions,
-            # then the date-of-last-conviction cant be the only reason the case isn't sealable.
-            return None
+        In other words, charges that are sealble but-for the charge being too recent. 
 
-        ten_years_decision = ssr.ten_years_since_last_conviction_for_m_or_f(crecord)
-        if bool(ten_years_decision) is True:
-            # This record passes the ten years since conviction requirement, so
-            # that rule is not what's preventing this case from being sealable.
+        Returns None if the case is sealable already, or if waiting won't make it sealable.
+        """
+        timeline = self.get_timeline()
+        sealable_on = timeline.case_sealing_date(case)
+        if sealable_on is None or sealable_on <= timeline.as_of:
             return None
-
-        return ten_years_decision.reasoning
+        return f"The case may become sealable on {sealable_on.strftime('%B %d, %Y')}."
 
     def get_fees_on_case(self, docket_number) -> int:
         """
@@ -192,7 +180,7 @@ class EmailBuilder:
         traffic_cases = [
             case
             for d in self.analysis.decisions
-            if d.name == "Traffic Court cases removed from consideration."
+            if d.rule_id == "filter_traffic_cases"
             for case in d.value
         ]
         if len(traffic_cases) > 0:
@@ -0,0 +1,325 @@
+"""
+Encode RecordLib objects straight to json text.
+
+`to_json(val)` returns the same text as `json.dumps(to_serializable(val), separators=(",", ":"))`, without building
+the tree of dicts and lists that `to_serializable` returns, and without going through `singledispatch` for every
+value.
+
+The first time a class is encoded, `to_serializable.dispatch` finds out how `to_serializable` would serialize it, and
+that class gets an encoder function. Classes that `to_serializable` serializes from their `__dict__` get an encoder
+that is generated for the attributes their instances have, so it looks up each attribute by name, skips the ones
+that are None, and writes the others with their keys already encoded.
+
+Encoders write chunks of json text to a list. `write_json(val, out)` writes `val` to the list `out`, and
+`to_json(val)` joins the chunks. `iter_json(val)` yields the json a piece at a time, for streaming large records
+without holding all of their json in memory.
+"""
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from datetime import date, timedelta
+from json.encoder import encode_basestring_ascii as encode_str
+import json
+from lxml.etree import _ElementTree
+from RecordLib.analysis import Analysis, Decision, Explanation
+from RecordLib.crecord import SentenceLength
+from RecordLib.sourcerecords import SourceRecord
+from RecordLib.utilities.serializers import to_serializable, ts_object
+
+# An encoder writes json text for a value to a list of chunks. `refs` is None, unless Decisions are being written
+# out only once (see `to_json(compact=True)`). Then `refs` maps the id() of each Decision already written to its "$id"
+# and the Decision. Keeping the Decision keeps its id() from being reused by one that is written later.
+Refs = Dict[int, Tuple[int, Decision]]
+Encoder = Callable[[object, List[str], Optional[Refs]], None]
+
+_encoders: Dict[type, Encoder] = {}
+_layouts: Dict[Tuple[str, ...], Callable] = {}
+
+
+def write_json(val, out: List[str], refs: Optional[Refs] = None) -> None:
+    """
+    Write `val` as json text to the list of chunks `out`.
+    """
+    cls = type(val)
+    if cls is str:
+        out.append(encode_str(val))
+        return
+    encoder = _encoders.get(cls)
+    if encoder is None:
+        encoder = _encoders[cls] = _build_encoder(cls)
+    encoder(val, out, refs)
+
+
+def to_json(val, compact: bool = False) -> str:
+    """
+    Encode `val` as json.
+
+    If `compact` is True, each Decision is written out once, like `to_compact_serializable` does.
+    """
+    out = []
+    write_json(val, out, {} if compact else None)
+    return "".join(out)
+
+
+def iter_json(
+    val, compact: bool = False, depth: int = 3, chunk_size: int = 64 * 1024
+) -> Iterator[str]:
+    """
+    Yield the json of `val` in chunks. The chunks join up to `to_json(val, compact)`.
+
+    Lists, dicts, and objects within `depth` levels of `val` are encoded one item at a time, and a chunk is yielded
+    whenever at least `chunk_size` characters are ready. The default depth reaches each Case of the record in an
+    Analysis, and each Decision of an Analysis, so the json of only about one Case or Decision is in memory at once.
+    """
+    buffer = []
+    size = 0
+    for fragment in _iter_fragments(val, {} if compact else None, depth):
+        buffer.append(fragment)
+        size += len(fragment)
+        if size >= chunk_size:
+            yield "".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def _iter_fragments(val, refs, depth: int) -> Iterator[str]:
+    if depth > 0 and type(val) is not str:
+        encoder = _encoders.get(type(val))
+        if encoder is None:
+            encoder = _encoders[type(val)] = _build_encoder(type(val))
+        iterator = _ITERATORS.get(encoder)
+        if iterator is not None:
+            yield from iterator(val, refs, depth - 1)
+            return
+    out = []
+    write_json(val, out, refs)
+    yield "".join(out)
+
+
+def _iter_list(val, refs, depth):
+    if not val:
+        yield "[]"
+        return
+    sep = "["
+    for item in val:
+        yield sep
+        sep = ","
+        yield from _iter_fragments(item, refs, depth)
+    yield "]"
+
+
+def _iter_dict(val, refs, depth):
+    if not val:
+        yield "{}"
+        return
+    sep = "{"
+    for key, item in val.items():
+        yield sep + _encode_key(key) + ":"
+        sep = ","
+        yield from _iter_fragments(item, refs, depth)
+    yield "}"
+
+
+def _iter_object(val, refs, depth):
+    sep = "{"
+    for key, item in val.__dict__.items():
+        if item is not None:
+            yield sep + encode_str(key) + ":"
+            sep = ","
+            yield from _iter_fragments(item, refs, depth)
+    yield "{}" if sep == "{" else "}"
+
+
+def _iter_analysis(val, refs, depth):
+    yield '{"record":'
+    yield from _iter_fragments(val.record, refs, depth)
+    yield ',"remaining_record":'
+    yield from _iter_fragments(val.remaining_record, refs, depth)
+    yield ',"decisions":'
+    yield from _iter_fragments(val.decisions, refs, depth)
+    yield "}"
+
+
+def _encode_default(val, out, refs):
+    out.append(encode_str(str(val)))
+
+
+def _encode_none(val, out, refs):
+    out.append('""')
+
+
+def _encode_bytes(val, out, refs):
+    out.append('"<bytes>"')
+
+
+def _encode_date(val, out, refs):
+    out.append(encode_str(val.isoformat()))
+
+
+def _encode_list(val, out, refs):
+    if not val:
+        out.append("[]")
+        return
+    sep = "["
+    for item in val:
+        out.append(sep)
+        sep = ","
+        write_json(item, out, refs)
+    out.append("]")
+
+
+def _encode_key(key) -> str:
+    # The same conversions json.dumps makes to dict keys.
+    if isinstance(key, str):
+        return encode_str(key)
+    if key is True:
+        return '"true"'
+    if key is False:
+        return '"false"'
+    if key is None:
+        return '"null"'
+    if isinstance(key, (int, float)):
+        return encode_str(json.dumps(key))
+    raise TypeError(
+        f"keys must be str, int, float, bool or None, not {key.__class__.__name__}"
+    )
+
+
+def _encode_dict(val, out, refs):
+    if not val:
+        out.append("{}")
+        return
+    sep = "{"
+    for key, item in val.items():
+        out.append(sep + _encode_key(key) + ":")
+        sep = ","
+        write_json(item, out, refs)
+    out.append("}")
+
+
+def _encode_explanation(val, out, refs):
+    write_json(val.resolve(), out, refs)
+
+
+def _encode_analysis(val, out, refs):
+    out.append('{"record":')
+    write_json(val.record, out, refs)
+    out.append(',"remaining_record":')
+    write_json(val.remaining_record, out, refs)
+    out.append(',"decisions":')
+    write_json(val.decisions, out, refs)
+    out.append("}")
+
+
+def _encode_sourcerecord(val, out, refs):
+    out.append('{"parser":' + encode_str(str(val.parser.__name__)) + ',"person":')
+    write_json(val.person, out, refs)
+    out.append(',"cases":')
+    write_json(val.cases, out, refs)
+    out.append(',"errors":')
+    # errors aren't passed through to_serializable.
+    out.append(json.dumps(val.errors, separators=(",", ":")))
+    out.append(',"raw_source":')
+    write_json(val.raw_source, out, refs)
+    out.append("}")
+
+
+def _encode_sentencelength(val, out, refs):
+    out.append(
+        f'{{"min_time":{val.min_time.days},"min_unit":"days",'
+        f'"max_time":{val.max_time.days},"max_unit":"days"}}'
+    )
+
+
+def _encode_serialized(val, out, refs):
+    # For serializers without an encoder of their own (e.g., ones registered after this module was written).
+    out.append(
+        json.dumps(to_serializable(val), separators=(",", ":"), default=to_serializable)
+    )
+
+
+def _compile_layout(keys: Tuple[str, ...]) -> Callable:
+    """
+    Generate a function that encodes the __dict__ of an object with the attributes `keys`, in that order.
+    """
+    lines = [
+        "def encode_layout(d, out, refs, sep):",
+        "    append = out.append",
+    ]
+    for key in keys:
+        lines += [
+            f"    v = d[{key!r}]",
+            "    if v is not None:",
+            f"        append(sep + {encode_str(key) + ':'!r})",
+            "        sep = ','",
+            "        if type(v) is str:",
+            "            append(encode_str(v))",
+            "        else:",
+            "            write_json(v, out, refs)",
+        ]
+    lines.append("    append('{}' if sep == '{' else '}')")
+    namespace = {"encode_str": encode_str, "write_json": write_json}
+    exec("\n".join(lines), namespace)
+    return namespace["encode_layout"]
+
+
+def _layout_encoder(d: dict) -> Callable:
+    keys = tuple(d)
+    encoder = _layouts.get(keys)
+    if encoder is None:
+        encoder = _layouts[keys] = _compile_layout(keys)
+    return encoder
+
+
+def _encode_object(val, out, refs):
+    d = val.__dict__
+    _layout_encoder(d)(d, out, refs, "{")
+
+
+def _encode_decision(val, out, refs):
+    if refs is None:
+        _encode_object(val, out, refs)
+        return
+    if id(val) in refs:
+        out.append(f'{{"$ref":{refs[id(val)][0]}}}')
+        return
+    refs[id(val)] = (len(refs), val)
+    out.append(f'{{"$id":{len(refs) - 1}')
+    d = val.__dict__
+    _layout_encoder(d)(d, out, refs, ",")
+
+
+_IMPLEMENTATIONS: Dict[Callable, Encoder] = {
+    to_serializable.registry[object]: _encode_default,
+    to_serializable.registry[type(None)]: _encode_none,
+    to_serializable.registry[bytes]: _encode_bytes,
+    to_serializable.registry[date]: _encode_date,
+    to_serializable.registry[timedelta]: _encode_default,
+    to_serializable.registry[list]: _encode_list,
+    to_serializable.registry[dict]: _encode_dict,
+    to_serializable.registry[Explanation]: _encode_explanation,
+    to_serializable.registry[Analysis]: _encode_analysis,
+    to_serializable.registry[SourceRecord]: _encode_sourcerecord,
+    to_serializable.registry[SentenceLength]: _encode_sentencelength,
+    to_serializable.registry[_ElementTree]: _encode_serialized,
+}
+
+
+def _build_encoder(cls: type) -> Encoder:
+    implementation = to_serializable.dispatch(cls)
+    if implementation is ts_object:
+        return _encode_decision if issubclass(cls, Decision) else _encode_object
+    if issubclass(cls, Decision):
+        # A serializer registered for a particular kind of Decision.
+        return _encode_serialized
+    return _IMPLEMENTATIONS.get(implementation, _encode_serialized)
+
+
+# Encoders of containers, and how to encode the same containers an item at a time. Decisions aren't here, so
+# each Decision is encoded whole, with `_encode_decision`.
+_ITERATORS = {
+    _encode_list: _iter_list,
+    _encode_dict: _iter_dict,
+    _encode_object: _iter_object,
+    _encode_analysis: _iter_analysis,
+}
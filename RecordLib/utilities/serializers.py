@@ -27,6 +27,7 @@ from RecordLib.analysis import (
     RecordEligibilityDecision,
     PetitionDecision,
     FilterDecision,
+    Explanation,
 )
 from RecordLib.sourcerecords import Docket, Summary, SourceRecord
 
@@ -58,11 +59,6 @@ def td_none(n):
     return ""
 
 
-@to_serializable.register(list)
-def ts_list(a_list):
-    return [to_serializable(i) for i in a_list]
-
-
 @to_serializable.register(list)
 def ts_list(l):
     if len(l) == 0:
@@ -86,6 +82,20 @@ def ts_dict(dct):
     return {k: to_serializable(val) for k, val in dct.items()}
 
 
+@to_serializable.register(Analysis)
+def ts_analysis(analysis):
+    return {
+        "record": to_serializable(analysis.record),
+        "remaining_record": to_serializable(analysis.remaining_record),
+        "decisions": to_serializable(analysis.decisions),
+    }
+
+
+@to_serializable.register(Explanation)
+def ts_explanation(explanation):
+    return to_serializable(explanation.resolve())
+
+
 @to_serializable.register(Case)
 @to_serializable.register(Charge)
 @to_serializable.register(Person)
@@ -94,7 +104,6 @@ def ts_dict(dct):
 @to_serializable.register(RecordEligibilityDecision)
 @to_serializable.register(FilterDecision)
 @to_serializable.register(PetitionDecision)
-@to_serializable.register(Analysis)
 @to_serializable.register(Sealing)
 @to_serializable.register(Expungement)
 @to_serializable.register(Attorney)
@@ -116,7 +125,7 @@ def ts_date(a_date):
 
 
 @to_serializable.register(timedelta)
-def ts_date(a_delta):
+def ts_timedelta(a_delta):
     return str(a_delta)
 
 
@@ -129,3 +138,79 @@ def ts_sentencelength(sentence_length):
         "max_unit": "days",
     }
 
+
+def to_compact_serializable(analysis: Analysis) -> dict:
+    """
+    Serialize an Analysis, writing out each Decision only once.
+
+    Rules often share a Decision between many other Decisions. For example, `autosealing_eligibility` puts the same
+    decisions about fines and about excluded convictions in the reasoning for every charge. `to_serializable` writes
+    out a whole copy of a shared Decision everywhere it appears.
+
+    Here, the first time a Decision appears, it is serialized with an "$id" key. Everywhere else it appears, it is
+    serialized as `{"$ref": <id>}`. Use `expand_references` to get back what `to_serializable` would have returned.
+    """
+    # id() of each Decision serialized -> ($id, the Decision). Keeping the Decision keeps its id() from being reused.
+    ids = {}
+
+    def compact(val):
+        if isinstance(val, Decision):
+            if id(val) in ids:
+                return {"$ref": ids[id(val)][0]}
+            ids[id(val)] = (len(ids), val)
+            serialized = {"$id": len(ids) - 1}
+            for k in val.__dict__.keys():
+                v = getattr(val, k)
+                if v is not None:
+                    serialized[k] = compact(v)
+            return serialized
+        if isinstance(val, Explanation):
+            return compact(val.resolve())
+        if isinstance(val, list):
+            return [compact(i) for i in val]
+        if isinstance(val, dict):
+            return {k: compact(v) for k, v in val.items()}
+        return to_serializable(val)
+
+    return {
+        "record": to_serializable(analysis.record),
+        "remaining_record": to_serializable(analysis.remaining_record),
+        "decisions": compact(analysis.decisions),
+    }
+
+
+def expand_references(compacted: dict) -> dict:
+    """
+    Replace the "$ref"s in an Analysis serialized by `to_compact_serializable` with the Decisions they refer to.
+    """
+    by_id = {}
+
+    def collect(val):
+        if isinstance(val, dict):
+            if "$id" in val:
+                by_id[val["$id"]] = val
+            for v in val.values():
+                collect(v)
+        elif isinstance(val, list):
+            for v in val:
+                collect(v)
+
+    expanded = {}
+
+    def expand(val):
+        if isinstance(val, dict):
+            if "$ref" in val:
+                val = by_id[val["$ref"]]
+            if "$id" in val:
+                if val["$id"] not in expanded:
+                    expanded[val["$id"]] = {
+                        k: expand(v) for k, v in val.items() if k != "$id"
+                    }
+                return expanded[val["$id"]]
+            return {k: expand(v) for k, v in val.items()}
+        if isinstance(val, list):
+            return [expand(v) for v in val]
+        return val
+
+    collect(compacted)
+    return expand(compacted)
@@ -0,0 +1,225 @@
+"""
+Cache the results of searching the UJS portal.
+
+`search_by_docket` and `search_by_name` take the same arguments as the functions of the same names in
+`ujs_search.services.searchujs`, and return the same results, but they only ask the portal if the search isn't in
+the cache. Searches are keyed by the normalized docket number, or by the name, date of birth and court searched for.
+
+Searches that find something are kept for FOUND_TIMEOUT seconds, and searches that find nothing are kept for the
+shorter NOT_FOUND_TIMEOUT, because a new case may be filed. Searches that fail, or that the portal reports errors
+for, aren't cached.
+
+The cache is kept in Redis if the UJS_SEARCH_CACHE_URL environment variable is set (e.g.,
+"redis://localhost:6379/2"), and otherwise in the memory of the process. Use `set_store` to keep it somewhere else,
+and `set_portal` to search something other than the UJS portal, such as an `OfflinePortal` for tests.
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from datetime import date, datetime
+import copy
+import logging
+import os
+import pickle
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+FOUND_TIMEOUT = int(os.environ.get("UJS_SEARCH_CACHE_TIMEOUT", 60 * 60 * 24))
+NOT_FOUND_TIMEOUT = int(os.environ.get("UJS_SEARCH_CACHE_NOT_FOUND_TIMEOUT", 60 * 60))
+
+_MISSING = object()
+
+
+class MemoryStore:
+    """
+    Keep cached searches in a dict, until they expire.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Tuple[float, Any]] = {}
+
+    def get(self, key: str, default=None):
+        with self.lock:
+            if key not in self.entries:
+                return default
+            expires, value = self.entries[key]
+            if expires < time.monotonic():
+                del self.entries[key]
+                return default
+            # Copy, so callers that change the results don't change the cache.
+            return copy.deepcopy(value)
+
+    def set(self, key: str, value, timeout: int) -> None:
+        with self.lock:
+            self.entries[key] = (time.monotonic() + timeout, copy.deepcopy(value))
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+class RedisStore:
+    """
+    Keep cached searches in Redis, where they expire on their own.
+    """
+
+    def __init__(self, url: str, prefix: str = "ujs_search:"):
+        # redis is imported here, so that caching in memory doesn't need it.
+        import redis
+
+        self.r = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key: str, default=None):
+        value = self.r.get(self.prefix + key)
+        return default if value is None else pickle.loads(value)
+
+    def set(self, key: str, value, timeout: int) -> None:
+        self.r.set(self.prefix + key, pickle.dumps(value), ex=timeout)
+
+    def clear(self) -> None:
+        for key in self.r.scan_iter(self.prefix + "*"):
+            self.r.delete(key)
+
+
+class OfflinePortal:
+    """
+    A stand-in for the UJS portal, that answers searches from results it's given, and counts the searches.
+
+    `delay` is how many seconds each search takes, so benchmarks can pretend to wait for the portal.
+
+        portal = OfflinePortal(dockets={"CP-51-CR-0000001-2020": [{"docket_number": ...}]})
+        set_portal(portal)
+    """
+
+    def __init__(
+        self,
+        dockets: Optional[Dict[str, List[Dict]]] = None,
+        names: Optional[Dict[Tuple[str, str], Dict[str, List[Dict]]]] = None,
+        delay: float = 0,
+    ):
+        self.dockets = dockets or {}
+        # Results of name searches, by (first name, last name). Names are compared case-insensitively.
+        self.names = {
+            (first.lower(), last.lower()): results
+            for (first, last), results in (names or {}).items()
+        }
+        self.delay = delay
+        self.searches: List[Tuple] = []
+
+    def search_by_docket(self, docket_number: str) -> List[Dict]:
+        self.searches.append(("docket", docket_number))
+        time.sleep(self.delay)
+        return copy.deepcopy(self.dockets.get(docket_number, []))
+
+    def search_by_name(
+        self, first_name: str, last_name: str, dob=None, court: Optional[str] = None
+    ) -> Tuple[Dict[str, List[Dict]], List[str]]:
+        self.searches.append(("name", first_name, last_name, dob, court))
+        time.sleep(self.delay)
+        found = self.names.get((first_name.lower(), last_name.lower()), {})
+        courts = [court] if court in ["CP", "MDJ"] else ["CP", "MDJ"]
+        return {c: copy.deepcopy(found.get(c, [])) for c in courts}, []
+
+
+_store = None
+_portal = None
+
+
+def set_store(store) -> None:
+    """
+    Keep the cache in `store`, which has the `get(key, default)` and `set(key, value, timeout)` methods of a
+    MemoryStore (as a Django cache does). None restores the default.
+    """
+    global _store
+    _store = store
+
+
+def get_store():
+    global _store
+    if _store is None:
+        url = os.environ.get("UJS_SEARCH_CACHE_URL")
+        _store = RedisStore(url) if url else MemoryStore()
+    return _store
+
+
+def set_portal(portal) -> None:
+    """
+    Send searches to `portal`, which has `search_by_docket` and `search_by_name` functions like
+    `ujs_search.services.searchujs` does. None restores the UJS portal.
+    """
+    global _portal
+    _portal = portal
+
+
+def get_portal():
+    if _portal is None:
+        # ujs_search is imported here, so that the cache can be used without it (e.g., with an OfflinePortal).
+        from ujs_search.services import searchujs
+
+        return searchujs
+    return _portal
+
+
+def docket_key(docket_number: str) -> str:
+    return "docket:" + docket_number.strip().upper()
+
+
+def name_key(first_name: str, last_name: str, dob=None, court=None) -> str:
+    if isinstance(dob, datetime):
+        dob = dob.date()
+    if isinstance(dob, date):
+        dob = dob.isoformat()
+    return ":".join(
+        [
+            "name",
+            first_name.strip().lower(),
+            last_name.strip().lower(),
+            str(dob or "").strip(),
+            (court or "").strip().upper(),
+        ]
+    )
+
+
+def _found_nothing(results) -> bool:
+    if isinstance(results, dict):
+        return all(_found_nothing(v) for v in results.values())
+    return not results
+
+
+def _cached(key: str, search: Callable[[], Any]):
+    store = get_store()
+    result = store.get(key, _MISSING)
+    if result is not _MISSING:
+        return result
+    result = search()
+    results, errors = result if isinstance(result, tuple) else (result, None)
+    if errors:
+        logger.info("Not caching search %s, which had errors: %s", key, errors)
+        return result
+    store.set(
+        key, result, NOT_FOUND_TIMEOUT if _found_nothing(results) else FOUND_TIMEOUT
+    )
+    return result
+
+
+def search_by_docket(docket_number: str):
+    """
+    Search the UJS portal for a docket number, unless the search is cached.
+    """
+    return _cached(
+        docket_key(docket_number),
+        lambda: get_portal().search_by_docket(docket_number),
+    )
+
+
+def search_by_name(first_name: str, last_name: str, dob=None, **kwargs):
+    """
+    Search the UJS portal for a person's cases, unless the search is cached.
+    """
+    return _cached(
+        name_key(first_name, last_name, dob, kwargs.get("court")),
+        lambda: get_portal().search_by_name(first_name, last_name, dob, **kwargs),
+    )
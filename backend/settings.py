@@ -98,6 +98,50 @@ Q_CLUSTER = {
     "orm": "default",
 }
 
+# Analyses of records are cached in Redis if REDIS_CACHE_URL is set (e.g., "redis://localhost:6379/1"),
+# and otherwise in local memory. The Redis server should have an eviction policy like volatile-lru, so that
+# the cache's counts of hits and misses (the "analysis_stats" cache, which don't expire) aren't evicted.
+# Without Redis, each process counts its own hits and misses.
+ANALYSIS_CACHE_TIMEOUT = int(os.environ.get("ANALYSIS_CACHE_TIMEOUT", 60 * 60 * 24))
+
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache",},
+    "analyses": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "analyses",
+        "TIMEOUT": ANALYSIS_CACHE_TIMEOUT,
+        "OPTIONS": {"MAX_ENTRIES": 500},
+    },
+    "analysis_stats": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "analysis_stats",
+        "TIMEOUT": None,
+    },
+}
+if os.environ.get("REDIS_CACHE_URL"):
+    CACHES["analyses"] = {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": os.environ["REDIS_CACHE_URL"],
+        "TIMEOUT": ANALYSIS_CACHE_TIMEOUT,
+    }
+    CACHES["analysis_stats"] = {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": os.environ["REDIS_CACHE_URL"],
+        "TIMEOUT": None,
+    }
+
+# Searches of the UJS portal are cached in Redis if the UJS_SEARCH_CACHE_URL environment variable is set, and
+# otherwise in the memory of each process. See RecordLib.utilities.ujs_cache.
+
+# Downloading documents from the UJS portal. See cleanslate.services.fetch.
+DOWNLOAD_CONCURRENCY = int(os.environ.get("DOWNLOAD_CONCURRENCY", 8))
+DOWNLOAD_REQUESTS_PER_SECOND = float(os.environ.get("DOWNLOAD_REQUESTS_PER_SECOND", 4))
+DOWNLOAD_RETRIES = 3
+DOWNLOAD_TIMEOUT = 30
+# Downloaded documents are shared between users for this many seconds, before they're downloaded again.
+# See cleanslate.services.docket_store.
+DOCKET_STORE_MAX_AGE = int(os.environ.get("DOCKET_STORE_MAX_AGE", 60 * 60 * 24))
+
 ROOT_URLCONF = "backend.urls"
 
 TEMPLATES = [
@@ -0,0 +1,70 @@
+"""
+Model fields for the cleanslate app.
+"""
+import zlib
+from django.db import models
+
+# The first byte of a value stored in a CompressedTextField says how the rest of it is stored.
+STORED_PLAIN = 0
+STORED_ZLIB = 1
+
+
+def compress_text(text: str, level: int = 6) -> bytes:
+    """
+    Compress `text` into the bytes a CompressedTextField stores.
+    """
+    encoded = text.encode("utf-8")
+    compressed = zlib.compress(encoded, level)
+    if len(compressed) < len(encoded):
+        return bytes([STORED_ZLIB]) + compressed
+    # Very short texts don't get smaller.
+    return bytes([STORED_PLAIN]) + encoded
+
+
+def decompress_text(stored: bytes) -> str:
+    """
+    Read the text back out of bytes written by `compress_text`.
+    """
+    stored = bytes(stored)
+    if not stored:
+        return ""
+    version, body = stored[0], stored[1:]
+    if version == STORED_ZLIB:
+        return zlib.decompress(body).decode("utf-8")
+    if version == STORED_PLAIN:
+        return body.decode("utf-8")
+    raise ValueError(f"Unknown compressed text format: {version}")
+
+
+class CompressedTextField(models.TextField):
+    """
+    A TextField that is compressed in the database.
+
+    Models read and write the text as a str, but the database column holds the bytes from `compress_text`. So the
+    database can't search the text: lookups other than `isnull` and `exact` won't work.
+    """
+
+    def __init__(self, *args, level: int = 6, **kwargs):
+        self.level = level
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.level != 6:
+            kwargs["level"] = self.level
+        return name, path, args, kwargs
+
+    def get_internal_type(self):
+        # Use the database's binary column type.
+        return "BinaryField"
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        value = super().get_db_prep_value(value, connection, prepared)
+        if value is None:
+            return None
+        return connection.Database.Binary(compress_text(value, self.level))
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return None
+        return decompress_text(value)
@@ -0,0 +1,70 @@
+""" Add a command to manage.py that measures what compressing SourceRecord.raw_text saves, and what it costs.
+
+It reports how much smaller the stored text is than the text itself, and how long decompressing a record's text takes
+compared with parsing it.
+"""
+
+import time
+import logging
+from django.core.management.base import BaseCommand
+from django.db.models import Sum
+from django.db.models.functions import Length
+from RecordLib.sourcerecords import SourceRecord as RLSourceRecord
+from cleanslate.fields import compress_text, decompress_text
+from cleanslate.models import SourceRecord
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """ Additional commands added to manage.py. """
+
+    help = "Measure the storage saved by compressing source records' text, and the cost of decompressing it"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sample",
+            type=int,
+            default=50,
+            help="How many source records to time decompressing and parsing.",
+        )
+
+    def handle(self, *args, **options):
+        with_text = SourceRecord.objects.filter(raw_text__isnull=False)
+        stored_bytes = (
+            with_text.aggregate(stored=Sum(Length("raw_text")))["stored"] or 0
+        )
+        text_bytes = sum(
+            len(text.encode("utf-8"))
+            for text in with_text.values_list("raw_text", flat=True).iterator()
+        )
+        self.stdout.write(f"Source records with text: {with_text.count()}")
+        self.stdout.write(f"Text: {text_bytes} bytes. Stored: {stored_bytes} bytes.")
+        if stored_bytes:
+            self.stdout.write(f"Compression ratio: {text_bytes / stored_bytes:.1f}")
+
+        decoding = 0.0
+        parsing = 0.0
+        timed = 0
+        for source_record in with_text.order_by("id")[: options["sample"]]:
+            stored = compress_text(source_record.raw_text)
+            start = time.perf_counter()
+            decompress_text(stored)
+            decoded = time.perf_counter()
+            try:
+                RLSourceRecord(
+                    source_record.raw_text, parser=source_record.get_parser()
+                )
+            except Exception as err:
+                logger.info("Could not parse %s: %s", source_record.id, err)
+                continue
+            parsing += time.perf_counter() - decoded
+            decoding += decoded - start
+            timed += 1
+        if timed:
+            self.stdout.write(
+                f"Per record: decompressing {1000 * decoding / timed:.2f} ms, "
+                f"parsing {1000 * parsing / timed:.2f} ms "
+                f"({100 * decoding / parsing:.2f}% of parsing)."
+            )
@@ -0,0 +1,62 @@
+""" Add a command to manage.py that re-parses the source records whose stored parse results are out of date.
+
+Run this after changing a parser and bumping SourceRecord.PARSER_VERSION, so that the stored parse results are
+brought up to date in one pass, instead of one request at a time.
+"""
+
+import logging
+from django.core.management.base import BaseCommand
+from cleanslate.models import SourceRecord
+from cleanslate.services import parsing
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """ Additional commands added to manage.py. """
+
+    help = "Re-parse source records that were parsed by an old version of the parsers"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Also parse the source records that have text, but have never been parsed.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="How many source records to load and save at once.",
+        )
+
+    def handle(self, *args, **options):
+        source_records = SourceRecord.objects.exclude(
+            raw_text__isnull=True, file=""
+        ).order_by("id")
+        if not options["all"]:
+            source_records = source_records.filter(parsed__isnull=False)
+        ids = list(source_records.values_list("id", flat=True))
+        batch_size = options["batch_size"]
+        reparsed = 0
+        failed = 0
+        for start in range(0, len(ids), batch_size):
+            batch = SourceRecord.objects.in_bulk(ids[start : start + batch_size])
+            parsed = []
+            for source_record in batch.values():
+                try:
+                    # Checking freshness reads the record's file, which may be missing.
+                    if parsing.is_fresh(source_record):
+                        continue
+                    parsing.parse(source_record)
+                    reparsed += 1
+                except Exception as err:
+                    logger.error(
+                        "Parsing source record %s failed: %s", source_record.id, err
+                    )
+                    source_record.parse_status = SourceRecord.ParseStatuses.FAILURE
+                    failed += 1
+                parsed.append(source_record)
+            SourceRecord.objects.bulk_update(parsed, parsing.PARSE_FIELDS)
+        logger.info("Parsed %d source records. %d failed.", reparsed, failed)
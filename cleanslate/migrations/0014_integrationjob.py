@@ -0,0 +1,40 @@
+# Generated by Django 2.2.13 on 2026-10-18 21:25
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('cleanslate', '0013_auto_20201203_1546'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IntegrationJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('status', models.CharField(choices=[('RUNNING', 'RUNNING'), ('DONE', 'DONE')], default='RUNNING', max_length=30)),
+                ('crecord', models.TextField()),
+                ('result', models.TextField(null=True)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='IntegrationJobSource',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('status', models.CharField(choices=[('QUEUED', 'QUEUED'), ('FETCHING', 'FETCHING'), ('PARSING', 'PARSING'), ('DONE', 'DONE'), ('FAILED', 'FAILED')], default='QUEUED', max_length=30)),
+                ('error', models.TextField(blank=True, default='')),
+                ('parsed', models.TextField(null=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sources', to='cleanslate.IntegrationJob')),
+                ('source_record', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='cleanslate.SourceRecord')),
+            ],
+        ),
+    ]
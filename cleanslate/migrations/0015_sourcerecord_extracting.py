@@ -0,0 +1,18 @@
+# Generated by Django 2.2.13 on 2026-10-18 21:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cleanslate', '0014_integrationjob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sourcerecord',
+            name='fetch_status',
+            field=models.CharField(choices=[('NOT_FETCHED', 'NOT_FETCHED'), ('FETCHING', 'FETCHING'), ('EXTRACTING', 'EXTRACTING'), ('FETCHED', 'FETCHED'), ('FETCH_FAILED', 'FETCH_FAILED')], default='NOT_FETCHED', max_length=100),
+        ),
+    ]
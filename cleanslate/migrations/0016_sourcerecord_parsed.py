@@ -0,0 +1,28 @@
+# Generated by Django 2.2.13 on 2026-10-18 21:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cleanslate', '0015_sourcerecord_extracting'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sourcerecord',
+            name='parsed',
+            field=models.TextField(null=True),
+        ),
+        migrations.AddField(
+            model_name='sourcerecord',
+            name='parser_version',
+            field=models.CharField(blank=True, default='', max_length=200),
+        ),
+        migrations.AddField(
+            model_name='sourcerecord',
+            name='text_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations
+import cleanslate.fields
+
+# How many source records to load and save at once.
+BATCH_SIZE = 200
+
+
+def _copy_in_batches(apps, from_field, to_field):
+    SourceRecord = apps.get_model("cleanslate", "SourceRecord")
+    ids = list(
+        SourceRecord.objects.filter(**{f"{from_field}__isnull": False})
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    for start in range(0, len(ids), BATCH_SIZE):
+        batch = list(
+            SourceRecord.objects.filter(id__in=ids[start : start + BATCH_SIZE]).only(
+                "id", from_field
+            )
+        )
+        for source_record in batch:
+            setattr(source_record, to_field, getattr(source_record, from_field))
+        SourceRecord.objects.bulk_update(batch, [to_field])
+
+
+def compress_raw_text(apps, schema_editor):
+    _copy_in_batches(apps, "raw_text", "compressed_raw_text")
+
+
+def decompress_raw_text(apps, schema_editor):
+    _copy_in_batches(apps, "compressed_raw_text", "raw_text")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cleanslate", "0016_sourcerecord_parsed"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sourcerecord",
+            name="compressed_raw_text",
+            field=cleanslate.fields.CompressedTextField(null=True),
+        ),
+        migrations.RunPython(compress_raw_text, decompress_raw_text),
+    ]
@@ -0,0 +1,18 @@
+from django.db import migrations
+
+# The uncompressed text is dropped in a separate migration, so the table isn't altered in the same transaction as
+# the updates 0017 made to it. (Postgres can refuse to, while those updates have deferred constraint checks pending.)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cleanslate", "0017_sourcerecord_compress_raw_text"),
+    ]
+
+    operations = [
+        migrations.RemoveField(model_name="sourcerecord", name="raw_text",),
+        migrations.RenameField(
+            model_name="sourcerecord", old_name="compressed_raw_text", new_name="raw_text",
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 2.2.13 on 2026-10-18 21:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cleanslate', '0018_sourcerecord_replace_raw_text'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredDocument',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(unique=True)),
+                ('docket_num', models.CharField(blank=True, db_index=True, max_length=50)),
+                ('caption', models.CharField(blank=True, max_length=300)),
+                ('file', models.FileField(upload_to='')),
+                ('fetched_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.2.13 on 2026-10-18 21:51
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cleanslate', '0019_storeddocument'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='integrationjobsource',
+            name='parsed',
+        ),
+    ]
@@ -2,14 +2,15 @@ from __future__ import annotations
 import os
 import uuid
 import re
+import hashlib
 import logging
-from typing import Optional
 from dataclasses import dataclass, asdict
 import uuid
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.files.uploadedfile import InMemoryUploadedFile
 from django.db.models.signals import post_save
+from cleanslate.fields import CompressedTextField
 from RecordLib.sourcerecords.parsingutilities import get_text_from_pdf
 from RecordLib.sourcerecords.docket.re_parse_pdf import (
     re_parse_pdf as docket_pdf_parser,
@@ -235,19 +236,22 @@ class SourceRecord(models.Model):
     """
 
     @classmethod
-    def from_unknown_file(
-        cls, a_file: InMemoryUploadedFile, **kwargs
-    ) -> Optional[SourceRecord]:
-        """ Create a SourceRecord from an uploaded file, or return None if we cannot tell what the file is.
+    def from_upload(cls, a_file: InMemoryUploadedFile, **kwargs) -> SourceRecord:
+        """ Create a SourceRecord from an uploaded file, without reading the file yet.
+
+        The new SourceRecord's fetch_status is EXTRACTING until `extract_text` works out what the file is.
         """
-        try:
+        return cls(file=a_file, fetch_status=cls.FetchStatuses.EXTRACTING, **kwargs)
+
+    def extract_text(self) -> None:
+        """ Extract the text of this SourceRecord's file, and figure out what kind of record it is from the text.
+
+        See `source_record_info`.
+        """
+        with self.file.open("rb") as a_file:
             file_info = source_record_info(a_file)
-            if file_info:
-                return cls(**asdict(file_info), file=a_file, **kwargs)
-            else:
-                return None
-        except:
-            return None
+        for field, value in asdict(file_info).items():
+            setattr(self, field, value)
 
     class Courts:
         """ Documents may come from one of these courts. 
@@ -301,11 +305,14 @@ class SourceRecord(models.Model):
 
         NOT_FETCHED = "NOT_FETCHED"
         FETCHING = "FETCHING"
+        # An uploaded file, whose text hasn't been extracted yet.
+        EXTRACTING = "EXTRACTING"
         FETCHED = "FETCHED"
         FETCH_FAILED = "FETCH_FAILED"
         __choices__ = [
             ("NOT_FETCHED", "NOT_FETCHED"),
             ("FETCHING", "FETCHING"),
+            ("EXTRACTING", "EXTRACTING"),
             ("FETCHED", "FETCHED"),
             ("FETCH_FAILED", "FETCH_FAILED"),
         ]
@@ -354,4 +361,127 @@ class SourceRecord(models.Model):
 
     owner = models.ForeignKey(User, on_delete=models.CASCADE)
 
-    raw_text = models.TextField(null=True)
+    # The text of the record, compressed in the database.
+    raw_text = CompressedTextField(null=True)
+
+    # The Person and Cases parsed from this record, as json. See `cleanslate.services.parsing`.
+    parsed = models.TextField(null=True)
+
+    # The `current_parser_version()` and `current_text_hash()` of the parse that produced `parsed`.
+    parser_version = models.CharField(max_length=200, blank=True, default="")
+
+    text_hash = models.CharField(max_length=64, blank=True, default="")
+
+    # Change this when the parsers change what they parse, so that parse results from the old parsers aren't used.
+    # `manage.py reparse_source_records` re-parses the records parsed by old parsers.
+    PARSER_VERSION = "1"
+
+    def current_parser_version(self) -> str:
+        """
+        Identifies the parser (and the version of the parsers) that would parse this record now.
+        """
+        return f"{self.get_parser().__name__}:{self.PARSER_VERSION}"
+
+    def current_text_hash(self) -> str:
+        """
+        A hash of the text this record would be parsed from: its raw_text, or else its file.
+        """
+        digest = hashlib.sha256()
+        if self.raw_text:
+            digest.update(self.raw_text.encode("utf-8"))
+        else:
+            with self.file.open("rb") as a_file:
+                for chunk in a_file.chunks():
+                    digest.update(chunk)
+        return digest.hexdigest()
+
+
+class StoredDocument(models.Model):
+    """
+    A document downloaded from the UJS portal, in the store of documents shared by all users.
+
+    The store keeps one copy of each document, named by the hash of its content, and SourceRecords of the document
+    point to that copy. See `cleanslate.services.docket_store`.
+    """
+
+    url = models.URLField(unique=True)
+
+    docket_num = models.CharField(blank=True, max_length=50, db_index=True)
+
+    caption = models.CharField(blank=True, max_length=300)
+
+    file = models.FileField()
+
+    fetched_at = models.DateTimeField()
+
+
+class IntegrationJob(models.Model):
+    """
+    A background job that parses source records and integrates the cases they describe into a CRecord.
+
+    See `cleanslate.services.integration`.
+    """
+
+    class Statuses:
+        """
+        A job is RUNNING until each of its source records has been parsed, or has failed.
+        """
+
+        RUNNING = "RUNNING"
+        DONE = "DONE"
+        __choices__ = [
+            ("RUNNING", "RUNNING"),
+            ("DONE", "DONE"),
+        ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    owner = models.ForeignKey(User, on_delete=models.CASCADE)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    status = models.CharField(
+        max_length=30, choices=Statuses.__choices__, default=Statuses.RUNNING
+    )
+
+    # json of the CRecord that the source records are integrated into.
+    crecord = models.TextField()
+
+    # json of the integrated CRecord, once the job is done.
+    result = models.TextField(null=True)
+
+
+class IntegrationJobSource(models.Model):
+    """
+    The progress of an IntegrationJob on one of its source records.
+    """
+
+    class Statuses:
+        QUEUED = "QUEUED"
+        FETCHING = "FETCHING"
+        PARSING = "PARSING"
+        DONE = "DONE"
+        FAILED = "FAILED"
+        __choices__ = [
+            ("QUEUED", "QUEUED"),
+            ("FETCHING", "FETCHING"),
+            ("PARSING", "PARSING"),
+            ("DONE", "DONE"),
+            ("FAILED", "FAILED"),
+        ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    job = models.ForeignKey(
+        IntegrationJob, on_delete=models.CASCADE, related_name="sources"
+    )
+
+    source_record = models.ForeignKey(SourceRecord, on_delete=models.CASCADE)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    status = models.CharField(
+        max_length=30, choices=Statuses.__choices__, default=Statuses.QUEUED
+    )
+
+    error = models.TextField(blank=True, default="")
@@ -4,7 +4,7 @@ Serialize models for the RecordLib web app.
 """
 
 from rest_framework import serializers as S
-from cleanslate.models import UserProfile, SourceRecord
+from cleanslate.models import UserProfile, SourceRecord, IntegrationJobSource
 from django.contrib.auth.models import User
 from RecordLib.crecord import CRecord
 from RecordLib.crecord import Case
@@ -160,6 +160,30 @@ class CRecordSerializer(S.Serializer):
     cases = CaseSerializer(many=True)
 
 
+class ChargeEditSerializer(S.Serializer):
+    """
+    A change to one charge of a record. `changes` has new values for some of the fields of a ChargeSerializer.
+    """
+
+    docket_number = S.CharField(required=True)
+    sequence = S.CharField(required=True, allow_blank=True)
+    changes = S.DictField()
+
+    def validate_changes(self, value):
+        charge = ChargeSerializer(data=value, partial=True)
+        charge.is_valid(raise_exception=True)
+        return charge.validated_data
+
+
+class ReanalysisSerializer(S.Serializer):
+    """
+    Validate json of a record that was analyzed, and edits to its charges to analyze it again with.
+    """
+
+    crecord = CRecordSerializer()
+    edits = ChargeEditSerializer(many=True)
+
+
 class PetitionSerializer(S.Serializer):
     attorney = AttorneySerializer(required=False)
     client = PersonSerializer()
@@ -192,6 +216,10 @@ class SourceRecordSerializer(S.ModelSerializer):
         exclude = [
             "owner",  # only the database knows who owns what files
             "file",
+            # parse results are stored by the server (see cleanslate.services.parsing), and not sent back and forth.
+            "parsed",
+            "parser_version",
+            "text_hash",
         ]  # the file itself isn't sent back and forth as a SourceRecord. The SourceRecord is a pointer to a file in the server.
 
     id = S.UUIDField(format="hex_verbose", required=False)
@@ -206,6 +234,16 @@ class IntegrateSourcesSerializer(S.Serializer):
     source_records = SourceRecordSerializer(many=True, allow_empty=True)
 
 
+class IntegrationJobSourceSerializer(S.ModelSerializer):
+    """
+    The progress of an integration job on one of its source records.
+    """
+
+    class Meta:
+        model = IntegrationJobSource
+        fields = ["source_record", "status", "error"]
+
+
 class DownloadDocsSerializer(S.Serializer):
     """
     Validate json of a POST that contains source records (a collection of objects validated by SourceRecordSerializer)
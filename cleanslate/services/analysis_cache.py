@@ -0,0 +1,205 @@
+"""
+Cache the results of analyzing a CRecord.
+
+The frontend often posts the same record for analysis more than once (reloading the page, switching tabs). Analyses
+are cached by a hash of the record, the version of the rules, and the date the record is analyzed as of, so a
+repeated request gets the analysis's json straight from Django's "analyses" cache. The full and compact (see
+`to_compact_serializable`) json of an analysis are cached separately.
+
+The cache also counts hits and misses, and how much analysis time hits saved. See `stats()`. The counts are kept
+in the "analysis_stats" cache, apart from the analyses, so they aren't culled when the analyses cache fills up.
+
+Each process also keeps the Analyses it worked out most recently, with their memos of Decisions, so an edit to a
+charge of one of those records is re-analyzed without deciding everything again. See `reanalyzed()`.
+"""
+from collections import OrderedDict
+from typing import Iterator, List, Optional, Tuple
+from datetime import date
+import hashlib
+import json
+import logging
+import threading
+import time
+from django.core.cache import caches
+from RecordLib.crecord import CRecord
+from RecordLib.analysis import Analysis, ChargeEdit
+from RecordLib.analysis.ruledefs import (
+    filter_traffic_cases,
+    expunge_summary_convictions,
+    expunge_nonconvictions,
+    expunge_deceased,
+    expunge_over_70,
+    seal_convictions,
+)
+from RecordLib.utilities.serializers import to_serializable
+from RecordLib.utilities.encoders import to_json, iter_json
+
+logger = logging.getLogger(__name__)
+
+
+# The rules AnalysisView applies to a record, in order.
+ANALYSIS_RULES = (
+    filter_traffic_cases,
+    expunge_deceased,
+    expunge_over_70,
+    expunge_nonconvictions,
+    expunge_summary_convictions,
+    seal_convictions,
+)
+
+# Change this whenever the rules change what they decide (or the cached format changes), so stale analyses aren't used.
+RULESET_VERSION = "3"
+
+CACHE_ALIAS = "analyses"
+STATS_CACHE_ALIAS = "analysis_stats"
+HITS_KEY = "analysis-cache-stats:hits"
+MISSES_KEY = "analysis-cache-stats:misses"
+SAVED_MS_KEY = "analysis-cache-stats:saved-ms"
+
+# How many Analyses each process keeps for re-analyzing edits.
+BASE_ANALYSES_MAX = 50
+
+# The Analyses this process worked out most recently, by (record_hash, as_of), least recently used first.
+_base_analyses: "OrderedDict[Tuple[str, date], Analysis]" = OrderedDict()
+_base_analyses_lock = threading.Lock()
+
+
+def record_hash(crecord: CRecord) -> str:
+    """
+    A hash of the contents of a CRecord. Records with the same contents have the same hash.
+    """
+    canonical = json.dumps(
+        to_serializable(crecord), sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def cache_key(crecord: CRecord, as_of: date, compact: bool = False) -> str:
+    """
+    The key for the cached analysis of `crecord` as of `as_of`.
+    """
+    fmt = "compact" if compact else "full"
+    return f"analysis:{RULESET_VERSION}:{fmt}:{as_of.isoformat()}:{record_hash(crecord)}"
+
+
+def _apply_rules(crecord: CRecord, as_of: date) -> Analysis:
+    analysis = Analysis(crecord, as_of=as_of)
+    for rule in ANALYSIS_RULES:
+        analysis = analysis.rule(rule)
+    return analysis
+
+
+def _keep(analysis: Analysis) -> None:
+    key = (record_hash(analysis.record), analysis.context.as_of)
+    with _base_analyses_lock:
+        _base_analyses[key] = analysis
+        _base_analyses.move_to_end(key)
+        while len(_base_analyses) > BASE_ANALYSES_MAX:
+            _base_analyses.popitem(last=False)
+
+
+def base_analysis(crecord: CRecord, as_of: date) -> Analysis:
+    """
+    The Analysis of `crecord` as of `as_of` that this process kept, or a new one if it didn't keep one.
+    """
+    key = (record_hash(crecord), as_of)
+    with _base_analyses_lock:
+        analysis = _base_analyses.get(key)
+        if analysis is not None:
+            _base_analyses.move_to_end(key)
+            return analysis
+    analysis = _apply_rules(crecord, as_of)
+    _keep(analysis)
+    return analysis
+
+
+def analyze(crecord: CRecord, as_of: date, compact: bool = False) -> str:
+    """
+    Analyze a record with ANALYSIS_RULES and encode the Analysis as json.
+    """
+    return to_json(base_analysis(crecord, as_of), compact=compact)
+
+
+def reanalyzed(
+    crecord: CRecord,
+    edits: List[ChargeEdit],
+    as_of: Optional[date] = None,
+    compact: bool = False,
+) -> str:
+    """
+    The json of the analysis of `crecord`, with `edits` made to it, as of `as_of` (default: today).
+
+    The edited record is re-analyzed from the Analysis of `crecord` (see `Analysis.reanalyze`), so Decisions
+    about charges that weren't edited are remembered instead of worked out again. The new Analysis is kept too,
+    so a further edit can start from it.
+
+    Raises:
+        KeyError if an edit is to a charge `crecord` doesn't have.
+    """
+    as_of = as_of or date.today()
+    analysis = base_analysis(crecord, as_of).reanalyze(edits)
+    _keep(analysis)
+    return to_json(analysis, compact=compact)
+
+
+def stream_analysis(
+    crecord: CRecord, as_of: Optional[date] = None, compact: bool = False
+) -> Iterator[str]:
+    """
+    Analyze a record with ANALYSIS_RULES and yield the json of the Analysis in chunks (see `iter_json`).
+
+    Streamed analyses skip the cache, because caching one would mean holding all of its json in memory.
+    """
+    return iter_json(_apply_rules(crecord, as_of or date.today()), compact=compact)
+
+
+def _increment(key: str, delta: int = 1) -> None:
+    cache = caches[STATS_CACHE_ALIAS]
+    # incr only works on keys that exist. add() doesn't overwrite a count that another process started.
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # The count was cleared between add() and incr().
+        cache.set(key, delta, timeout=None)
+
+
+def cached_analysis(
+    crecord: CRecord, as_of: Optional[date] = None, compact: bool = False
+) -> str:
+    """
+    The json of the analysis of `crecord` as of `as_of` (default: today), from the cache if it's there.
+
+    If `compact` is True, the analysis is in the compact format of `to_compact_serializable`.
+    """
+    as_of = as_of or date.today()
+    cache = caches[CACHE_ALIAS]
+    key = cache_key(crecord, as_of, compact)
+    entry = cache.get(key)
+    if entry is not None:
+        _increment(HITS_KEY)
+        _increment(SAVED_MS_KEY, entry["compute_ms"])
+        return entry["analysis"]
+    start = time.perf_counter()
+    encoded = analyze(crecord, as_of, compact)
+    compute_ms = int((time.perf_counter() - start) * 1000)
+    cache.set(key, {"analysis": encoded, "compute_ms": compute_ms})
+    _increment(MISSES_KEY)
+    return encoded
+
+
+def stats() -> dict:
+    """
+    Counts of cache hits and misses, the hit rate, and the milliseconds of analysis that hits saved.
+
+    If the "analysis_stats" cache is in local memory, these are the counts of this process only.
+    """
+    counts = caches[STATS_CACHE_ALIAS].get_many([HITS_KEY, MISSES_KEY, SAVED_MS_KEY])
+    hits = counts.get(HITS_KEY, 0)
+    misses = counts.get(MISSES_KEY, 0)
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / (hits + misses) if hits + misses > 0 else 0.0,
+        "compute_ms_saved": counts.get(SAVED_MS_KEY, 0),
+    }
@@ -0,0 +1,142 @@
+"""
+A store of the documents downloaded from the UJS portal, shared by all users.
+
+Many users screen people with the same public dockets, and the same person may be screened again, so a document is
+downloaded once and kept in the store under MEDIA_ROOT, named by the sha256 hash of its content. The SourceRecords
+of a document all point to the same file in the store. A StoredDocument remembers which file was downloaded from a
+url (and the docket number and caption the url was found with), and when.
+
+Documents fetched less than DOCKET_STORE_MAX_AGE seconds ago are taken from the store instead of downloaded again.
+If several threads want the same url (or the same docket number's search results) at the same time, one of them
+downloads it, and the others wait for it and share its result.
+"""
+from typing import Callable, Dict, Iterable, List, Optional, TypeVar
+from concurrent.futures import Future
+from datetime import timedelta
+import hashlib
+import logging
+import threading
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from cleanslate.models import SourceRecord, StoredDocument
+from cleanslate.services.fetch import Fetcher
+
+logger = logging.getLogger(__name__)
+
+R = TypeVar("R")
+
+STORE_DIR = "docket_store"
+
+_in_flight: Dict[str, Future] = {}
+_in_flight_lock = threading.Lock()
+
+
+def coalesced(key: str, func: Callable[[], R]) -> R:
+    """
+    Call `func`, unless another thread is already calling a function with the same `key`. Then wait for that call
+    to finish, and return its result (or raise its exception) instead.
+    """
+    with _in_flight_lock:
+        future = _in_flight.get(key)
+        leader = future is None
+        if leader:
+            future = _in_flight[key] = Future()
+    if not leader:
+        return future.result()
+    try:
+        result = func()
+        future.set_result(result)
+        return result
+    except Exception as err:
+        future.set_exception(err)
+        raise
+    finally:
+        with _in_flight_lock:
+            del _in_flight[key]
+
+
+def put(content: bytes) -> str:
+    """
+    Add `content` to the store, if it isn't there already, and return the name of its file.
+    """
+    digest = hashlib.sha256(content).hexdigest()
+    name = f"{STORE_DIR}/{digest[:2]}/{digest}.pdf"
+    if default_storage.exists(name):
+        return name
+    return default_storage.save(name, ContentFile(content))
+
+
+def _fresh(**filters) -> List[StoredDocument]:
+    max_age = timedelta(
+        seconds=getattr(settings, "DOCKET_STORE_MAX_AGE", 60 * 60 * 24)
+    )
+    return list(
+        StoredDocument.objects.filter(
+            fetched_at__gte=timezone.now() - max_age, **filters
+        )
+    )
+
+
+def fresh_by_docket_num(docket_nums: Iterable[str]) -> Dict[str, StoredDocument]:
+    """
+    The fresh stored dockets among `docket_nums`, by docket number.
+    """
+    return {doc.docket_num: doc for doc in _fresh(docket_num__in=list(docket_nums))}
+
+
+def _download(url: str, fetcher: Fetcher) -> Optional[str]:
+    resp = fetcher.get(url)
+    if resp is None or resp.status_code != 200:
+        return None
+    return put(resp.content)
+
+
+def fetch(records: List[SourceRecord], fetcher: Fetcher) -> Dict[str, str]:
+    """
+    Get the documents at the urls of `records` into the store.
+
+    Returns the name of the stored file of each url that could be fetched. The StoredDocuments are read in one
+    query, and saved in two.
+    """
+    by_url = {}
+    for rec in records:
+        by_url.setdefault(rec.url, rec)
+    names = {doc.url: doc.file.name for doc in _fresh(url__in=list(by_url))}
+    missing = [url for url in by_url if url not in names]
+    downloaded = fetcher.map(
+        lambda url: coalesced(f"url:{url}", lambda: _download(url, fetcher)), missing
+    )
+    fetched_at = timezone.now()
+    stored = {url: name for url, name in zip(missing, downloaded) if name is not None}
+    existing = StoredDocument.objects.in_bulk(list(stored), field_name="url")
+    for url, doc in existing.items():
+        doc.file.name = stored[url]
+        doc.fetched_at = fetched_at
+    StoredDocument.objects.bulk_update(existing.values(), ["file", "fetched_at"])
+    StoredDocument.objects.bulk_create(
+        [
+            StoredDocument(
+                url=url,
+                # Only dockets are found again by their docket number.
+                docket_num=by_url[url].docket_num
+                if by_url[url].record_type == SourceRecord.RecTypes.DOCKET_PDF
+                else "",
+                caption=by_url[url].caption,
+                file=name,
+                fetched_at=fetched_at,
+            )
+            for url, name in stored.items()
+            if url not in existing
+        ],
+        # Another request may have stored the same url in the meantime.
+        ignore_conflicts=True,
+    )
+    logger.info(
+        "Took %d documents from the store, and downloaded %d",
+        len(names),
+        len(stored),
+    )
+    names.update(stored)
+    return names
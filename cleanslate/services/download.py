@@ -1,9 +1,11 @@
 from datetime import datetime
+from contextlib import nullcontext
 from cleanslate.models import SourceRecord
-from typing import List
+from typing import List, Optional
 import requests
-from django.core.files.base import ContentFile
-from ujs_search.services import searchujs
+from RecordLib.utilities import ujs_cache
+from cleanslate.services.fetch import Fetcher
+from cleanslate.services import docket_store
 import logging
 import urllib3
 
@@ -11,47 +13,114 @@ requests.packages.urllib3.util.ssl_.DEFAULT_CIPHERS += "HIGH:!DH:!aNULL"
 logger = logging.getLogger(__name__)
 
 
-def source_records(records: List[SourceRecord]) -> None:
-    """ Download the source records in a list of source records, if they're not already present. 
-    
-    TODO: fetch these urls asynchronously.
+UJS_HOST = "ujsportal.pacourts.us"
+
+
+def source_records(
+    records: List[SourceRecord], fetcher: Optional[Fetcher] = None
+) -> None:
+    """ Download the source records in a list of source records, if they're not already present.
+
+    The documents are fetched concurrently (see `Fetcher`), or taken from the shared store of documents if they were
+    fetched recently (see `docket_store`). Then the records are saved in two batches: new records are created
+    together, and existing records are updated together.
     """
-    for rec in records:
-        if rec.file._file is None:
-            resp = requests.get(
-                rec.url, headers={"User-Agent": "ExpungmentGeneratorTesting"}
-            )
-            if resp.status_code == 200:
-                rec.file.save(f"{rec.id}.pdf", ContentFile(resp.content))
-                rec.fetch_status = SourceRecord.FetchStatuses.FETCHED
-                rec.save()
-            else:
-                rec.fetch_status = SourceRecord.FetchStatuses.FETCH_FAILED
-                rec.save()
+    pending = list(
+        {rec.id: rec for rec in records if rec.file._file is None}.values()
+    )
+    if not pending:
+        return
+    with Fetcher() if fetcher is None else nullcontext(fetcher) as fetcher:
+        names = docket_store.fetch(pending, fetcher)
+    for rec in pending:
+        if rec.url in names:
+            # Point to the document in the store, instead of keeping a copy of it.
+            rec.file.name = names[rec.url]
+            rec.fetch_status = SourceRecord.FetchStatuses.FETCHED
+        else:
+            rec.fetch_status = SourceRecord.FetchStatuses.FETCH_FAILED
+    new = [rec for rec in pending if rec._state.adding]
+    existing = [rec for rec in pending if not rec._state.adding]
+    SourceRecord.objects.bulk_create(new)
+    SourceRecord.objects.bulk_update(existing, ["file", "fetch_status"])
 
 
 def dockets(docket_nums: List[str], owner: "User") -> [SourceRecord]:
     """
     Download the dockets in `docket_nums` and create SourceRecords for them.
-    
+
+    Dockets that were fetched recently are taken from the shared store of documents (see `docket_store`). The UJS
+    portal is searched for the rest of the dockets concurrently, and then they are downloaded concurrently.
+
     Return the list of newly generated source records.
-    TODO do this asynchronously.
     """
-    new_source_records = []
-    for docket_number in docket_nums:
+
+    def search(docket_number: str) -> Optional[SourceRecord]:
         try:
-            result = searchujs.search_by_docket(docket_number)[0]
-            new_source_record = SourceRecord(
+            result = docket_store.coalesced(
+                f"docket:{docket_number}",
+                lambda: fetcher.call(
+                    UJS_HOST, lambda: ujs_cache.search_by_docket(docket_number)
+                ),
+            )[0]
+            return SourceRecord(
                 caption=result["caption"],
                 docket_num=result["docket_number"],
                 url=result["docket_sheet_url"],
                 record_type=SourceRecord.RecTypes.DOCKET_PDF,
                 owner=owner,
             )
-            new_source_records.append(new_source_record)
         except Exception as err:
             logger.error("Downloading docket %s failed: %s", docket_number, str(err))
-    # download all these new source records.
-    source_records(new_source_records)
+            return None
+
+    stored = docket_store.fresh_by_docket_num(docket_nums)
+    with Fetcher() as fetcher:
+        searched = iter(
+            fetcher.map(search, [dn for dn in docket_nums if dn not in stored])
+        )
+        new_source_records = [
+            SourceRecord(
+                caption=stored[dn].caption,
+                docket_num=dn,
+                url=stored[dn].url,
+                record_type=SourceRecord.RecTypes.DOCKET_PDF,
+                owner=owner,
+            )
+            if dn in stored
+            else next(searched)
+            for dn in docket_nums
+        ]
+        new_source_records = [rec for rec in new_source_records if rec is not None]
+        # download all these new source records.
+        source_records(new_source_records, fetcher)
     return new_source_records
 
+
+def missing_dockets(
+    docket_nums: List[str], known: List[SourceRecord], owner: "User"
+) -> List[SourceRecord]:
+    """
+    Get SourceRecords for the dockets in `docket_nums` that aren't among the `known` source records.
+
+    Dockets that `owner` has already fetched are reused from the database. Only the rest are searched for and
+    downloaded (see `dockets`).
+
+    Returns the reused source records, followed by the downloaded ones.
+    """
+    known_nums = {sr.docket_num for sr in known}
+    # dict.fromkeys drops repeated docket numbers, and keeps the order they were mentioned in.
+    wanted = [dn for dn in dict.fromkeys(docket_nums) if dn not in known_nums]
+    if not wanted:
+        return []
+    reused = {}
+    for sr in SourceRecord.objects.filter(
+        owner=owner,
+        record_type=SourceRecord.RecTypes.DOCKET_PDF,
+        fetch_status=SourceRecord.FetchStatuses.FETCHED,
+        docket_num__in=wanted,
+    ):
+        reused.setdefault(sr.docket_num, sr)
+    downloaded = dockets([dn for dn in wanted if dn not in reused], owner=owner)
+    logger.info("Reused %d dockets and downloaded %d", len(reused), len(downloaded))
+    return list(reused.values()) + downloaded
@@ -0,0 +1,63 @@
+"""
+Extract the text of uploaded source records in the background.
+
+Uploading files creates SourceRecords right away, with the fetch_status EXTRACTING (see `SourceRecord.from_upload`).
+`start` queues a django-q task for each one, so the cluster's workers extract the records' text in parallel, and
+`wait` lets a request wait a little while for the extraction to finish.
+"""
+from typing import List
+import logging
+import time
+from django.db import transaction
+from django_q.tasks import async_task
+from cleanslate.models import SourceRecord
+
+logger = logging.getLogger(__name__)
+
+# How often `wait` checks whether extraction is done, in seconds.
+POLL_INTERVAL = 0.5
+
+
+def start(source_records: List[SourceRecord]) -> None:
+    """
+    Queue a task to extract the text of each source record.
+    """
+    for source_record in source_records:
+        # Don't let a worker look for a source record before it's committed.
+        transaction.on_commit(
+            lambda source_record_id=source_record.id: async_task(
+                extract, source_record_id
+            )
+        )
+
+
+def extract(source_record_id) -> None:
+    """
+    Extract the text of one uploaded source record and classify it. (This is a django-q task.)
+    """
+    source_record = SourceRecord.objects.get(id=source_record_id)
+    try:
+        source_record.extract_text()
+    except Exception as err:
+        logger.error("Extracting text of %s failed: %s", source_record_id, err)
+        source_record.fetch_status = SourceRecord.FetchStatuses.FETCH_FAILED
+    source_record.save()
+
+
+def wait(source_records: List[SourceRecord], timeout: float) -> List[SourceRecord]:
+    """
+    Wait up to `timeout` seconds for the text of `source_records` to be extracted.
+
+    Returns the source records, as they are in the database when extraction is done or time runs out.
+    """
+    ids = [source_record.id for source_record in source_records]
+    deadline = time.monotonic() + timeout
+    while True:
+        by_id = SourceRecord.objects.in_bulk(ids)
+        refreshed = [by_id[i] for i in ids if i in by_id]
+        extracting = any(
+            sr.fetch_status == SourceRecord.FetchStatuses.EXTRACTING for sr in refreshed
+        )
+        if not extracting or time.monotonic() >= deadline:
+            return refreshed
+        time.sleep(POLL_INTERVAL)
@@ -0,0 +1,146 @@
+"""
+Fetch many documents from the UJS portal at once.
+
+A `Fetcher` runs requests in a pool of threads that share one `requests.Session`, so connections to a host are kept
+alive and reused. It limits how many requests run at once, spaces out the requests it sends to each host, and
+retries requests that fail, waiting longer after each failure.
+"""
+from __future__ import annotations
+from typing import Callable, Dict, Iterable, List, Optional, TypeVar
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+import logging
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+USER_AGENT = "ExpungmentGeneratorTesting"
+# Responses with these statuses are worth trying again.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HostRateLimiter:
+    """
+    Space out the requests sent to each host, so no host gets more than `per_second` requests a second from us.
+    """
+
+    def __init__(self, per_second: float):
+        self.interval = 1.0 / per_second if per_second > 0 else 0.0
+        self.lock = threading.Lock()
+        self.next_slot: Dict[str, float] = {}
+
+    def wait(self, host: str) -> None:
+        """
+        Block until it's this thread's turn to send a request to `host`.
+        """
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class Fetcher:
+    """
+    Run requests concurrently, with a limit on concurrency, per-host rate limits, and retries.
+
+    The defaults come from the DOWNLOAD_CONCURRENCY, DOWNLOAD_REQUESTS_PER_SECOND, DOWNLOAD_RETRIES and
+    DOWNLOAD_TIMEOUT settings.
+
+    Use a Fetcher as a context manager, to close its connections when it's done:
+
+        with Fetcher() as fetcher:
+            responses = fetcher.map(fetcher.get, urls)
+    """
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        requests_per_second: Optional[float] = None,
+        retries: Optional[int] = None,
+        backoff: float = 0.5,
+        timeout: Optional[float] = None,
+    ):
+        self.concurrency = concurrency or getattr(settings, "DOWNLOAD_CONCURRENCY", 8)
+        self.retries = (
+            retries if retries is not None else getattr(settings, "DOWNLOAD_RETRIES", 3)
+        )
+        self.backoff = backoff
+        self.timeout = timeout or getattr(settings, "DOWNLOAD_TIMEOUT", 30)
+        self.limiter = HostRateLimiter(
+            requests_per_second
+            or getattr(settings, "DOWNLOAD_REQUESTS_PER_SECOND", 4)
+        )
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": USER_AGENT})
+        adapter = HTTPAdapter(
+            pool_connections=self.concurrency, pool_maxsize=self.concurrency
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def __enter__(self) -> Fetcher:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.session.close()
+
+    def call(self, host: str, func: Callable[[], R]) -> R:
+        """
+        Call `func`, which sends a request to `host`, retrying it if it raises an exception.
+
+        If the last try raises an exception, so does `call`.
+        """
+        for attempt in range(self.retries + 1):
+            self.limiter.wait(host)
+            try:
+                return func()
+            except Exception as err:
+                if attempt == self.retries:
+                    raise
+                logger.info("Request to %s failed (%s). Trying again.", host, err)
+            time.sleep(self.backoff * 2 ** attempt)
+
+    def get(self, url: str) -> Optional[requests.Response]:
+        """
+        GET a url, retrying if the request fails or the response's status is one of RETRY_STATUSES.
+
+        Returns the last response, or None if the last try didn't get a response.
+        """
+        host = urlparse(url).netloc
+
+        def get_once() -> requests.Response:
+            resp = self.session.get(url, timeout=self.timeout)
+            if resp.status_code in RETRY_STATUSES:
+                raise requests.HTTPError(f"status {resp.status_code}", response=resp)
+            return resp
+
+        try:
+            return self.call(host, get_once)
+        except requests.HTTPError as err:
+            return err.response
+        except requests.RequestException as err:
+            logger.error("Fetching %s failed: %s", url, err)
+            return None
+
+    def map(self, func: Callable[[T], R], items: Iterable[T]) -> List[R]:
+        """
+        Call `func` on each of `items` in the pool of threads, and return the results in the same order.
+        """
+        items = list(items)
+        if not items:
+            return []
+        with ThreadPoolExecutor(
+            max_workers=min(self.concurrency, len(items))
+        ) as executor:
+            return list(executor.map(func, items))
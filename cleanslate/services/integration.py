@@ -0,0 +1,175 @@
+"""
+Parse source records and integrate them into a CRecord in the background.
+
+`start` creates an IntegrationJob, and queues a django-q task to parse each of the job's source records, so the
+source records are parsed in parallel by the cluster's workers. A task that parses a summary finds the cases the
+summary mentions that the job doesn't have dockets for, downloads those dockets, and queues tasks to parse them too.
+When the last source record is parsed, the job integrates the dockets into the CRecord and is done.
+
+While a job is running, `integrated_crecord` returns the CRecord with the dockets parsed so far.
+"""
+from typing import List, Optional
+import logging
+from django.contrib.auth.models import User
+from django.db import transaction
+from django_q.tasks import async_task
+from RecordLib.crecord import CRecord
+from cleanslate.models import IntegrationJob, IntegrationJobSource, SourceRecord
+from cleanslate.services import download as download_service
+from cleanslate.services import parsing
+from cleanslate.services.parsing import dump_crecord, load_crecord
+
+logger = logging.getLogger(__name__)
+
+
+def start(
+    crecord: CRecord, source_records: List[SourceRecord], owner: User
+) -> IntegrationJob:
+    """
+    Start a job to integrate `source_records` into `crecord`.
+    """
+    job = IntegrationJob.objects.create(owner=owner, crecord=dump_crecord(crecord))
+    if source_records:
+        _add_sources(job, source_records)
+    else:
+        finish_if_complete(job.id)
+    return job
+
+
+def _add_sources(job: IntegrationJob, source_records: List[SourceRecord]) -> None:
+    job_sources = IntegrationJobSource.objects.bulk_create(
+        [IntegrationJobSource(job=job, source_record=sr) for sr in source_records]
+    )
+    # Don't let a worker look for a job source before it's committed.
+    for job_source in job_sources:
+        transaction.on_commit(
+            lambda job_source_id=job_source.id: async_task(
+                parse_source, job_source_id
+            )
+        )
+
+
+def parse_source(job_source_id) -> None:
+    """
+    Fetch and parse one source record of an IntegrationJob. (This is a django-q task.)
+    """
+    job_source = IntegrationJobSource.objects.select_related(
+        "source_record", "job"
+    ).get(id=job_source_id)
+    source_record = job_source.source_record
+    try:
+        if not source_record.raw_text and not source_record.file:
+            job_source.status = IntegrationJobSource.Statuses.FETCHING
+            job_source.save(update_fields=["status"])
+            download_service.source_records([source_record])
+        job_source.status = IntegrationJobSource.Statuses.PARSING
+        job_source.save(update_fields=["status"])
+        parsed = parsing.parse(source_record)
+        if source_record.record_type == SourceRecord.RecTypes.SUMMARY_PDF:
+            # Queue the missing dockets before this source is done, so the job isn't finished without them.
+            _add_missing_dockets(
+                job_source.job, [case.docket_number for case in parsed.cases]
+            )
+        job_source.status = IntegrationJobSource.Statuses.DONE
+    except Exception as err:
+        logger.error("Parsing source record %s failed: %s", source_record.id, err)
+        source_record.parse_status = SourceRecord.ParseStatuses.FAILURE
+        job_source.status = IntegrationJobSource.Statuses.FAILED
+        job_source.error = (
+            f"Could not parse {source_record.docket_num} ({source_record.record_type})"
+        )
+    finally:
+        source_record.save()
+        job_source.save()
+    finish_if_complete(job_source.job_id)
+
+
+def _docket_numbers(job: IntegrationJob) -> set:
+    return set(
+        job.sources.filter(
+            source_record__record_type=SourceRecord.RecTypes.DOCKET_PDF
+        ).values_list("source_record__docket_num", flat=True)
+    )
+
+
+def _add_missing_dockets(job: IntegrationJob, docket_numbers: List[str]) -> None:
+    """
+    Find or download the dockets in `docket_numbers` that `job` doesn't have yet, and add them to the job.
+    """
+    known = [
+        js.source_record
+        for js in job.sources.filter(
+            source_record__record_type=SourceRecord.RecTypes.DOCKET_PDF
+        ).select_related("source_record")
+    ]
+    new_source_records = download_service.missing_dockets(
+        docket_numbers, known=known, owner=job.owner
+    )
+    if not new_source_records:
+        return
+    with transaction.atomic():
+        # Another summary may have added some of the same dockets while these were downloading.
+        IntegrationJob.objects.select_for_update().get(id=job.id)
+        present = _docket_numbers(job)
+        _add_sources(
+            job, [sr for sr in new_source_records if sr.docket_num not in present]
+        )
+
+
+def integrated_crecord(job: IntegrationJob) -> CRecord:
+    """
+    The job's CRecord, with the dockets that have been parsed so far integrated into it.
+    """
+    if job.result is not None:
+        return load_crecord(job.result)
+    crecord = load_crecord(job.crecord)
+    job_sources = (
+        job.sources.filter(
+            status=IntegrationJobSource.Statuses.DONE,
+            source_record__record_type=SourceRecord.RecTypes.DOCKET_PDF,
+        )
+        .select_related("source_record")
+        .defer("source_record__raw_text")
+        .order_by("created_at")
+    )
+    for job_source in job_sources:
+        # The source record keeps its parse (see cleanslate.services.parsing).
+        crecord.add_sourcerecord(
+            load_crecord(job_source.source_record.parsed),
+            override_person=True,
+            docket_number=job_source.source_record.docket_num,
+        )
+    return crecord
+
+
+def errors(job: IntegrationJob) -> List[str]:
+    """
+    Errors from the source records the job could not parse.
+    """
+    return list(
+        job.sources.filter(status=IntegrationJobSource.Statuses.FAILED)
+        .order_by("created_at")
+        .values_list("error", flat=True)
+    )
+
+
+def finish_if_complete(job_id) -> Optional[IntegrationJob]:
+    """
+    If each source record of a job has been parsed or has failed, save the integrated CRecord and mark the job done.
+    """
+    with transaction.atomic():
+        job = IntegrationJob.objects.select_for_update().get(id=job_id)
+        if job.status == IntegrationJob.Statuses.DONE:
+            return job
+        unfinished = job.sources.exclude(
+            status__in=[
+                IntegrationJobSource.Statuses.DONE,
+                IntegrationJobSource.Statuses.FAILED,
+            ]
+        )
+        if unfinished.exists():
+            return None
+        job.result = dump_crecord(integrated_crecord(job))
+        job.status = IntegrationJob.Statuses.DONE
+        job.save()
+        return job
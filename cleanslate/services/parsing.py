@@ -0,0 +1,92 @@
+"""
+Parse SourceRecords, reusing earlier parses of the same text by the same parser.
+
+A SourceRecord stores the Person and Cases parsed from it, with the version of the parser that parsed it and a hash
+of the text it was parsed from. `parse` only runs the parser again if the text or the parser has changed since.
+"""
+import json
+import logging
+from rest_framework.utils.encoders import JSONEncoder
+from RecordLib.crecord import CRecord, Case, Person
+from RecordLib.sourcerecords import SourceRecord as RLSourceRecord
+from cleanslate.models import SourceRecord
+from cleanslate.serializers import CaseSerializer, PersonSerializer
+
+logger = logging.getLogger(__name__)
+
+# The fields of a SourceRecord that `parse` changes.
+PARSE_FIELDS = ["parsed", "parser_version", "text_hash", "parse_status"]
+
+
+def dump_crecord(crecord: CRecord) -> str:
+    """
+    The json of a CRecord's person (which may be None) and cases.
+    """
+    return json.dumps(
+        {
+            "person": PersonSerializer(crecord.person).data
+            if crecord.person is not None
+            else None,
+            "cases": CaseSerializer(crecord.cases, many=True).data,
+        },
+        cls=JSONEncoder,
+    )
+
+
+def load_crecord(encoded: str) -> CRecord:
+    """
+    Load a CRecord from json written by `dump_crecord`.
+    """
+    data = json.loads(encoded)
+    person = None
+    if data.get("person"):
+        person_serializer = PersonSerializer(data=data["person"])
+        person_serializer.is_valid(raise_exception=True)
+        person = Person.from_dict(person_serializer.validated_data)
+    cases_serializer = CaseSerializer(data=data.get("cases", []), many=True)
+    cases_serializer.is_valid(raise_exception=True)
+    return CRecord(
+        person=person,
+        cases=[Case.from_dict(case) for case in cases_serializer.validated_data],
+    )
+
+
+def is_fresh(source_record: SourceRecord) -> bool:
+    """
+    Was the stored parse of `source_record` made by the current parser, from the record's current text?
+    """
+    return (
+        source_record.parsed is not None
+        and source_record.parser_version == source_record.current_parser_version()
+        and source_record.text_hash == source_record.current_text_hash()
+    )
+
+
+def parse(source_record: SourceRecord) -> CRecord:
+    """
+    Parse `source_record`, returning a CRecord with the Person and Cases it describes.
+
+    If the stored parse is fresh, it is returned instead. Otherwise the new parse is stored on `source_record` along
+    with its parse_status, but not saved. Save the PARSE_FIELDS of the source records (e.g. with `bulk_update`) to
+    keep the parse.
+
+    Raises whatever the parser raises, after setting the parse_status to FAILURE.
+    """
+    if is_fresh(source_record):
+        source_record.parse_status = SourceRecord.ParseStatuses.SUCCESS
+        return load_crecord(source_record.parsed)
+    try:
+        rlsource = RLSourceRecord(
+            source_record.raw_text or source_record.file.path,
+            parser=source_record.get_parser(),
+        )
+    except Exception:
+        source_record.parse_status = SourceRecord.ParseStatuses.FAILURE
+        raise
+    crecord = CRecord(person=rlsource.person, cases=rlsource.cases)
+    source_record.parsed = dump_crecord(crecord)
+    source_record.parser_version = source_record.current_parser_version()
+    source_record.text_hash = source_record.current_text_hash()
+    source_record.parse_status = SourceRecord.ParseStatuses.SUCCESS
+    return crecord
+
@@ -6,8 +6,12 @@ from django.urls import path
 from .views import (
     FileUploadView,
     SourceRecordsFetchView,
+    SourceRecordsStatusView,
     IntegrateCRecordWithSources,
+    IntegrationJobsView,
+    IntegrationJobView,
     AnalysisView,
+    AnalysisCacheStatsView,
     PetitionsView,
     UserProfileView,
     AutoScreeningView,
@@ -17,8 +21,12 @@ from .views import (
 urlpatterns = [
     path("sourcerecords/upload/", FileUploadView.as_view()),
     path("sourcerecords/fetch/", SourceRecordsFetchView.as_view()),
+    path("sourcerecords/status/", SourceRecordsStatusView.as_view()),
     path("cases/", IntegrateCRecordWithSources.as_view()),
+    path("cases/jobs/", IntegrationJobsView.as_view()),
+    path("cases/jobs/<uuid:job_id>/", IntegrationJobView.as_view()),
     path("analysis/", AnalysisView.as_view()),
+    path("analysis/cache/", AnalysisCacheStatsView.as_view()),
     path("petitions/", PetitionsView.as_view()),
     path("profile/", UserProfileView.as_view()),
     path("screening/", AutoScreeningView.as_view()),
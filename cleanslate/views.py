@@ -2,29 +2,22 @@
 Views for the Recordlib webapp.
 
 """
-from typing import Tuple, List
+from typing import Iterator, Tuple, List
 import os
+import json
 import logging
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.conf import settings
+from django.core.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.views import APIView
 from rest_framework import permissions, status
 from django_q.tasks import async_task
 from RecordLib.crecord import CRecord
-from RecordLib.sourcerecords import SourceRecord as RLSourceRecord
-from RecordLib.analysis import Analysis
-from RecordLib.utilities.serializers import to_serializable
+from RecordLib.analysis import ChargeEdit
 from RecordLib.utilities import cleanslate_screen
-from RecordLib.analysis.ruledefs import (
-    filter_traffic_cases,
-    expunge_summary_convictions,
-    expunge_nonconvictions,
-    expunge_deceased,
-    expunge_over_70,
-    seal_convictions,
-)
 from RecordLib.petitions import Expungement, Sealing
 from cleanslate.models import (
     User,
@@ -34,6 +27,8 @@ from cleanslate.models import (
 )
 from cleanslate.serializers import (
     CRecordSerializer,
+    CaseSerializer,
+    PersonSerializer,
     PetitionViewSerializer,
     FileUploadSerializer,
     UserProfileSerializer,
@@ -43,14 +38,49 @@ from cleanslate.serializers import (
     DownloadDocsSerializer,
     AutoScreeningSerializer,
     TemplateSerializer,
+    IntegrationJobSourceSerializer,
+    ReanalysisSerializer,
 )
 from cleanslate.compressor import Compressor
 from cleanslate.services import download as download_service
-from cleanslate.models import SourceRecord
+from cleanslate.services import analysis_cache
+from cleanslate.services import integration
+from cleanslate.services import extraction
+from cleanslate.services import parsing
+from cleanslate.models import SourceRecord, IntegrationJob
 
 logger = logging.getLogger(__name__)
 
 
+def query_flag(request, name: str) -> bool:
+    """
+    Is the query parameter `name` of a request set to "true"?
+    """
+    return request.query_params.get(name, "").lower() == "true"
+
+
+def _json_fragment(data) -> str:
+    return json.dumps(data, cls=JSONEncoder, separators=(",", ":"))
+
+
+def stream_integrated_record(
+    crecord: CRecord, source_records: List[SourceRecord], errors: List[str]
+) -> Iterator[str]:
+    """
+    Yield the json response of IntegrateCRecordWithSources, serializing one case of `crecord` at a time.
+    """
+    yield '{"crecord":{"person":'
+    yield _json_fragment(PersonSerializer(crecord.person).data)
+    sep = ',"cases":['
+    for case in crecord.cases:
+        yield sep + _json_fragment(CaseSerializer(case).data)
+        sep = ","
+    yield ',"cases":[]' if sep == ',"cases":[' else "]"
+    yield '},"source_records":'
+    yield _json_fragment(SourceRecordSerializer(source_records, many=True).data)
+    yield ',"errors":' + _json_fragment(errors) + "}"
+
+
 class FileUploadView(APIView):
     """
     Handle uploads of source records.
@@ -63,6 +93,9 @@ class FileUploadView(APIView):
         """Accept dockets and summaries locally uploaded by a user, save them to the server,
         and return SourceRecords relating to those files..
 
+        The SourceRecords are returned before the text of the files is extracted, with the fetch_status
+        EXTRACTING. Poll SourceRecordsStatusView to find out when extraction is done, and what kind of
+        record each file is.
 
         This POST needs to be a FORM post, not a json post.
         """
@@ -72,13 +105,10 @@ class FileUploadView(APIView):
             results = []
             try:
                 for upload in files:
-                    source_record = SourceRecord.from_unknown_file(
-                        upload, owner=request.user
-                    )
+                    source_record = SourceRecord.from_upload(upload, owner=request.user)
                     source_record.save()
-                    if source_record is not None:
-                        results.append(source_record)
-                        # TODO FileUploadView should report errors in turning uploaded pdfs into SourceRecords.
+                    results.append(source_record)
+                extraction.start(results)
                 return Response(
                     {"source_records": SourceRecordSerializer(results, many=True).data},
                     status=status.HTTP_200_OK,
@@ -95,6 +125,38 @@ class FileUploadView(APIView):
             )
 
 
+class SourceRecordsStatusView(APIView):
+    """
+    Check on uploaded source records whose text is being extracted.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    # Requests can't wait longer than this for extraction, in seconds.
+    MAX_WAIT = 25
+
+    def get(self, request):
+        """
+        Return the source records with the comma-separated ids in the query parameter `ids`.
+
+        With the query parameter `wait=<seconds>`, wait up to that long for extraction of the source records'
+        text to finish before responding.
+        """
+        try:
+            ids = [i for i in request.query_params.get("ids", "").split(",") if i]
+            wait = min(float(request.query_params.get("wait", 0)), self.MAX_WAIT)
+            source_records = list(
+                SourceRecord.objects.filter(id__in=ids, owner=request.user)
+            )
+        except (ValueError, ValidationError) as err:
+            return Response({"errors": [str(err)]}, status=status.HTTP_400_BAD_REQUEST)
+        if wait > 0:
+            source_records = extraction.wait(source_records, timeout=wait)
+        return Response(
+            {"source_records": SourceRecordSerializer(source_records, many=True).data}
+        )
+
+
 class SourceRecordsFetchView(APIView):
     """
     Views for handling fetching source records that are sent as urls
@@ -130,20 +192,18 @@ def integrate_dockets(
     docket_source_records: List[SourceRecord],
     nonfatal_errors: List[str],
 ) -> Tuple[CRecord, List[str]]:
-    """ Combine a set of source records representing 'dockets' with a criminal record"""
+    """ Combine a set of source records representing 'dockets' with a criminal record
+
+    The parse status and parse results of each source record are saved, in one query.
+    """
     for docket_source_record in docket_source_records:
         try:
-            # get a RecordLib SourceRecord from the webapp sourcerecord model. The RecordLib SourceRecord has the machinery for
-            # parsing the record to get a Person and Cases out of it.
-            rlsource = RLSourceRecord(
-                docket_source_record.raw_text or docket_source_record.file.path,
-                parser=docket_source_record.get_parser(),
-            )
-            # If we reach this line, the parse succeeded.
-            docket_source_record.parse_status = SourceRecord.ParseStatuses.SUCCESS
+            # Get the Person and Cases in the docket. They're only parsed again if the docket or the parser has changed
+            # since the docket was last parsed.
+            parsed = parsing.parse(docket_source_record)
             # Integrate this docket with the full crecord.
             crecord.add_sourcerecord(
-                rlsource,
+                parsed,
                 override_person=True,
                 docket_number=docket_source_record.docket_num,
             )
@@ -152,8 +212,7 @@ def integrate_dockets(
             nonfatal_errors.append(
                 f"Could not parse {docket_source_record.docket_num} ({docket_source_record.record_type})"
             )
-        finally:
-            docket_source_record.save()
+    SourceRecord.objects.bulk_update(docket_source_records, parsing.PARSE_FIELDS)
     return crecord, nonfatal_errors
 
 
@@ -168,30 +227,23 @@ def integrate_summaries(
     Combine a set of source records representing summary sheets with a criminal record. In addition, 
     find any cases that the summary sheets mention which are not already in the criminal record. 
     
-    For these extra cases, find a docket sheet for this case, and add it as a source record and integrate its information
-    into the criminal record.
+    For these extra cases, find a docket sheet for this case (one the owner already has, or else one downloaded
+    from the UJS portal), and add it as a source record and integrate its information into the criminal record.
     """
     dockets_in_summaries = []
     for summary_source_record in summary_source_records:
         try:
-            rlsource = RLSourceRecord(
-                summary_source_record.raw_text or summary_source_record.file.path,
-                parser=summary_source_record.get_parser(),
-            )
-            summary_source_record.parse_status = SourceRecord.ParseStatuses.SUCCESS
-            dockets_in_summaries.extend([c.docket_number for c in rlsource.cases])
+            parsed = parsing.parse(summary_source_record)
+            dockets_in_summaries.extend([c.docket_number for c in parsed.cases])
         except Exception:
             summary_source_record.parse_status = SourceRecord.ParseStatuses.FAILURE
-        finally:
-            summary_source_record.save()
+    SourceRecord.objects.bulk_update(summary_source_records, parsing.PARSE_FIELDS)
 
     # compare the dockets_in_summaries to dockets already collected as source records
     # to see what dockets are missing from the set of source records.
-    missing_dockets = [
-        dn for dn in dockets_in_summaries if dn not in docket_source_records
-    ]
-    new_source_dockets = download_service.dockets(missing_dockets, owner=owner)
-    logger.info("Downloaded %d", len(new_source_dockets))
+    new_source_dockets = download_service.missing_dockets(
+        dockets_in_summaries, known=docket_source_records, owner=owner
+    )
 
     # now parse and integrate these new source dockets into the crecord.
     crecord, nonfatal_errors = integrate_dockets(
@@ -200,6 +252,36 @@ def integrate_summaries(
     return crecord, new_source_dockets, nonfatal_errors
 
 
+def find_or_create_source_records(
+    source_records_data: List[dict], owner, download: bool = True
+) -> List[SourceRecord]:
+    """
+    Find the SourceRecords in the database that have been sent in a request, or create them if they are new.
+
+    If `download` is True, new source records are also downloaded to the server.
+
+    The existing source records are read in one query, and the new ones are created in one query.
+
+    TODO this probably doesn't handle a request with a new SoureRecord missing a URL.
+    """
+    existing = SourceRecord.objects.in_bulk(
+        [data["id"] for data in source_records_data if data.get("id") is not None]
+    )
+    source_records = []
+    new_source_records = []
+    for source_record_data in source_records_data:
+        source_rec = existing.get(source_record_data.get("id"))
+        if source_rec is None:
+            # create this source record in the database, if it is new.
+            source_rec = SourceRecord(**source_record_data, owner=owner)
+            new_source_records.append(source_rec)
+        source_records.append(source_rec)
+    SourceRecord.objects.bulk_create(new_source_records)
+    if download:
+        download_service.source_records(new_source_records)
+    return source_records
+
+
 class IntegrateCRecordWithSources(APIView):
     """
     View to handle combining the information about a case or cases from source records with a crecord. 
@@ -218,6 +300,8 @@ class IntegrateCRecordWithSources(APIView):
         accepts a serialzed crecord and a list of sourcerecords. It attempts
         to parse each source_record, and then integrate the sourcerecords into the crecord.
 
+        With the query parameter `stream=true`, the response is streamed, one case at a time.
+
         TODO IntegrateCRecordWithSources should communicate failures better.
 
         """
@@ -226,24 +310,9 @@ class IntegrateCRecordWithSources(APIView):
             if serializer.is_valid():
                 nonfatal_errors = []
                 crecord = CRecord.from_dict(serializer.validated_data["crecord"])
-                source_records = []
-                # Find the SourceRecords in the database that have been sent in this request,
-                # or if these are new source records, download the files they point to.
-                # TODO this probably doesn't handle a request with a new SoureRecord missing a URL.
-                for source_record_data in serializer.validated_data["source_records"]:
-                    try:
-                        source_records.append(
-                            SourceRecord.objects.get(id=source_record_data["id"])
-                        )
-                    except Exception:
-                        # create this source record in the database, if it is new.
-                        source_rec = SourceRecord(
-                            **source_record_data, owner=request.user
-                        )
-                        source_rec.save()
-                        # also download it to the server.
-                        download_service.source_records([source_rec])
-                        source_records.append(source_rec)
+                source_records = find_or_create_source_records(
+                    serializer.validated_data["source_records"], owner=request.user
+                )
                 # Parse the uploaded source records, collecting RecordLib.SourceRecord objects.
                 # These objects are parsing the records and figuring out case information in the SourceRecords.
                 # For any source records that are summaries, find out if the summary describes cases that aren't also
@@ -274,6 +343,13 @@ class IntegrateCRecordWithSources(APIView):
                     owner=request.user,
                 )
                 source_records += new_source_records
+                if query_flag(request, "stream"):
+                    return StreamingHttpResponse(
+                        stream_integrated_record(
+                            crecord, source_records, nonfatal_errors
+                        ),
+                        content_type="application/json",
+                    )
                 return Response(
                     {
                         "crecord": CRecordSerializer(crecord).data,
@@ -293,6 +369,72 @@ class IntegrateCRecordWithSources(APIView):
             )
 
 
+class IntegrationJobsView(APIView):
+    """
+    Start background jobs that integrate source records with a crecord. See `cleanslate.services.integration`.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        """
+        Accept a CRecord and a set of SourceRecords, like IntegrateCRecordWithSources does, and start a job
+        that parses the SourceRecords and incorporates them into the CRecord.
+
+        Returns the id of the job. Poll IntegrationJobView for the job's progress.
+        """
+        serializer = IntegrateSourcesSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                {"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST
+            )
+        crecord = CRecord.from_dict(serializer.validated_data["crecord"])
+        # The job downloads new source records in the background.
+        source_records = find_or_create_source_records(
+            serializer.validated_data["source_records"],
+            owner=request.user,
+            download=False,
+        )
+        job = integration.start(crecord, source_records, owner=request.user)
+        return Response({"job_id": job.id}, status=status.HTTP_202_ACCEPTED)
+
+
+class IntegrationJobView(APIView):
+    """
+    The progress of a job that integrates source records with a crecord.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, job_id):
+        """
+        Return the status of the job and each of its source records, and the crecord with the dockets parsed so far.
+
+        When the job's status is DONE, the crecord is complete, and the response is the same as
+        IntegrateCRecordWithSources's, plus the job's status.
+        """
+        try:
+            job = IntegrationJob.objects.get(id=job_id, owner=request.user)
+        except IntegrationJob.DoesNotExist:
+            return Response(
+                {"errors": ["No such job."]}, status=status.HTTP_404_NOT_FOUND
+            )
+        job_sources = job.sources.select_related("source_record").order_by(
+            "created_at"
+        )
+        return Response(
+            {
+                "status": job.status,
+                "sources": IntegrationJobSourceSerializer(job_sources, many=True).data,
+                "crecord": CRecordSerializer(integration.integrated_crecord(job)).data,
+                "source_records": SourceRecordSerializer(
+                    [js.source_record for js in job_sources], many=True
+                ).data,
+                "errors": integration.errors(job),
+            }
+        )
+
+
 class AnalysisView(APIView):
     """
     Views related to an analysis of a CRecord.
@@ -308,21 +450,27 @@ class AnalysisView(APIView):
         Return, if not an error, will be a json-encoded Decision that explains the expungements
         and sealings that can be generated for this record.
 
+        Analyses are cached, so posting the same record again returns the same analysis without re-analyzing it.
+
+        With the query parameter `compact=true`, each Decision in the analysis is written out once, and
+        Decisions that appear again are references to it. See `to_compact_serializable`.
+
+        With the query parameter `stream=true`, the analysis is streamed a piece at a time instead of cached.
         """
         try:
             serializer = CRecordSerializer(data=request.data)
             if serializer.is_valid():
                 rec = CRecord.from_dict(serializer.validated_data)
-                analysis = (
-                    Analysis(rec)
-                    .rule(filter_traffic_cases)
-                    .rule(expunge_deceased)
-                    .rule(expunge_over_70)
-                    .rule(expunge_nonconvictions)
-                    .rule(expunge_summary_convictions)
-                    .rule(seal_convictions)
+                compact = query_flag(request, "compact")
+                if query_flag(request, "stream"):
+                    return StreamingHttpResponse(
+                        analysis_cache.stream_analysis(rec, compact=compact),
+                        content_type="application/json",
+                    )
+                return HttpResponse(
+                    analysis_cache.cached_analysis(rec, compact=compact),
+                    content_type="application/json",
                 )
-                return Response(to_serializable(analysis))
             return Response(
                 {"validation_errors": serializer.errors},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -331,6 +479,53 @@ class AnalysisView(APIView):
             logger.error(err)
             return Response({"errors": str(err)}, status=status.HTTP_400_BAD_REQUEST)
 
+    def patch(self, request):
+        """ Analyze a Criminal Record again, after editing some of its charges.
+
+        PATCH body should be json like {"crecord": <CRecord>, "edits": [<edit>, ...]}, where each edit is like
+        {"docket_number": "CP-51-CR-...", "sequence": "1", "changes": {"grade": "M2"}}.
+
+        Return is the json-encoded analysis of the edited record, like a POST of the edited record would return.
+        Decisions about the charges that weren't edited are reused from the analysis of `crecord`.
+
+        With the query parameter `compact=true`, the analysis is compact, like a POST's.
+        """
+        try:
+            serializer = ReanalysisSerializer(data=request.data)
+            if serializer.is_valid():
+                rec = CRecord.from_dict(serializer.validated_data["crecord"])
+                edits = [
+                    ChargeEdit.from_dict(edit)
+                    for edit in serializer.validated_data["edits"]
+                ]
+                return HttpResponse(
+                    analysis_cache.reanalyzed(
+                        rec, edits, compact=query_flag(request, "compact")
+                    ),
+                    content_type="application/json",
+                )
+            return Response(
+                {"validation_errors": serializer.errors},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+        except Exception as err:
+            logger.error(err)
+            return Response({"errors": str(err)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class AnalysisCacheStatsView(APIView):
+    """
+    Metrics about the cache of analyses.
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        """
+        Hits, misses, hit rate, and milliseconds of analysis saved by the cache of analyses.
+        """
+        return Response(analysis_cache.stats())
+
 
 class UserProfileView(APIView):
     """Information about a user's account.
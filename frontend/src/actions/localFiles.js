@@ -1,5 +1,6 @@
 import { upsertSourceRecords } from "./sourceRecords";
 import { updateCRecord } from "./crecord";
+import { newMessage } from "./messages";
 import * as api from "../api";
 /**
  * Actions related to uploading local files and getting back SourceRecords.
@@ -20,6 +21,55 @@ import * as api from "../api";
 //    }
 //}
 
+// How long to wait between asking the server about source records, and how
+// many times to ask before giving up on their text.
+const EXTRACTION_POLL_INTERVAL_MS = 1000;
+const MAX_EXTRACTION_POLLS = 60;
+
+/**
+ * Keep asking the server about source records until their text has been
+ * extracted, updating them in the store each time. Then update the CRecord
+ * with them. If the server can't be asked, or the text still isn't extracted
+ * after MAX_EXTRACTION_POLLS tries, tell the user, and update the CRecord with
+ * the records that are ready.
+ * @param  {Function} dispatch
+ * @param  {Object} data - an object with a list of `source_records`
+ * @param  {number} polls - how many times the server has been asked so far
+ */
+function waitForExtraction(dispatch, data, polls = 0) {
+  const extracting = data.source_records.filter(
+    (sourceRecord) => sourceRecord.fetch_status === "EXTRACTING"
+  );
+  if (extracting.length === 0) {
+    dispatch(updateCRecord());
+    return;
+  }
+  if (polls >= MAX_EXTRACTION_POLLS) {
+    dispatch(
+      newMessage({
+        msgText: `The text of ${extracting.length} uploaded file(s) is taking too long to read.`,
+        severity: "warning",
+      })
+    );
+    dispatch(updateCRecord());
+    return;
+  }
+  setTimeout(() => {
+    api
+      .fetchSourceRecordsStatus(
+        extracting.map((sourceRecord) => sourceRecord.id)
+      )
+      .then((response) => {
+        dispatch(upsertSourceRecords(response.data));
+        waitForExtraction(dispatch, response.data, polls + 1);
+      })
+      .catch((err) => {
+        dispatch(newMessage({ msgText: err, severity: "error" }));
+        dispatch(updateCRecord());
+      });
+  }, EXTRACTION_POLL_INTERVAL_MS);
+}
+
 /**
  * An async action creator returning a function (of dispatch).
  * @param  {Object} file - uploaded Summary pdf file
@@ -30,7 +80,8 @@ export function uploadRecords(files) {
     api.uploadRecords(files).then((response) => {
       const data = response.data;
       dispatch(upsertSourceRecords(data));
-      dispatch(updateCRecord());
+      // The server extracts the text of the files after responding.
+      waitForExtraction(dispatch, data);
       // Wrong - the response will be source records.
       // const cRecord = JSON.parse(data);
       // const defendant = cRecord.defendant;
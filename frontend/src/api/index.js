@@ -47,11 +47,80 @@ export function uploadRecords(files) {
   });
 }
 
+/**
+ * Get the current state of source records, e.g., to find out if their text
+ * has been extracted yet.
+ * @param {Array} ids - ids of the source records
+ * @param {number} wait - seconds the server may wait for extraction to finish
+ * @return {Object} a promise
+ */
+export function fetchSourceRecordsStatus(ids, wait = 20) {
+  return client.get("/api/record/sourcerecords/status/", {
+    params: { ids: ids.join(","), wait: wait },
+  });
+}
+
+/**
+ * Replace the `{"$ref": id}` objects in a compact analysis with the Decisions
+ * they refer to.
+ *
+ * A compact analysis only writes out each Decision once, with an "$id".
+ * See `to_compact_serializable` on the server.
+ * @param {Object} compacted - an analysis in the compact format
+ * @return {Object} the analysis with every Decision written out
+ */
+export function expandReferences(compacted) {
+  const byId = {};
+  const collect = (val) => {
+    if (val && typeof val === "object") {
+      if (!Array.isArray(val) && "$id" in val) {
+        byId[val["$id"]] = val;
+      }
+      Object.values(val).forEach(collect);
+    }
+  };
+  const expanded = {};
+  const expand = (val) => {
+    if (Array.isArray(val)) {
+      return val.map(expand);
+    }
+    if (val && typeof val === "object") {
+      if ("$ref" in val) {
+        val = byId[val["$ref"]];
+      }
+      if ("$id" in val) {
+        const id = val["$id"];
+        if (!(id in expanded)) {
+          expanded[id] = {};
+          Object.keys(val)
+            .filter((k) => k !== "$id")
+            .forEach((k) => (expanded[id][k] = expand(val[k])));
+        }
+        return expanded[id];
+      }
+      const obj = {};
+      Object.keys(val).forEach((k) => (obj[k] = expand(val[k])));
+      return obj;
+    }
+    return val;
+  };
+  collect(compacted);
+  return expand(compacted);
+}
+
 /**
  * POST a CRecord to the server and retrieve an analysis.
+ *
+ * The server sends the analysis in the compact format, which is expanded here.
  */
 export function analyzeCRecord(data) {
-  return client.post("/api/record/analysis/", removeNullValues(data));
+  return client
+    .post("/api/record/analysis/", removeNullValues(data), {
+      params: { compact: true },
+    })
+    .then((response) =>
+      Object.assign({}, response, { data: expandReferences(response.data) })
+    );
 }
 
 export function fetchPetitions(petitions) {
@@ -2,9 +2,17 @@ import click
 import logging
 from RecordLib.utilities.serializers import to_serializable
 from RecordLib.crecord import CRecord
+from RecordLib.crecord.charge_table import ChargeTable
 from RecordLib.sourcerecords.summary import Summary
 from RecordLib.sourcerecords.docket import Docket
-from RecordLib.analysis import Analysis
+from RecordLib.analysis import Analysis, RuleCostTable
+from RecordLib.batch import (
+    bundles_from_directory,
+    run_batch,
+    JsonLinesWriter,
+    CsvWriter,
+    Checkpoint,
+)
 from RecordLib.utilities.redis_helper import RedisHelper
 from RecordLib.analysis.ruledefs import (
     expunge_summary_convictions,
@@ -13,11 +21,7 @@ from RecordLib.analysis.ruledefs import (
     expunge_over_70,
     seal_convictions,
 )
-from RecordLib.analysis.ruledefs.sealing_rules import (
-    no_f1_convictions,
-    any_felony_convictions_n_years,
-    more_than_x_convictions_y_grade_z_years,
-)
+from RecordLib.analysis.ruledefs import cohort_rules
 from RecordLib.sourcerecords.summary.pdf import parse_pdf as parse_pdf_summary
 import pytest
 import json
@@ -63,17 +67,21 @@ def triage(directory, tempdir, output):
         except Exception as e:
             logging.error(f"Error for {sd}: {str(e)}")
     logging.info(f"Now analyzing {len(recs)} records.")
+    table = ChargeTable([rec for _, rec in recs])
+    felony_5_yrs = cohort_rules.any_felony_convictions_n_years(table, 5)
+    m1s_15_yrs = cohort_rules.more_than_x_convictions_y_grade_z_years(table, 2, "M1", 15)
+    m2s_20_yrs = cohort_rules.more_than_x_convictions_y_grade_z_years(table, 4, "M2", 20)
+    any_f1_convictions = ~cohort_rules.no_f1_convictions(table)
     results = []
-    for sd, rec in recs:
-        
+    for i, (sd, rec) in enumerate(recs):
         res = {
                 "dir": sd,
                 "name": rec.person.full_name(),
                 "cases": len(rec.cases),
-                "felony_5_yrs": bool(any_felony_convictions_n_years(rec, 5)),
-                "2plus_m1s_15yrs": bool(more_than_x_convictions_y_grade_z_years(rec, 2, "M1", 15)),
-                "4plus_m2s_20yrs": bool(more_than_x_convictions_y_grade_z_years(rec, 4, "M2", 20)),
-                "any_f1_convictions": not no_f1_convictions(rec),
+                "felony_5_yrs": bool(felony_5_yrs[i]),
+                "2plus_m1s_15yrs": bool(m1s_15_yrs[i]),
+                "4plus_m2s_20yrs": bool(m2s_20_yrs[i]),
+                "any_f1_convictions": bool(any_f1_convictions[i]),
         }
         res["any_disqualifiers"] = any([
             res["felony_5_yrs"],
@@ -92,6 +100,54 @@ def triage(directory, tempdir, output):
     
     logging.info("Complete.")
 
+@cli.command()
+@click.option("--directory", "-d", type=click.Path(), required=True)
+@click.option("--output", "-o", type=click.Path(), required=True)
+@click.option(
+    "--format", "-f", "output_format", type=click.Choice(["jsonl", "csv"]), default="jsonl"
+)
+@click.option("--workers", "-w", type=int, default=None, help="Number of worker processes. Defaults to the number of cpus.")
+@click.option("--chunksize", type=int, default=8, help="Number of people to send to a worker at once.")
+@click.option("--checkpoint", "-c", type=click.Path(), default=None, help="File listing finished people. Reuse it to resume a crashed batch.")
+def batch(directory, output, output_format, workers, chunksize, checkpoint):
+    """
+    Analyze a set of directories each containing records for a single person, in parallel, writing results as they finish.
+    """
+    logging.basicConfig(level=logging.ERROR)
+    if not os.path.exists(directory):
+        logging.error(f"{directory} does not exist.")
+        return
+    writer_class = JsonLinesWriter if output_format == "jsonl" else CsvWriter
+    checkpoint = Checkpoint(checkpoint) if checkpoint is not None else None
+    with writer_class(output) as writer:
+        count = 0
+        for result in run_batch(
+            bundles_from_directory(directory),
+            workers=workers,
+            chunksize=chunksize,
+            writer=writer,
+            checkpoint=checkpoint,
+        ):
+            count += 1
+            click.echo(f"{result.bundle_id}: {result.cases} cases, {len(result.errors)} errors.")
+    click.echo(f"Analyzed {count} records.")
+
+@cli.command()
+@click.option("--directory", "-d", type=click.Path(), required=True)
+@click.option("--workers", "-w", type=int, default=0, help="Number of worker processes. By default, records are analyzed in this process, so timings aren't disturbed by other workers.")
+def profile(directory, workers):
+    """
+    Analyze a set of directories each containing records for a single person, and print what each rule cost, in total.
+    """
+    logging.basicConfig(level=logging.ERROR)
+    if not os.path.exists(directory):
+        logging.error(f"{directory} does not exist.")
+        return
+    table = RuleCostTable()
+    for result in run_batch(bundles_from_directory(directory), workers=workers, profile=True):
+        table.add_all(result.rule_profiles)
+    click.echo(table.format())
+
 @cli.command()
 @click.option("--pdf-summary", "-ps", type=click.Path(), required=True, default=None)
 @click.option("--tempdir", "-td", type=click.Path(), default="tests/data/tmp")
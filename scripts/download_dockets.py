@@ -7,7 +7,7 @@ import os
 from datetime import datetime
 import click
 import requests
-from ujs_search.services import searchujs
+from RecordLib.utilities import ujs_cache
 from RecordLib.utilities.number_generator import create_docket_numbers
 
 # pylint: disable=no-member
@@ -45,7 +45,7 @@ def download_docket(docket_num: str, doc_type: str):
         as well as the downloaded file. Otherwise, a tuple (None, None)
     """
     try:
-        resp = searchujs.search_by_docket(docket_num)
+        resp = ujs_cache.search_by_docket(docket_num)
     except Exception as err:
         logging.error(str(err))
         return None, None
@@ -122,7 +122,7 @@ def names(
             last_name = name[-1]
             dob = datetime.strptime(row["DOB"], r"%m/%d/%Y")
             for court_to_search in courts:
-                results = searchujs.search_by_name(
+                results = ujs_cache.search_by_name(
                     first_name, last_name, dob, court=court_to_search
                 )
                 if len(results[court_to_search]) > 0:
@@ -1,7 +1,7 @@
 import click
 from RecordLib.sourcerecords.docket import Docket
 from RecordLib.utilities.serializers import to_serializable
-from ujs_search.services import searchujs
+from RecordLib.utilities import ujs_cache
 import json
 import io
 import logging
@@ -115,7 +115,7 @@ def docket_number(docket_number, doctype, loglevel, save_docket, save_parsed):
     handler.setLevel(loglevel)
     root_logger.addHandler(handler)
     root_logger.info("Logging is working")
-    results, _ = searchujs.search_by_docket(docket_number)
+    results, _ = ujs_cache.search_by_docket(docket_number)
     assert len(results) == 1, "Request for docket failed."
     if doctype == "summary":
         url = results[0]["summary_url"]
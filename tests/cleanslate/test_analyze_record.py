@@ -1,6 +1,11 @@
-from RecordLib.utilities.serializers import to_serializable
+from django.core.cache import caches
+from RecordLib.utilities.serializers import to_serializable, expand_references
 from RecordLib.petitions import Petition
+from cleanslate.services import analysis_cache
 import json
+import copy
+from datetime import date
+from RecordLib.analysis import ChargeEdit
 
 
 def test_analyze(admin_client, example_crecord):
@@ -17,3 +22,94 @@ def test_analyze(admin_client, example_crecord):
     decisions = analysis["decisions"]
     petitions = [p for d in decisions for p in d["value"]]
     assert all("petition_type" in p.keys() for p in petitions)
+
+
+def test_analyze_twice_uses_cache(admin_client, example_crecord):
+    caches[analysis_cache.CACHE_ALIAS].clear()
+    caches[analysis_cache.STATS_CACHE_ALIAS].clear()
+    responses = [
+        admin_client.post(
+            "/api/record/analysis/",
+            data=to_serializable(example_crecord),
+            content_type="application/json",
+        )
+        for _ in range(2)
+    ]
+    assert responses[0].json() == responses[1].json()
+    stats = admin_client.get("/api/record/analysis/cache/").json()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_cache_stats_outlast_cached_analyses(example_crecord):
+    caches[analysis_cache.STATS_CACHE_ALIAS].clear()
+    for _ in range(2):
+        analysis_cache.cached_analysis(example_crecord)
+    caches[analysis_cache.CACHE_ALIAS].clear()
+    stats = analysis_cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_analyze_compact(admin_client, example_crecord):
+    responses = [
+        admin_client.post(
+            f"/api/record/analysis/{query}",
+            data=to_serializable(example_crecord),
+            content_type="application/json",
+        )
+        for query in ["", "?compact=true"]
+    ]
+    assert expand_references(responses[1].json()) == responses[0].json()
+
+
+def test_analyze_streaming(admin_client, example_crecord):
+    resp = admin_client.post(
+        "/api/record/analysis/?stream=true",
+        data=to_serializable(example_crecord),
+        content_type="application/json",
+    )
+    assert resp.streaming
+    analysis = json.loads(b"".join(resp.streaming_content))
+    assert all(
+        key in ["record", "remaining_record", "decisions"] for key in analysis.keys()
+    )
+
+
+def test_analyze_edits(admin_client, example_crecord):
+    edit = {"docket_number": "12-MC-01", "sequence": "1", "changes": {"grade": "M1"}}
+    patched = admin_client.patch(
+        "/api/record/analysis/",
+        data={"crecord": to_serializable(example_crecord), "edits": [edit]},
+        content_type="application/json",
+    )
+    assert patched.status_code == 200
+    example_crecord.cases[0].charges[0].grade = "M1"
+    posted = admin_client.post(
+        "/api/record/analysis/",
+        data=to_serializable(example_crecord),
+        content_type="application/json",
+    )
+    assert patched.json() == posted.json()
+
+
+def test_reanalyzed_remembers_unedited_charges(example_crecord, example_case):
+    example_crecord.cases = []
+    for i in range(4):
+        case = copy.deepcopy(example_case)
+        case.docket_number = f"CP-51-CR-000000{i}-2010"
+        case.charges = [copy.deepcopy(case.charges[0]) for _ in range(3)]
+        for sequence, charge in enumerate(case.charges):
+            charge.sequence = str(sequence)
+        example_crecord.cases.append(case)
+    as_of = date(2020, 1, 1)
+    memo = analysis_cache.base_analysis(example_crecord, as_of).context.memo
+    evaluations, saved_evaluations = memo.evaluations, memo.saved_evaluations
+
+    edit = ChargeEdit(
+        docket_number="CP-51-CR-0000002-2010", sequence="1", changes={"grade": "M1"}
+    )
+    analysis_cache.reanalyzed(example_crecord, [edit], as_of=as_of)
+
+    assert memo.saved_evaluations > saved_evaluations
+    assert 0 < memo.evaluations - evaluations < evaluations
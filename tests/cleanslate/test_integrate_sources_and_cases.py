@@ -4,9 +4,12 @@ the crecord
 """
 
 import os
+import json
 import pytest
 from django.core.files import File
-from cleanslate.models import SourceRecord
+from cleanslate.models import SourceRecord, IntegrationJob
+from cleanslate.services import integration
+from cleanslate.views import find_or_create_source_records
 from cleanslate.serializers import SourceRecordSerializer, CRecordSerializer
 from RecordLib.crecord import CRecord
 from RecordLib.petitions import Expungement
@@ -69,3 +72,91 @@ def test_integrate_sources_with_crecord(dclient, admin_user, example_crecord):
     except Exception as err:
         pytest.fail(err)
 
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("with_cases", [True, False])
+def test_integrate_sources_streaming(dclient, admin_user, example_crecord, with_cases):
+    """
+    A streamed response has the same json as a response that isn't streamed, whether or not the crecord has cases.
+    """
+    dclient.force_authenticate(user=admin_user)
+    if not with_cases:
+        example_crecord.cases = []
+    doc_1 = SourceRecord.objects.create(
+        docket_num="MC-1234",
+        record_type=SourceRecord.RecTypes.DOCKET_PDF,
+        raw_text="Not really a docket",
+        owner=admin_user,
+    )
+    data = {
+        "crecord": CRecordSerializer(example_crecord).data,
+        "source_records": [SourceRecordSerializer(doc_1).data],
+    }
+    resp = dclient.put("/api/record/cases/", data=data)
+    streamed = dclient.put("/api/record/cases/?stream=true", data=data)
+    assert streamed.status_code == 200
+    assert streamed.streaming
+    assert json.loads(b"".join(streamed.streaming_content)) == resp.json()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_integration_job(dclient, admin_user, example_crecord, monkeypatch):
+    """
+    User can start a job to integrate source records with a crecord, and poll it for the integrated crecord.
+    """
+    # Run the job's tasks right away, instead of in a django-q cluster.
+    monkeypatch.setattr(
+        integration, "async_task", lambda func, *args, **kwargs: func(*args, **kwargs)
+    )
+    dclient.force_authenticate(user=admin_user)
+    docket = os.listdir("tests/data/dockets/")[0]
+    with open(f"tests/data/dockets/{docket}", "rb") as d:
+        doc_1 = SourceRecord.objects.create(
+            caption="Hello v. World",
+            docket_num="MC-1234",
+            court=SourceRecord.Courts.CP,
+            url="https://abc.def",
+            record_type=SourceRecord.RecTypes.DOCKET_PDF,
+            file=File(d),
+            owner=admin_user,
+        )
+    data = {
+        "crecord": CRecordSerializer(example_crecord).data,
+        "source_records": [SourceRecordSerializer(doc_1).data],
+    }
+    resp = dclient.post("/api/record/cases/jobs/", data=data)
+    assert resp.status_code == 202
+    resp = dclient.get(f"/api/record/cases/jobs/{resp.data['job_id']}/")
+    assert resp.status_code == 200
+    assert resp.data["status"] == IntegrationJob.Statuses.DONE
+    assert [source["status"] for source in resp.data["sources"]] == ["DONE"]
+    assert len(resp.data["crecord"]["cases"]) == len(example_crecord.cases) + 1
+
+
+@pytest.mark.django_db
+def test_find_or_create_source_records(admin_user, django_assert_max_num_queries):
+    existing = [
+        SourceRecord.objects.create(
+            caption="Hello v. World",
+            docket_num=f"MC-123{i}",
+            record_type=SourceRecord.RecTypes.DOCKET_PDF,
+            owner=admin_user,
+        )
+        for i in range(5)
+    ]
+    data = [SourceRecordSerializer(sr).data for sr in existing] + [
+        {
+            "caption": "Hello v. Again",
+            "docket_num": f"MC-456{i}",
+            "record_type": SourceRecord.RecTypes.DOCKET_PDF,
+        }
+        for i in range(3)
+    ]
+    serializer = SourceRecordSerializer(data=data, many=True)
+    assert serializer.is_valid()
+    with django_assert_max_num_queries(2):
+        source_records = find_or_create_source_records(
+            serializer.validated_data, owner=admin_user, download=False
+        )
+    assert [sr.docket_num for sr in source_records] == [d["docket_num"] for d in data]
+    assert SourceRecord.objects.count() == 8
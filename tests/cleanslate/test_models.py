@@ -1,10 +1,11 @@
 from django.test import TestCase
 from django.core.files import File
 from cleanslate.models import ExpungementPetitionTemplate, SealingPetitionTemplate, SourceRecord
+from cleanslate.fields import STORED_ZLIB, compress_text, decompress_text
 from RecordLib.petitions import Expungement
 import pytest
 import io
-from django.db import IntegrityError
+from django.db import IntegrityError, connection
 from django.contrib.auth.models import User
 
 # django unittest test, for testing the database and relying on django's built in db setup/teardowns.
@@ -77,4 +78,24 @@ def test_create_source_record(admin_user):
     saved_model = SourceRecord.objects.get(id=new_id)
     assert saved_model.caption == "Comm. v. Smith"
     assert saved_model.fetch_status == SourceRecord.FetchStatuses.NOT_FETCHED
-    assert saved_model.parse_status == SourceRecord.ParseStatuses.UNKNOWN
\ No newline at end of file
+    assert saved_model.parse_status == SourceRecord.ParseStatuses.UNKNOWN
+
+@pytest.mark.django_db
+def test_source_record_text_is_compressed(admin_user):
+    text = "CP-51-CR-0000001-2020" + " " * 1000 + "Comm. v. Smith\n"
+    rec_model = SourceRecord.objects.create(
+        docket_num="CP-51-CR-0000001-2020",
+        record_type=SourceRecord.RecTypes.DOCKET_PDF,
+        raw_text=text,
+        owner=admin_user)
+    saved_model = SourceRecord.objects.get(id=rec_model.id)
+    assert saved_model.raw_text == text
+    # The column holds the compressed text.
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT raw_text FROM {SourceRecord._meta.db_table} WHERE id = %s",
+            [SourceRecord._meta.pk.get_db_prep_value(rec_model.id, connection)])
+        stored = bytes(cursor.fetchone()[0])
+    assert stored[0] == STORED_ZLIB
+    assert len(stored) < len(text) / 10
+    assert decompress_text(compress_text("")) == ""
@@ -1,9 +1,12 @@
-from datetime import datetime
+from datetime import datetime, timezone
 import time
+import threading
 import logging
 import os
 import pytest
 import requests
+from types import SimpleNamespace
+from django.core.management import call_command
 from django.core.files import File
 from django.conf import settings
 from cleanslate.models import (
@@ -11,9 +14,13 @@ from cleanslate.models import (
     ExpungementPetitionTemplate,
     User,
     UserProfile,
+    StoredDocument,
 )
 import cleanslate.services.download as download
+from cleanslate.services.fetch import Fetcher, HostRateLimiter
 from cleanslate.services.initializers import clear_missing_petition_templates
+from cleanslate.services import parsing
+from cleanslate.services import docket_store
 
 logger = logging.getLogger(__name__)
 
@@ -25,28 +32,43 @@ class FakeResponse:
 
 
 def test_download_source_records(admin_user, monkeypatch):
+    lock = threading.Lock()
+    in_flight = [0]
+    most_in_flight = [0]
+
     def slow_get(*args, **kwargs):
-        time.sleep(3)
+        with lock:
+            in_flight[0] += 1
+            most_in_flight[0] = max(most_in_flight[0], in_flight[0])
+        time.sleep(1)
+        with lock:
+            in_flight[0] -= 1
         return FakeResponse()
 
-    monkeypatch.setattr(requests, "get", slow_get)
+    monkeypatch.setattr(requests.Session, "get", slow_get)
 
-    rec = SourceRecord.objects.create(
-        caption="Test v Test",
-        docket_num="CP-1234",
-        court=SourceRecord.Courts.CP,
-        url="https://some.slow.url",
-        record_type=SourceRecord.RecTypes.SUMMARY_PDF,
-        owner=admin_user,
-    )
-    rec.save()
-    assert rec.file.name is None
+    recs = [
+        SourceRecord.objects.create(
+            caption="Test v Test",
+            docket_num=f"CP-123{i}",
+            court=SourceRecord.Courts.CP,
+            url=f"https://some.slow.url/{i}",
+            record_type=SourceRecord.RecTypes.SUMMARY_PDF,
+            owner=admin_user,
+        )
+        for i in range(3)
+    ]
+    assert all(rec.file.name is None for rec in recs)
     before = datetime.now()
-    recs = [rec, rec, rec]
     download.source_records(recs)
     after = datetime.now()
     time_spent = after - before
-    assert rec.file.name is not None
+    for rec in recs:
+        rec.refresh_from_db()
+        assert rec.file.name is not None
+        assert rec.fetch_status == SourceRecord.FetchStatuses.FETCHED
+    # The documents are fetched at the same time.
+    assert most_in_flight[0] > 1
     # use pytest --log-cli-level info to see this.
     logger.info(
         f"downloading {len(recs)} document took {time_spent.total_seconds()} seconds."
@@ -110,3 +132,180 @@ def test_clear_missing_templates_doesnt_delete_valid_templates(admin_user):
     refreshed_admin_user = User.objects.get(id=admin_user.id)
     assert refreshed_admin_user.userprofile.expungement_petition_template != None
 
+
+def test_fetcher_retries():
+    calls = []
+
+    def flaky():
+        calls.append(time.monotonic())
+        if len(calls) < 3:
+            raise requests.ConnectionError("no connection")
+        return "ok"
+
+    with Fetcher(retries=2, backoff=0.01, requests_per_second=1000) as fetcher:
+        assert fetcher.call("some.host", flaky) == "ok"
+        assert len(calls) == 3
+        with pytest.raises(ZeroDivisionError):
+            fetcher.call("some.host", lambda: 1 / 0)
+
+
+def test_host_rate_limiter():
+    limiter = HostRateLimiter(per_second=20)
+    before = time.monotonic()
+    for _ in range(5):
+        limiter.wait("some.host")
+    limiter.wait("other.host")
+    assert time.monotonic() - before >= 0.2
+
+
+@pytest.mark.django_db
+def test_missing_dockets(admin_user, monkeypatch):
+    searched = []
+
+    def fake_dockets(docket_nums, owner):
+        searched.extend(docket_nums)
+        return []
+
+    monkeypatch.setattr(download, "dockets", fake_dockets)
+    known = SourceRecord.objects.create(
+        docket_num="CP-51-CR-0000001-2020",
+        record_type=SourceRecord.RecTypes.DOCKET_PDF,
+        owner=admin_user,
+    )
+    prior = SourceRecord.objects.create(
+        docket_num="CP-51-CR-0000002-2020",
+        record_type=SourceRecord.RecTypes.DOCKET_PDF,
+        fetch_status=SourceRecord.FetchStatuses.FETCHED,
+        owner=admin_user,
+    )
+    found = download.missing_dockets(
+        [
+            "CP-51-CR-0000001-2020",
+            "CP-51-CR-0000002-2020",
+            "CP-51-CR-0000003-2020",
+            "CP-51-CR-0000003-2020",
+        ],
+        known=[known],
+        owner=admin_user,
+    )
+    assert found == [prior]
+    assert searched == ["CP-51-CR-0000003-2020"]
+
+
+@pytest.mark.django_db
+def test_parse_reuses_stored_parse(admin_user, monkeypatch):
+    docket = os.listdir("tests/data/dockets/")[0]
+    with open(f"tests/data/dockets/{docket}", "rb") as d:
+        source_record = SourceRecord.objects.create(
+            docket_num="MC-1234",
+            record_type=SourceRecord.RecTypes.DOCKET_PDF,
+            file=File(d),
+            owner=admin_user,
+        )
+    crecord = parsing.parse(source_record)
+    SourceRecord.objects.bulk_update([source_record], parsing.PARSE_FIELDS)
+    source_record.refresh_from_db()
+    assert source_record.parse_status == SourceRecord.ParseStatuses.SUCCESS
+    assert parsing.is_fresh(source_record)
+
+    def fail_to_parse(*args, **kwargs):
+        raise AssertionError("The stored parse should be used.")
+
+    monkeypatch.setattr(parsing, "RLSourceRecord", fail_to_parse)
+    reused = parsing.parse(source_record)
+    assert [c.docket_number for c in reused.cases] == [
+        c.docket_number for c in crecord.cases
+    ]
+
+    # A new version of the parsers makes the stored parse stale.
+    monkeypatch.setattr(SourceRecord, "PARSER_VERSION", "new")
+    assert not parsing.is_fresh(source_record)
+    with pytest.raises(AssertionError):
+        parsing.parse(source_record)
+
+
+@pytest.mark.django_db
+def test_reparse_source_records_skips_unreadable_files(admin_user, monkeypatch):
+    def parse_nothing(*args, **kwargs):
+        return SimpleNamespace(person=None, cases=[])
+
+    monkeypatch.setattr(parsing, "RLSourceRecord", parse_nothing)
+    stale = SourceRecord.objects.create(
+        docket_num="MC-1234",
+        record_type=SourceRecord.RecTypes.DOCKET_PDF,
+        raw_text="some text",
+        parsed="{}",
+        parser_version="old",
+        owner=admin_user,
+    )
+    missing = SourceRecord.objects.create(
+        docket_num="MC-5678",
+        record_type=SourceRecord.RecTypes.DOCKET_PDF,
+        file="missing.pdf",
+        parsed="{}",
+        owner=admin_user,
+    )
+    # Checking whether this parse is fresh means hashing the missing file.
+    missing.parser_version = missing.current_parser_version()
+    missing.save()
+    call_command("reparse_source_records")
+    stale.refresh_from_db()
+    missing.refresh_from_db()
+    assert parsing.is_fresh(stale)
+    assert stale.parse_status == SourceRecord.ParseStatuses.SUCCESS
+    assert missing.parse_status == SourceRecord.ParseStatuses.FAILURE
+
+
+@pytest.mark.django_db
+def test_downloads_share_the_docket_store(admin_user, monkeypatch):
+    fetched = []
+
+    def fake_get(self, url, **kwargs):
+        fetched.append(url)
+        return FakeResponse()
+
+    monkeypatch.setattr(requests.Session, "get", fake_get)
+    other_user = User.objects.create_user("other", password="test")
+
+    def new_record(owner):
+        return SourceRecord(
+            docket_num="CP-51-CR-0000001-2020",
+            url="https://some.slow.url/docket",
+            record_type=SourceRecord.RecTypes.DOCKET_PDF,
+            owner=owner,
+        )
+
+    # Two users' records of the same docket share one download.
+    recs = [new_record(admin_user), new_record(other_user)]
+    download.source_records(recs)
+    assert fetched == ["https://some.slow.url/docket"]
+    assert recs[0].file.name == recs[1].file.name
+    assert recs[0].file.name.startswith(docket_store.STORE_DIR)
+
+    # A docket fetched recently is taken from the store.
+    later = new_record(admin_user)
+    download.source_records([later])
+    assert fetched == ["https://some.slow.url/docket"]
+    assert later.file.name == recs[0].file.name
+    assert later.fetch_status == SourceRecord.FetchStatuses.FETCHED
+
+    # After a while, it's downloaded again.
+    StoredDocument.objects.update(fetched_at=datetime(2000, 1, 1, tzinfo=timezone.utc))
+    download.source_records([new_record(admin_user)])
+    assert len(fetched) == 2
+
+
+def test_coalesced_calls():
+    calls = []
+
+    def slow_call():
+        calls.append(1)
+        time.sleep(0.5)
+        return "result"
+
+    with Fetcher(concurrency=4) as fetcher:
+        results = fetcher.map(
+            lambda _: docket_store.coalesced("key", slow_call), range(4)
+        )
+    assert results == ["result"] * 4
+    assert len(calls) == 1
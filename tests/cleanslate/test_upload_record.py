@@ -1,8 +1,13 @@
 from RecordLib.utilities.serializers import to_serializable
+from cleanslate.services import extraction
 import os
 import json
+import pytest
 
-def test_upload_record(admin_client, example_summary):
+@pytest.mark.django_db(transaction=True)
+def test_upload_record(admin_client, example_summary, monkeypatch):
+    # Extract text right away, instead of in a django-q cluster.
+    monkeypatch.setattr(extraction, "async_task", lambda func, *args: func(*args))
     filename = os.listdir("tests/data/summaries")[1]
     path = os.path.join("tests/data/summaries", filename )
     with open(path, 'rb') as f: 
@@ -11,4 +16,11 @@ def test_upload_record(admin_client, example_summary):
     records = resp.json()
     assert "source_records" in records.keys()
     assert len(records['source_records']) == 1
-    assert records['source_records'][0]['record_type'] == "SUMMARY_PDF"
\ No newline at end of file
+    assert records['source_records'][0]['fetch_status'] == "EXTRACTING"
+    resp = admin_client.get(
+        "/api/record/sourcerecords/status/",
+        {"ids": records['source_records'][0]['id'], "wait": 5},
+    )
+    records = resp.json()
+    assert records['source_records'][0]['record_type'] == "SUMMARY_PDF"
+    assert records['source_records'][0]['fetch_status'] == "FETCHED"
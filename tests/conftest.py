@@ -9,6 +9,7 @@ from RecordLib.sourcerecords import Docket, Summary, SourceRecord
 from RecordLib.sourcerecords.summary.parse_pdf import parse_pdf as summary_parser
 from datetime import date
 from RecordLib.utilities.redis_helper import RedisHelper
+from RecordLib.utilities import ujs_cache
 import os
 
 # from django.test import Client
@@ -152,3 +153,17 @@ def redis_helper():
 def dclient():
     """ Django test client """
     return APIClient()
+
+
+@pytest.fixture
+def ujs_portal():
+    """ A stand-in for the UJS portal, with an empty cache of searches in front of it.
+
+    Add results for the portal to find to `ujs_portal.dockets` and `ujs_portal.names`.
+    """
+    portal = ujs_cache.OfflinePortal()
+    ujs_cache.set_portal(portal)
+    ujs_cache.set_store(ujs_cache.MemoryStore())
+    yield portal
+    ujs_cache.set_portal(None)
+    ujs_cache.set_store(None)
@@ -1,7 +1,24 @@
+import copy
+import logging
+from datetime import date
 import pytest
-from RecordLib.analysis import Analysis
+from RecordLib.analysis import (
+    Analysis,
+    AnalysisContext,
+    ChargeEdit,
+    PredicateMemo,
+    RuleCostTable,
+)
+from RecordLib.analysis.context import using_context
 from RecordLib.analysis.analysis import summarize
-from RecordLib.analysis.ruledefs import expunge_over_70, expunge_summary_convictions
+from RecordLib.analysis.ruledefs import (
+    expunge_over_70,
+    expunge_summary_convictions,
+    seal_convictions,
+    autosealing_eligibility,
+)
+from RecordLib.analysis.ruledefs.simple_sealing_rules import is_misdemeanor_or_ungraded
+from RecordLib.utilities.serializers import to_serializable
 
 
 def test_init(example_crecord):
@@ -31,3 +48,141 @@ def test_summary(example_crecord):
     ans = Analysis(example_crecord)
     summary = summarize(ans)
     assert True
+
+
+def test_summary_of_every_rule(example_crecord):
+    example_crecord.person.date_of_birth = date(1920, 1, 1)
+    example_crecord.cases[0].disposition_date = date(2000, 1, 1)
+    ans = (
+        Analysis(example_crecord)
+        .rule(expunge_over_70)
+        .rule(expunge_summary_convictions)
+        .rule(seal_convictions)
+        .rule(autosealing_eligibility)
+    )
+    assert all(d.rule_id is not None for d in ans.decisions)
+    summary, errs = summarize(ans)
+    assert errs == []
+    docket_number = example_crecord.cases[0].docket_number
+    assert summary["cases"][docket_number]["next_steps"] != ""
+
+
+def test_analysis_without_explanations(example_crecord):
+    explained = (
+        Analysis(example_crecord).rule(seal_convictions).rule(autosealing_eligibility)
+    )
+    unexplained = (
+        Analysis(example_crecord, explain=False)
+        .rule(seal_convictions)
+        .rule(autosealing_eligibility)
+    )
+    assert to_serializable(unexplained) == to_serializable(explained)
+
+
+def test_analysis_remembers_charge_decisions(example_crecord):
+    ans = Analysis(example_crecord).rule(autosealing_eligibility)
+    assert ans.saved_evaluations == 0
+    # Applying the rule again asks the same questions about the same charges.
+    ans.rule(autosealing_eligibility)
+    assert ans.saved_evaluations > 0
+    assert to_serializable(ans.decisions[0]) == to_serializable(ans.decisions[1])
+
+
+def test_predicate_memo_notices_changed_charge(example_charge):
+    memo = PredicateMemo()
+    with using_context(AnalysisContext(memo=memo)):
+        example_charge.grade = "M1"
+        assert bool(is_misdemeanor_or_ungraded(example_charge)) is True
+        assert bool(is_misdemeanor_or_ungraded(example_charge)) is True
+        assert memo.saved_evaluations == 1
+        example_charge.grade = "F1"
+        assert bool(is_misdemeanor_or_ungraded(example_charge)) is False
+    assert memo.evaluations == 2
+
+
+def test_analysis_as_of(example_crecord):
+    example_crecord.cases[0].disposition_date = date(2005, 1, 1)
+    example_crecord.cases[0].total_fines = 0
+    before = Analysis(example_crecord, as_of=date(2010, 1, 1)).rule(seal_convictions)
+    assert len(before.decisions[0].value) == 0
+    after = Analysis(example_crecord, as_of=date(2020, 1, 1)).rule(seal_convictions)
+    assert len(after.decisions[0].value) == 1
+
+
+def test_analysis_profiles_rules(example_crecord, caplog):
+    caplog.set_level(logging.INFO, logger="RecordLib.analysis.profile")
+    ans = (
+        Analysis(example_crecord, profile=True)
+        .rule(expunge_summary_convictions)
+        .rule(seal_convictions)
+    )
+    assert [p.rule for p in ans.rule_profiles] == [
+        "expunge_summary_convictions",
+        "seal_convictions",
+    ]
+    sealing = ans.rule_profiles[1]
+    assert sealing.charges_in == 1
+    assert sealing.decisions > 0
+    assert sealing.wall_time >= 0
+    profile_records = [
+        r for r in caplog.records if r.name == "RecordLib.analysis.profile"
+    ]
+    assert [r.rule_profile["rule"] for r in profile_records] == [
+        "expunge_summary_convictions",
+        "seal_convictions",
+    ]
+
+    table = RuleCostTable()
+    table.add_all(ans.rule_profiles)
+    table.add_all(ans.rule_profiles)
+    assert {row["rule"]: row["calls"] for row in table.rows()} == {
+        "expunge_summary_convictions": 2,
+        "seal_convictions": 2,
+    }
+    assert sum(row["share"] for row in table.rows()) == pytest.approx(1)
+
+
+def test_analysis_profiling_env_var(example_crecord, monkeypatch):
+    assert Analysis(example_crecord).rule(seal_convictions).rule_profiles == []
+    monkeypatch.setenv("RECORDLIB_PROFILE_RULES", "1")
+    assert len(Analysis(example_crecord).rule(seal_convictions).rule_profiles) == 1
+
+
+def test_reanalyze(example_crecord, example_case, example_charge):
+    example_crecord.cases = []
+    for i in range(4):
+        case = copy.deepcopy(example_case)
+        case.docket_number = f"CP-51-CR-000000{i}-2010"
+        case.disposition_date = date(2005, 1, 1)
+        case.charges = [copy.deepcopy(example_charge) for _ in range(3)]
+        for sequence, charge in enumerate(case.charges):
+            charge.sequence = str(sequence)
+            charge.statute = "18 § 3921"
+        example_crecord.cases.append(case)
+    rules = [
+        expunge_over_70,
+        expunge_summary_convictions,
+        seal_convictions,
+        autosealing_eligibility,
+    ]
+    ans = Analysis(example_crecord, as_of=date(2020, 1, 1))
+    for rule in rules:
+        ans = ans.rule(rule)
+
+    edit = ChargeEdit(
+        docket_number="CP-51-CR-0000002-2010", sequence="1", changes={"grade": "F1"}
+    )
+    evaluations_before = ans.context.memo.evaluations
+    reanalyzed = ans.reanalyze([edit])
+    reevaluated = ans.context.memo.evaluations - evaluations_before
+
+    edited_record = copy.deepcopy(example_crecord)
+    edit.apply(edited_record)
+    fresh = Analysis(edited_record, as_of=date(2020, 1, 1))
+    for rule in rules:
+        fresh = fresh.rule(rule)
+
+    assert to_serializable(reanalyzed) == to_serializable(fresh)
+    assert 0 < reevaluated < fresh.context.memo.evaluations
+    # The original analysis is unchanged.
+    assert example_crecord.cases[2].charges[1].grade == "M2"
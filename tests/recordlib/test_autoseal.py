@@ -1,4 +1,8 @@
+import copy
+from datetime import date
+import pytest
 from RecordLib.analysis.ruledefs import autosealing_rules as ar
+from RecordLib.crecord import CRecord, Charge
 from RecordLib.utilities.serializers import to_serializable
 
 
@@ -6,3 +10,51 @@ def test_autosealing(example_crecord):
     result = ar.autosealing_eligibility(example_crecord)
     assert True  # lets just make sure we can get here at all.
 
+
+@pytest.mark.parametrize(
+    "convictions,excluded",
+    [
+        ([("M2", date(2005, 1, 1))], False),
+        ([("M1", date(1990, 1, 1)), ("M2", date(2005, 1, 1))], False),
+        # Any felony conviction excludes the record, however old it is.
+        ([("F3", date(1990, 1, 1)), ("M2", date(2005, 1, 1))], True),
+        # So do two M1 convictions,
+        (
+            [
+                ("M1", date(1990, 1, 1)),
+                ("M1", date(1992, 1, 1)),
+                ("M2", date(2005, 1, 1)),
+            ],
+            True,
+        ),
+        # or four misdemeanor convictions.
+        ([("M3", date(1990 + i, 1, 1)) for i in range(3)], False),
+        ([("M3", date(1990 + i, 1, 1)) for i in range(4)], True),
+    ],
+)
+def test_autosealing_record_exclusions(
+    example_person, example_case, convictions, excluded
+):
+    cases = []
+    for i, (grade, disposition_date) in enumerate(convictions):
+        case = copy.deepcopy(example_case)
+        case.docket_number = f"CP-51-CR-000000{i}-1990"
+        case.disposition_date = disposition_date
+        case.fines_paid = case.total_fines
+        case.charges = [
+            Charge(
+                offense="Being silly",
+                grade=grade,
+                disposition="Guilty",
+                statute="18 § 1111",
+                sentences=[],
+            )
+        ]
+        cases.append(case)
+    _, decision = ar.autosealing_eligibility(
+        CRecord(person=example_person, cases=cases)
+    )
+    for case in cases:
+        # The last condition of each charge's decision is whether the whole record is excluded.
+        record_not_excluded = decision.reasoning[case.docket_number][0].reasoning[-1]
+        assert bool(record_not_excluded) is not excluded
@@ -0,0 +1,116 @@
+import csv
+import json
+from datetime import date
+import pytest
+from RecordLib.batch import (
+    SourceBundle,
+    analyze_bundle,
+    run_batch,
+    ResultWriter,
+    JsonLinesWriter,
+    CsvWriter,
+    Checkpoint,
+)
+from RecordLib.crecord import Person, Case, Charge
+
+
+def docket_number_parser(docket_number):
+    """ A parser that makes up a case with one summary conviction. """
+    person = Person(
+        first_name="Jane", last_name="Smorp", date_of_birth=date(1980, 1, 1)
+    )
+    case = Case(
+        status="Closed",
+        county="Philadelphia",
+        docket_number=docket_number,
+        otn="",
+        dc="",
+        charges=[
+            Charge(
+                offense="Being silly",
+                grade="S",
+                statute="18 § 5503",
+                disposition="Guilty",
+                sequence="1",
+                sentences=[],
+            )
+        ],
+        total_fines=0,
+        fines_paid=0,
+        complaint_date=None,
+        arrest_date=date(2000, 1, 1),
+        disposition_date=date(2000, 6, 1),
+        judge="",
+        judge_address="",
+        affiant="",
+        arresting_agency="",
+        arresting_agency_address="",
+    )
+    return person, [case], []
+
+
+def broken_parser(src):
+    raise ValueError("Unreadable")
+
+
+def make_bundles(n):
+    return [
+        SourceBundle(
+            bundle_id=str(i),
+            sources=[(f"MC-51-CR-{i:07d}-2000", docket_number_parser)],
+        )
+        for i in range(n)
+    ]
+
+
+def test_analyze_bundle():
+    bundle = make_bundles(1)[0]
+    bundle.sources.append(("bad.pdf", broken_parser))
+    result = analyze_bundle(bundle)
+    assert result.cases == 1
+    assert result.person.last_name == "Smorp"
+    assert result.summary["clearable_charges"] == 1
+    assert any("bad.pdf" in err for err in result.errors)
+
+
+def test_run_batch(tmp_path):
+    output = tmp_path / "results.jsonl"
+    with JsonLinesWriter(str(output)) as writer:
+        results = list(run_batch(make_bundles(5), workers=2, chunksize=2, writer=writer))
+    assert sorted(r.bundle_id for r in results) == [str(i) for i in range(5)]
+    with open(output) as f:
+        lines = [json.loads(line) for line in f]
+    assert sorted(line["bundle_id"] for line in lines) == [str(i) for i in range(5)]
+
+
+def test_run_batch_resumes_from_checkpoint(tmp_path):
+    output = str(tmp_path / "results.csv")
+    checkpoint = Checkpoint(str(tmp_path / "finished.txt"))
+    with CsvWriter(output) as writer:
+        first_run = run_batch(
+            make_bundles(4), workers=0, chunksize=1, writer=writer, checkpoint=checkpoint
+        )
+        # Stop partway through, as if the batch crashed.
+        next(first_run)
+        next(first_run)
+
+    checkpoint = Checkpoint(str(tmp_path / "finished.txt"))
+    assert len(checkpoint) == 2
+    with CsvWriter(output) as writer:
+        second_run = list(
+            run_batch(make_bundles(4), workers=0, writer=writer, checkpoint=checkpoint)
+        )
+    assert [r.bundle_id for r in second_run] == ["2", "3"]
+    with open(output) as f:
+        rows = list(csv.DictReader(f))
+    assert [row["bundle_id"] for row in rows] == ["0", "1", "2", "3"]
+    assert rows[0]["cases"] == "1"
+
+
+def test_incomplete_writer_fails_to_start(tmp_path):
+    class NoWriteWriter(ResultWriter):
+        pass
+
+    with pytest.raises(TypeError):
+        NoWriteWriter(str(tmp_path / "results.jsonl"))
+    assert not (tmp_path / "results.jsonl").exists()
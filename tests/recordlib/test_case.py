@@ -1,5 +1,6 @@
 from RecordLib.crecord import Case
 from RecordLib.crecord import Charge
+from RecordLib.crecord.helpers import as_of, years_between
 import pytest
 from datetime import date
 from dataclasses import asdict
@@ -113,3 +114,26 @@ def test_case_completenes(example_case):
     assert no_judge_completeness > 1
     example_case.judge_address = "1234 Market St."
     assert original_completeness > no_judge_completeness
+
+
+@pytest.mark.parametrize(
+    "earlier,later,years",
+    [
+        (date(2000, 1, 1), date(2010, 1, 1), 10),
+        (date(2000, 1, 2), date(2010, 1, 1), 9),
+        (date(2016, 2, 29), date(2017, 2, 28), 1),
+        (date(2016, 2, 29), date(2020, 2, 28), 3),
+        (date(2010, 1, 1), date(2000, 1, 2), -9),
+        (None, date(2010, 1, 1), 0),
+    ],
+)
+def test_years_between(earlier, later, years):
+    assert years_between(earlier, later) == years
+
+
+def test_years_passed_disposition_as_of(example_case):
+    example_case.disposition_date = date(2000, 6, 1)
+    with as_of(date(2010, 5, 31)):
+        assert example_case.years_passed_disposition() == 9
+    with as_of(date(2010, 6, 1)):
+        assert example_case.years_passed_disposition() == 10
@@ -0,0 +1,66 @@
+import random
+from datetime import date
+import copy
+from RecordLib.crecord import CRecord, Charge
+from RecordLib.crecord.charge_table import ChargeTable
+from RecordLib.crecord.helpers import as_of
+from RecordLib.analysis.ruledefs import cohort_rules
+from RecordLib.analysis.ruledefs import simple_sealing_rules as ssr
+
+
+def random_cohort(example_person, example_case, people=40):
+    rand = random.Random(1234)
+    grades = ["", "S", "M", "M3", "M2", "M1", "F", "F3", "F2", "F1", "F-1"]
+    dispositions = ["Guilty", "Guilty Plea", "Not Guilty", "Withdrawn"]
+    cohort = []
+    for _ in range(people):
+        cases = []
+        for _ in range(rand.randint(0, 4)):
+            case = copy.copy(example_case)
+            case.disposition_date = rand.choice(
+                [None, date(rand.randint(1990, 2020), rand.randint(1, 12), 28)]
+            )
+            case.charges = [
+                Charge(
+                    offense=rand.choice(["Theft", "Murder", "Simple assault"]),
+                    grade=rand.choice(grades),
+                    statute="18 § 3921",
+                    disposition=rand.choice(dispositions),
+                    sentences=[],
+                )
+                for _ in range(rand.randint(1, 4))
+            ]
+            cases.append(case)
+        cohort.append(CRecord(person=example_person, cases=cases))
+    return cohort
+
+
+def test_charge_table(example_crecord):
+    example_crecord.cases[0].charges[0].statute = "18 § 3921"
+    table = ChargeTable([example_crecord, CRecord(person=example_crecord.person)])
+    assert len(table) == 1
+    assert table.title[0] == 18
+    assert table.section[0] == 3921
+    assert table.conviction[0]
+    assert list(table.count_convictions("M2")) == [1, 0]
+    assert list(table.count_convictions("M1")) == [0, 0]
+
+
+def test_cohort_rules_match_record_rules(example_person, example_case):
+    cohort = random_cohort(example_person, example_case)
+    day = date(2020, 6, 1)
+    table = ChargeTable(cohort, as_of=day)
+    no_f1 = cohort_rules.no_f1_convictions(table)
+    felony_5 = cohort_rules.any_felony_convictions_n_years(table, 5)
+    m1s_15 = cohort_rules.more_than_x_convictions_y_grade_z_years(table, 2, "M1", 15)
+    m2s_20 = cohort_rules.more_than_x_convictions_y_grade_z_years(table, 4, "M2", 20)
+    with as_of(day):
+        for i, crecord in enumerate(cohort):
+            assert no_f1[i] == bool(ssr.no_f1_convictions(crecord))
+            assert felony_5[i] == bool(ssr.any_felony_convictions_n_years(crecord, 5))
+            assert m1s_15[i] == bool(
+                ssr.more_than_x_convictions_y_grade_z_years(crecord, 2, "M1", 15)
+            )
+            assert m2s_20[i] == bool(
+                ssr.more_than_x_convictions_y_grade_z_years(crecord, 4, "M2", 20)
+            )
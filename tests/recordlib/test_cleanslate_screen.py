@@ -0,0 +1,79 @@
+"""
+Automated screening collects and parses a person's documents.
+"""
+import copy
+import threading
+import time
+from RecordLib.utilities import cleanslate_screen
+from RecordLib.utilities.cleanslate_screen import ScreeningPipeline
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, url):
+        self.content = url.encode("utf-8")
+
+
+def test_screening_pipeline(
+    ujs_portal, monkeypatch, tmp_path, example_person, example_case
+):
+    def fake_parser(text):
+        # The "text" of a fake docket is the url it was downloaded from.
+        case = copy.deepcopy(example_case)
+        case.docket_number = text.split("/")[-1]
+        return example_person, [case], []
+
+    lock = threading.Lock()
+    in_flight = [0]
+    most_in_flight = [0]
+
+    def slow_get(url, **kwargs):
+        with lock:
+            in_flight[0] += 1
+            most_in_flight[0] = max(most_in_flight[0], in_flight[0])
+        time.sleep(0.3)
+        with lock:
+            in_flight[0] -= 1
+        return FakeResponse(url)
+
+    def extract_text(filename):
+        with open(filename) as f:
+            url = f.read()
+        if url.endswith("summary/CP-51-CR-0000001-2020"):
+            # This summary mentions a case the search didn't find.
+            return "CP-51-CR-0000001-2020 CP-51-CR-0000009-2020"
+        return url
+
+    monkeypatch.setattr(cleanslate_screen.requests, "get", slow_get)
+    monkeypatch.setattr(cleanslate_screen, "get_text_from_pdf", extract_text)
+    monkeypatch.setattr(cleanslate_screen, "pick_pdf_parser", lambda dn: fake_parser)
+    ujs_portal.dockets["CP-51-CR-0000009-2020"] = [
+        {
+            "docket_number": "CP-51-CR-0000009-2020",
+            "docket_sheet_url": "https://ujs/docket/CP-51-CR-0000009-2020",
+        }
+    ]
+    search_results = [
+        {
+            "docket_number": f"CP-51-CR-000000{i}-2020",
+            "docket_sheet_url": f"https://ujs/docket/CP-51-CR-000000{i}-2020",
+            "summary_url": f"https://ujs/summary/CP-51-CR-000000{i}-2020",
+        }
+        for i in range(1, 4)
+    ]
+    parsed = ScreeningPipeline(search_results, str(tmp_path)).run()
+    assert [src.cases[0].docket_number for case, src in parsed] == [
+        "CP-51-CR-0000001-2020",
+        "CP-51-CR-0000002-2020",
+        "CP-51-CR-0000003-2020",
+        "CP-51-CR-0000009-2020",
+    ]
+    assert parsed[0][1].cases[0].docket_url == search_results[0]["docket_sheet_url"]
+    assert ujs_portal.searches == [("docket", "CP-51-CR-0000009-2020")]
+    # The downloads overlap.
+    assert most_in_flight[0] > 1
+
+
+def test_screening_pipeline_without_cases(tmp_path):
+    assert ScreeningPipeline([], str(tmp_path)).run() == []
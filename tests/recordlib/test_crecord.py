@@ -2,7 +2,18 @@ import copy
 from datetime import date
 from dateutil.relativedelta import relativedelta
 import pytest
-from RecordLib.crecord import CRecord, Person, Case, Charge
+from RecordLib.crecord import (
+    CRecord,
+    Person,
+    Case,
+    Charge,
+    Grade,
+    RecordIndex,
+    RecordIndexes,
+    record_index,
+)
+from RecordLib.analysis.context import AnalysisContext, using_context
+from RecordLib.analysis.ruledefs import simple_sealing_rules as ssr
 from RecordLib.sourcerecords import SourceRecord
 from RecordLib.utilities.serializers import to_serializable
 
@@ -166,3 +177,29 @@ def test_add_case_deduplicates(example_person, example_case):
     record.add_case(case3)
 
     assert len(record.cases) == 2
+
+
+def test_record_index(example_crecord):
+    example_crecord.cases[0].disposition_date = date(2010, 6, 1)
+    example_crecord.cases[0].charges[0].grade = "M1"
+    index = RecordIndex(example_crecord, as_of=date(2020, 6, 1))
+    assert index.count_convictions(Grade.M2) == 1
+    assert index.count_convictions(Grade.F) == 0
+    assert index.count_convictions(Grade.M1, within_years=11) == 1
+    assert index.count_convictions(Grade.M1, within_years=10) == 0
+    assert index.convictions("M") == [date(2010, 6, 1)]
+    # The example sentence of up to 25 years started in 2000.
+    assert index.years_since_final_release() == 0
+    assert RecordIndex(example_crecord, as_of=date(2030, 1, 1)).years_since_final_release() == 5
+
+
+def test_record_index_is_kept_during_an_analysis(example_crecord):
+    context = AnalysisContext(as_of=date(2020, 6, 1), indexes=RecordIndexes())
+    with using_context(context):
+        # Each of these reads the index of the record three times.
+        ssr.record_contains_convictions_excluded_from_sealing(example_crecord)
+        ssr.record_contains_convictions_excluded_from_sealing(example_crecord)
+        assert record_index(example_crecord).as_of == date(2020, 6, 1)
+    assert context.indexes.built == 1
+    # Outside of an Analysis, records are indexed again each time, in case they've changed.
+    assert record_index(example_crecord) is not record_index(example_crecord)
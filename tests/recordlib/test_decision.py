@@ -1,5 +1,7 @@
 import pytest
-from RecordLib.analysis import Decision
+from RecordLib.analysis import AnalysisContext, Decision, Explanation
+from RecordLib.analysis.context import using_context
+from RecordLib.analysis.decision import decide_all
 import json
 from RecordLib.utilities.serializers import to_serializable
 
@@ -47,3 +49,33 @@ def test_decision_json_encodeable():
         res = json.dumps(go_to_birra, default=to_serializable, indent=4)
     except TypeError:
         pytest.fail("Decision object can't be json-encoded.")
+
+
+def test_decide_all_short_circuits():
+    calls = []
+
+    def condition(value):
+        def decide():
+            calls.append(value)
+            return Decision(name=f"condition {value}", value=value)
+
+        return decide
+
+    with using_context(AnalysisContext(explain=False)):
+        reasoning, value = decide_all([condition(True), condition(False), condition(True)])
+    assert value is False
+    assert calls == [True, False]
+    assert isinstance(reasoning, Explanation)
+    assert [d.value for d in reasoning.resolve()] == [True, False, True]
+
+    calls.clear()
+    reasoning, value = decide_all([condition(True), condition(False), condition(True)])
+    assert value is False
+    assert calls == [True, False, True]
+
+
+def test_decision_resolves_explanation():
+    dec = Decision(name="want pizza?", value=True)
+    dec.reasoning = Explanation(lambda: "Pizza is good.")
+    assert dec.reasoning == "Pizza is good."
+    assert to_serializable(dec)["reasoning"] == "Pizza is good."
@@ -0,0 +1,53 @@
+import json
+from RecordLib.analysis import Analysis
+from RecordLib.analysis.ruledefs import (
+    autosealing_eligibility,
+    seal_convictions,
+    expunge_nonconvictions,
+    expunge_summary_convictions,
+)
+from RecordLib.utilities.encoders import to_json, iter_json
+from RecordLib.utilities.serializers import to_serializable, to_compact_serializable
+
+
+def analyze(crecord, explain):
+    return (
+        Analysis(crecord, explain=explain)
+        .rule(autosealing_eligibility)
+        .rule(expunge_nonconvictions)
+        .rule(expunge_summary_convictions)
+        .rule(seal_convictions)
+    )
+
+
+def test_to_json_matches_to_serializable(example_crecord, example_charge):
+    example_crecord.cases[0].charges.append(example_charge)
+    example_crecord.person.aliases.append("Zoë “Z” Smorp")
+    example_crecord.cases[0].judge = None
+    for val in [
+        example_crecord,
+        {1: [None, b"bytes", 2.5], "ok": True, None: {}},
+        [],
+    ]:
+        assert to_json(val) == json.dumps(to_serializable(val), separators=(",", ":"))
+    for explain in [True, False]:
+        assert to_json(analyze(example_crecord, explain)) == json.dumps(
+            to_serializable(analyze(example_crecord, explain)), separators=(",", ":")
+        )
+        assert to_json(analyze(example_crecord, explain), compact=True) == json.dumps(
+            to_compact_serializable(analyze(example_crecord, explain)),
+            separators=(",", ":"),
+        )
+
+
+def test_iter_json(example_crecord, example_charge):
+    example_crecord.cases[0].charges.append(example_charge)
+    example_crecord.cases.append(example_crecord.cases[0])
+    for compact in [True, False]:
+        chunks = list(
+            iter_json(analyze(example_crecord, False), compact=compact, chunk_size=100)
+        )
+        assert len(chunks) > 10
+        assert "".join(chunks) == to_json(
+            analyze(example_crecord, False), compact=compact
+        )
@@ -0,0 +1,75 @@
+import copy
+import pytest
+from RecordLib.crecord import Charge, Grade
+
+
+@pytest.mark.parametrize(
+    "text,grade",
+    [
+        ("M1", Grade.M1),
+        (" M-1 ", Grade.M1),
+        ("Misd 2", Grade.M2),
+        ("f3", Grade.F3),
+        ("Felony", Grade.F),
+        ("S", Grade.S),
+        ("", Grade.UNKNOWN),
+        (None, Grade.UNKNOWN),
+        ("Not a grade", Grade.UNKNOWN),
+    ],
+)
+def test_grade_from_str(text, grade):
+    assert Grade.from_str(text) == grade
+
+
+@pytest.mark.parametrize(
+    "grade_a,grade_b,gte",
+    [
+        ("M1", "S", True),
+        ("S", "", True),
+        ("", "S", False),
+        ("M", "M3", False),
+        ("F", "M1", True),
+        ("F3", "F2", False),
+        ("M-1", "M1", True),
+    ],
+)
+def test_grade_GTE(grade_a, grade_b, gte):
+    assert Charge.grade_GTE(grade_a, grade_b) is gte
+
+
+def test_grades_GTE():
+    assert Charge.grades_GTE(["F1", "M2", "", "M1"], "M1") == [
+        True,
+        False,
+        False,
+        True,
+    ]
+
+
+def test_charge_grade_ordinal(example_charge):
+    example_charge.grade = "M2"
+    assert example_charge.grade_ordinal == Grade.M2
+    example_charge.grade = "F1"
+    assert example_charge.grade_ordinal > Grade.M1
+
+
+def test_charge_grade_ordinal_is_computed_once(example_charge, monkeypatch):
+    example_charge.grade = "M2"
+    calls = []
+    from_str = Grade.from_str
+
+    def counting_from_str(grade):
+        calls.append(grade)
+        return from_str(grade)
+
+    monkeypatch.setattr(Grade, "from_str", counting_from_str)
+    assert example_charge.grade_ordinal == Grade.M2
+    assert example_charge.grade_ordinal == Grade.M2
+    assert calls == ["M2"]
+    example_charge.grade = "F1"
+    assert example_charge.grade_ordinal == Grade.F1
+    assert calls == ["M2", "F1"]
+    # The ordinal isn't serialized with the charge.
+    assert "_grade_ordinal" not in example_charge.__dict__
+    copied = copy.deepcopy(example_charge)
+    assert copied.grade_ordinal == Grade.F1
@@ -347,6 +347,66 @@ def test_is_felony_conviction(example_charge):
     assert bool(is_felony_conviction(example_charge)) is True
 
 
-@pytest.mark.skip("Not unit-tested. Shame on me.")
 def test_more_than_x_convictions_y_grade_y_years(example_crecord):
-    pass
+    example_crecord.cases[0].disposition_date = date.today()
+    example_crecord.cases[0].charges = [
+        Charge(
+            offense="Being silly",
+            grade=grade,
+            disposition="Guilty",
+            statute="18 § 1111",
+            sentences=[],
+        )
+        for grade in ["M1", "F3", "M2"]
+    ]
+    d = more_than_x_convictions_y_grade_z_years(example_crecord, 2, "M1", 15)
+    assert bool(d) is True
+    assert d.years_to_wait == 15
+    assert bool(more_than_x_convictions_y_grade_z_years(example_crecord, 3, "M1", 15)) is False
+    assert bool(more_than_x_convictions_y_grade_z_years(example_crecord, 3, "M", 15)) is True
+    example_crecord.cases[0].disposition_date = date(1990, 1, 1)
+    assert bool(more_than_x_convictions_y_grade_z_years(example_crecord, 2, "M1", 15)) is False
+    assert (
+        bool(more_than_x_convictions_y_grade_z_years(example_crecord, 2, "M1", float("inf")))
+        is True
+    )
+
+
+def test_any_felony_convictions_n_years(example_crecord):
+    example_crecord.cases[0].disposition_date = date.today()
+    example_crecord.cases[0].charges[0].grade = "M1"
+    assert bool(any_felony_convictions_n_years(example_crecord, 5)) is False
+    example_crecord.cases[0].charges[0].grade = "F2"
+    assert bool(any_felony_convictions_n_years(example_crecord, 5)) is True
+    example_crecord.cases[0].disposition_date = date(1990, 1, 1)
+    assert bool(any_felony_convictions_n_years(example_crecord, 5)) is False
+
+
+def test_record_contains_convictions_excluded_from_sealing(example_crecord):
+    # A single M2 conviction doesn't exclude a record.
+    assert bool(record_contains_convictions_excluded_from_sealing(example_crecord)) is False
+    # Neither does a record without any cases.
+    empty = CRecord(person=example_crecord.person)
+    assert bool(record_contains_convictions_excluded_from_sealing(empty)) is False
+    assert bool(record_contains_no_convictions_excluded_from_sealing(empty)) is True
+
+    # Any felony conviction excludes a record, however old it is.
+    example_crecord.cases[0].disposition_date = date(1980, 1, 1)
+    example_crecord.cases[0].charges[0].grade = "F3"
+    assert bool(record_contains_convictions_excluded_from_sealing(example_crecord)) is True
+    assert bool(record_contains_no_convictions_excluded_from_sealing(example_crecord)) is False
+
+    # So do two M1 convictions.
+    example_crecord.cases[0].charges = [
+        Charge(
+            offense="Being silly",
+            grade="M1",
+            disposition="Guilty",
+            statute="18 § 1111",
+            sentences=[],
+        )
+        for _ in range(2)
+    ]
+    assert bool(record_contains_convictions_excluded_from_sealing(example_crecord)) is True
+    example_crecord.cases[0].charges.pop()
+    assert bool(record_contains_convictions_excluded_from_sealing(example_crecord)) is False
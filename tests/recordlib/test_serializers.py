@@ -3,7 +3,18 @@ We can serialize RecordLib objects into JSON representations
 """
 # pylint: disable=no-member
 
-from RecordLib.utilities.serializers import to_serializable
+import json
+from RecordLib.analysis import Analysis
+from RecordLib.analysis.ruledefs import (
+    autosealing_eligibility,
+    seal_convictions,
+    expunge_nonconvictions,
+)
+from RecordLib.utilities.serializers import (
+    to_serializable,
+    to_compact_serializable,
+    expand_references,
+)
 
 
 def test_case_serialize(example_case):
@@ -26,3 +37,18 @@ def test_serialize_docket(example_docket):
 def test_serialize_summary(example_summary):
     ser = to_serializable(example_summary)
     assert "_cases" in ser.keys()
+
+
+def test_compact_serialize_analysis(example_crecord, example_charge):
+    # Every charge's autosealing reasoning includes the same Decisions about the whole record.
+    example_crecord.cases[0].charges.append(example_charge)
+    analysis = (
+        Analysis(example_crecord)
+        .rule(autosealing_eligibility)
+        .rule(seal_convictions)
+        .rule(expunge_nonconvictions)
+    )
+    compacted = to_compact_serializable(analysis)
+    assert "$ref" in json.dumps(compacted)
+    assert len(json.dumps(compacted)) < len(json.dumps(to_serializable(analysis)))
+    assert expand_references(compacted) == to_serializable(analysis)
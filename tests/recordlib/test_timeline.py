@@ -0,0 +1,75 @@
+from datetime import date
+from RecordLib.analysis import Analysis
+from RecordLib.analysis.ruledefs import simple_sealing_rules as ssr
+from RecordLib.analysis.timeline import (
+    EligibilityTimeline,
+    PETITION_SEALING_REQUIREMENTS,
+    windowed_requirement,
+)
+from RecordLib.crecord import Charge
+
+
+def test_petition_sealing_date(example_crecord):
+    case = example_crecord.cases[0]
+    case.disposition_date = date(2015, 3, 1)
+    timeline = EligibilityTimeline(example_crecord, as_of=date(2020, 1, 1))
+    # The rule requires more than 10 years free of convictions.
+    assert timeline.petition_sealing_date() == date(2026, 3, 1)
+    assert timeline.case_sealing_date(case) == date(2026, 3, 1)
+
+    case.disposition_date = date(1990, 1, 1)
+    timeline = EligibilityTimeline(example_crecord, as_of=date(2020, 1, 1))
+    assert timeline.petition_sealing_date() == date(2020, 1, 1)
+
+
+def test_petition_sealing_date_with_several_m1s(example_crecord):
+    case = example_crecord.cases[0]
+    case.disposition_date = date(2000, 6, 1)
+    case.charges = [
+        Charge(
+            offense="Being silly",
+            grade="M1",
+            disposition="Guilty",
+            statute="14 § 123",
+            sentences=[],
+        )
+        for _ in range(2)
+    ]
+    timeline = EligibilityTimeline(example_crecord, as_of=date(2012, 1, 1))
+    # Two M1 convictions block sealing for 15 years.
+    assert timeline.petition_sealing_date() == date(2015, 6, 1)
+
+
+def test_petition_sealing_date_f1(example_crecord):
+    example_crecord.cases[0].charges[0].grade = "F1"
+    timeline = EligibilityTimeline(example_crecord)
+    assert timeline.petition_sealing_date() is None
+    assert timeline.case_sealing_date(example_crecord.cases[0]) is None
+
+
+def test_analysis_eligibility_timeline(example_crecord):
+    example_crecord.cases[0].disposition_date = date(2015, 3, 1)
+    dates = Analysis(example_crecord).eligibility_timeline(as_of=date(2020, 1, 1)).as_dict()
+    assert dates["seal_convictions"]["12-MC-01"] == date(2026, 3, 1)
+    assert "1" in dates["autosealing_eligibility"]["12-MC-01"]
+
+
+def test_timeline_uses_the_sealing_windows():
+    requirements = {req.name: req for req in PETITION_SEALING_REQUIREMENTS}
+    assert len(requirements) == len(ssr.PETITION_SEALING_WINDOWS) + 1
+    for window in ssr.PETITION_SEALING_WINDOWS:
+        req = windowed_requirement(window)
+        assert requirements[req.name].within_years == window.within_years
+        assert requirements[req.name].conviction_limit == window.conviction_limit
+
+    longer = ssr.ConvictionWindow(
+        ssr.no_offenses_punishable_by_more_than_two_years,
+        within_years=25,
+        conviction_limit=3,
+    )
+    req = windowed_requirement(longer)
+    assert (
+        req.name
+        == "Fewer than 3 offenses punishable by more than two years in 25 years"
+    )
+    assert (req.within_years, req.conviction_limit) == (25, 3)
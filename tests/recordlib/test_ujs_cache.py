@@ -0,0 +1,60 @@
+"""
+Searches of the UJS portal are cached.
+"""
+from datetime import date
+from RecordLib.utilities import ujs_cache
+
+
+def test_search_by_docket_is_cached(ujs_portal):
+    ujs_portal.dockets["CP-51-CR-0000001-2020"] = [
+        {"docket_number": "CP-51-CR-0000001-2020", "caption": "Comm. v. Smith"}
+    ]
+    found = ujs_cache.search_by_docket("CP-51-CR-0000001-2020")
+    # Changing the results doesn't change the cache.
+    found[0]["docket_sheet_text"] = "lots of text"
+    again = ujs_cache.search_by_docket(" cp-51-cr-0000001-2020")
+    assert again == [
+        {"docket_number": "CP-51-CR-0000001-2020", "caption": "Comm. v. Smith"}
+    ]
+    assert len(ujs_portal.searches) == 1
+
+
+def test_search_by_name_is_cached(ujs_portal):
+    ujs_portal.names[("jane", "smith")] = {
+        "CP": [{"docket_number": "CP-51-CR-0000001-2020"}]
+    }
+    results, errors = ujs_cache.search_by_name("Jane", "Smith", date(2000, 1, 1))
+    assert len(results["CP"]) == 1
+    ujs_cache.search_by_name("jane ", "SMITH", date(2000, 1, 1))
+    assert len(ujs_portal.searches) == 1
+    # Other dates of birth and courts are different searches.
+    ujs_cache.search_by_name("Jane", "Smith", date(2000, 1, 2))
+    ujs_cache.search_by_name("Jane", "Smith", date(2000, 1, 1), court="CP")
+    assert len(ujs_portal.searches) == 3
+
+
+def test_searches_that_find_nothing_expire_sooner(ujs_portal, monkeypatch):
+    timeouts = []
+    store = ujs_cache.get_store()
+    monkeypatch.setattr(
+        store,
+        "set",
+        lambda key, value, timeout: timeouts.append(timeout),
+    )
+    ujs_portal.dockets["CP-51-CR-0000001-2020"] = [{"docket_number": "CP-1"}]
+    ujs_cache.search_by_docket("CP-51-CR-0000001-2020")
+    ujs_cache.search_by_docket("CP-51-CR-0000002-2020")
+    ujs_cache.search_by_name("Nobody", "Atall")
+    assert timeouts == [
+        ujs_cache.FOUND_TIMEOUT,
+        ujs_cache.NOT_FOUND_TIMEOUT,
+        ujs_cache.NOT_FOUND_TIMEOUT,
+    ]
+
+
+def test_searches_with_errors_are_not_cached(ujs_portal, monkeypatch):
+    monkeypatch.setattr(
+        ujs_portal, "search_by_name", lambda *args, **kwargs: ({"CP": []}, ["timeout"])
+    )
+    ujs_cache.search_by_name("Jane", "Smith")
+    assert ujs_cache.get_store().entries == {}